@@ -7,17 +7,64 @@
 app.py (메인)
 ├── config.py
 ├── data_loader.py
-│   └── config (간접)
+│   ├── config (간접)
+│   ├── boundary_store
+│   ├── batch_loader
+│   └── data_processing
+├── batch_loader.py
+│   ├── config
+│   └── data_processing
+├── pipeline_cache.py
+│   ├── config
+│   ├── boundary_store
+│   └── data_loader
+├── render_cache.py
+│   ├── config
+│   ├── map_generator
+│   ├── coverage
+│   └── pipeline_cache
+├── coverage.py
+│   ├── config
+│   ├── pipeline_cache
+│   └── spatial_index
+├── spatial_index.py
+│   ├── config
+│   └── pipeline_cache
 ├── kidsroom_manager.py
+│   ├── config
+│   └── file_watch
+├── kidsroom_search.py
 │   └── config
+├── population_store.py
+│   ├── config
+│   ├── data_processing
+│   ├── pipeline_cache
+│   └── profiling
+├── profiling.py (pipeline_cache, render_cache, map_generator 등에서 사용)
+├── report_cli.py (헤드리스 진입점)
+│   ├── config
+│   ├── boundary_store
+│   ├── data_processing
+│   ├── kidsroom_manager
+│   ├── map_generator
+│   ├── spatial_index
+│   ├── coverage
+│   └── population_store
 ├── map_generator.py
-│   └── config
+│   ├── config
+│   └── map_payload
 ├── ui_components.py
 │   ├── config
 │   ├── geocoding
-│   └── kidsroom_manager
+│   ├── bulk_geocoder
+│   ├── map_generator
+│   ├── kidsroom_manager
+│   ├── kidsroom_search
+│   └── profiling
 └── geocoding.py
-    └── config
+    ├── config
+    ├── geocode_cache
+    └── geo_client
 """
 
 # 각 모듈의 책임
@@ -28,7 +75,26 @@ MODULES = {
     "geocoding.py": "지오코딩 - 주소를 좌표로 변환",
     "kidsroom_manager.py": "키즈룸 데이터 관리 - CRUD 작업",
     "map_generator.py": "지도 생성 - Folium 지도 렌더링",
-    "ui_components.py": "UI 컴포넌트 - Streamlit 인터페이스"
+    "ui_components.py": "UI 컴포넌트 - Streamlit 인터페이스",
+    "boundary_store.py": "경계 저장소 - GeoJSON → 시군구별 GeoParquet 캐시",
+    "pipeline_cache.py": "파이프라인 캐시 - 병합 결과 LRU 캐시 (세션 공유)",
+    "data_processing.py": "데이터 처리 핵심 - Streamlit 비의존 순수 함수",
+    "batch_loader.py": "일괄 로드 - 전체 도시 병렬 파싱 및 병합 (헤드리스)",
+    "map_payload.py": "지도 페이로드 - 경계 단순화/좌표 양자화",
+    "render_cache.py": "렌더 캐시 - 직렬화된 지도 HTML LRU 캐시",
+    "geocode_cache.py": "지오코딩 캐시 - SQLite 영구 캐시 (실패 결과 짧은 TTL)",
+    "bulk_geocoder.py": "대량 지오코딩 - asyncio 동시 변환 + 일괄 등록",
+    "geo_client.py": "제공자 HTTP 클라이언트 - 연결 풀, 타임아웃, 지연시간/오류 메트릭",
+    "geocode_stub_server.py": "지오코딩 스텁 서버 - 로컬 테스트용",
+    "file_watch.py": "파일 변경 감지 - stat 비교 + inotify 감시 스레드 (세대 번호)",
+    "spatial_index.py": "공간 인덱스 - 행정동 STRtree, 키즈룸 동 배정 및 동별 지표",
+    "coverage.py": "커버리지 분석 - 인구 격자 기반 반경 안 인구/인구가중 거리/서비스 부족 동",
+    "benchmarks/import_time.py": "import 시간 벤치마크 - 모듈별 콜드 스타트 import 시간 + 로드된 무거운 패키지",
+    "profiling.py": "프로파일링 - 단계별 소요 시간/메모리 피크 구간 기록, JSON lines 내보내기",
+    "benchmarks/pipeline_bench.py": "파이프라인 벤치마크 - 번들/합성 데이터 단계별 시간·메모리·HTML 크기, 기준선 비교",
+    "report_cli.py": "리포트 CLI - 도시별 HTML 지도/CSV/Parquet 지표 병렬 생성 + 단계별 소요 시간",
+    "kidsroom_search.py": "키즈룸 검색 - 이름/주소 n-gram 역색인, 자모/초성 일치, 점수 순 결과, 변경분 색인",
+    "population_store.py": "인구 시계열 저장소 - 도시 x 기준 월 Parquet 파티션, 변경분 적재, 기간/전월 대비 증감 지표"
 }
 
 # 주요 함수 목록
@@ -38,7 +104,46 @@ FUNCTIONS = {
         "load_geojson_file(file_path)",
         "process_population_data(df)",
         "process_geodata(gdf, city_name)",
-        "merge_data(gdf_filtered, df)"
+        "merge_data(gdf_filtered, df)",
+        "data_processing.join_population(gdf_filtered, df) -> (merged, join_report)",
+        "load_geodata_for_city(file_path, city_name)"
+    ],
+    "boundary_store.py": [
+        "ensure_boundary_store(geo_path)",
+        "load_city_boundaries(geo_path, city_name)"
+    ],
+    "batch_loader.py": [
+        "load_populations_parallel(cities, max_workers)",
+        "build_all_cities(geo_path, cities, max_workers)"
+    ],
+    "render_cache.py": [
+        "render_population_map_html(merged, kidsroom_list, opacity, map_type, data_key)",
+        "get_render_cache_stats()"
+    ],
+    "pipeline_cache.py": [
+        "get_merged_data(csv_source, geo_source, city_name)",
+        "get_population_data(csv_source)",
+        "get_pipeline_cache_stats()"
+    ],
+    "spatial_index.py": [
+        "get_dong_index(merged)",
+        "assign_kidsrooms(merged, kidsroom_list)",
+        "add_kidsroom_metrics(merged, kidsroom_list)"
+    ],
+    "coverage.py": [
+        "add_coverage_metrics(merged, kidsroom_list, radius_m)",
+        "underserved_dongs(covered)",
+        "coverage_area(kidsroom_list, radius_m)"
+    ],
+    "profiling.py": [
+        "span(name, **attrs)",
+        "ProfileRun(label, enabled, trace_memory)",
+        "runs_to_jsonl(runs)"
+    ],
+    "report_cli.py": [
+        "build_city_report(city, out_dir, kidsroom_list, geo_path, map_type, radius_m, formats)",
+        "build_reports(cities, out_dir, geo_path, max_workers)",
+        "main(argv)"
     ],
     "geocoding.py": [
         "geocode_address(address) -> (lat, lon, address, place_name)",
@@ -48,22 +153,50 @@ FUNCTIONS = {
     ],
     "kidsroom_manager.py": [
         "load_kidsroom_data()",
+        "load_kidsroom_state()",
+        "sync_kidsroom_list(list, since_seq)",
         "save_kidsroom_data(data)",
         "add_kidsroom(list, name, address, lat, lon)",
-        "remove_kidsroom(list, index)"
+        "add_kidsrooms(list, records)",
+        "update_kidsroom(list, kidsroom_id, ..., expected_version)",
+        "remove_kidsroom(list, kidsroom_id, expected_version)",
+        "compact_journal()",
+        "get_kidsroom_generation()",
+        "restore_kidsroom_data(at, seq, apply)"
+    ],
+    "kidsroom_search.py": [
+        "KidsroomSearchIndex(records)",
+        "KidsroomSearchIndex.sync(records)",
+        "KidsroomSearchIndex.search(query, limit)",
+        "KidsroomSearchIndex.get(record_id)",
+        "decompose(text)",
+        "choseong(text)"
+    ],
+    "population_store.py": [
+        "ingest_population_csv(source, city)",
+        "ensure_population_store()",
+        "list_months(city)",
+        "load_population_series(city, start, end)",
+        "population_trend(city, start, end)",
+        "trend_key(city, start, end)",
+        "add_trend_metrics(merged, city, start, end)",
+        "main(argv)"
     ],
     "map_generator.py": [
         "create_population_map(merged, kidsroom_list)",
         "create_base_map()",
         "add_choropleth_layer(m, merged)",
         "add_dong_layers(m, merged)",
-        "add_kidsroom_markers(m, kidsroom_list)"
+        "add_dong_labels(m, merged)",
+        "add_kidsroom_markers(m, kidsroom_list, mode)",
+        "kidsroom_marker_mode(count, mode)"
     ],
     "ui_components.py": [
         "render_file_upload_section()",
         "render_kidsroom_input_section()",
         "render_kidsroom_auto_search_tab()",
         "render_kidsroom_manual_input_tab()",
+        "render_kidsroom_bulk_import_tab()",
         "render_kidsroom_list()"
     ]
 }
@@ -1,22 +1,31 @@
 """
 성남시 인구 현황 및 키즈룸 분석 애플리케이션
 """
+import pandas as pd
 import streamlit as st
-from streamlit_folium import st_folium
+import streamlit.components.v1 as components
 
 # 모듈 임포트
-from data_loader import load_csv_file, load_geojson_file, process_population_data, process_geodata, merge_data
-from kidsroom_manager import load_kidsroom_data, get_kidsroom_file_hash
-from map_generator import create_population_map
-from ui_components import render_file_upload_section, render_kidsroom_input_section
+from config import PROFILING_MAX_RUNS
+from profiling import ProfileRun, span, current_run, runs_to_jsonl
+from kidsroom_manager import (
+    load_kidsroom_state, sync_kidsroom_list, get_kidsroom_file_hash, get_kidsroom_generation, get_kidsroom_watch_mode,
+)
+from pipeline_cache import get_merged_data, pipeline_cache_key, get_pipeline_cache_stats, get_population_cache_stats
+from render_cache import render_population_map_html, get_render_cache_stats
+from spatial_index import add_kidsroom_metrics, get_spatial_index_cache_stats
+from coverage import add_coverage_metrics, underserved_dongs, get_coverage_cache_stats
+from geo_client import get_client_metrics, metrics_to_prometheus
+from ui_components import render_api_key_status, render_file_upload_section, render_coverage_settings, render_trend_settings, render_kidsroom_input_section
+from population_store import ensure_population_store, list_months, add_trend_metrics, trend_key, get_population_store_cache_stats
 
 
 def initialize_session_state():
     """세션 스테이트 초기화"""
     if 'kidsroom_list' not in st.session_state:
-        st.session_state.kidsroom_list = load_kidsroom_data()
-    if 'kidsroom_file_hash' not in st.session_state:
-        st.session_state.kidsroom_file_hash = get_kidsroom_file_hash()
+        st.session_state.kidsroom_seq, st.session_state.kidsroom_list = load_kidsroom_state()
+    if 'kidsroom_generation' not in st.session_state:
+        st.session_state.kidsroom_generation = get_kidsroom_generation()
 
 
 def show_data_matching_info(merged):
@@ -29,21 +38,107 @@ def show_data_matching_info(merged):
     if matched_count == 0:
         st.warning("⚠️ 행정구역 매칭이 되지 않았습니다. 데이터를 확인해��세요.")
 
+    report = merged.attrs.get('join_report')
+    if report:
+        st.caption(f"행정코드 매칭 {report['matched_by_code']}개 · 동 이름 보완 {report['matched_by_name']}개")
+        unmatched_boundaries, unmatched_rows = report['unmatched_boundaries'], report['unmatched_rows']
+        if unmatched_boundaries or unmatched_rows:
+            with st.expander(f"⚠️ 매칭 안 된 항목 (경계 {len(unmatched_boundaries)}개, 인구 행 {len(unmatched_rows)}개)"):
+                st.caption("경계 파일과 인구 CSV의 행정동 개편 시점이 다르면 분동/통합된 동이 서로 매칭되지 않습니다")
+                if unmatched_boundaries:
+                    st.write("**인구 데이터가 없는 경계:** " + ", ".join(unmatched_boundaries))
+                if unmatched_rows:
+                    st.write("**경계가 없는 인구 행:** " + ", ".join(unmatched_rows))
+
+
+def show_coverage_summary(covered, summary):
+    """커버리지 요약 및 서비스 부족 동 표시"""
+    col1, col2, col3 = st.columns(3)
+    col1.metric(f"반경 {summary['radius_m']:,}m 안 인구", f"{summary['covered_population']:,.0f}명", f"{summary['covered_share'] * 100:.1f}%", delta_color="off")
+    col2.metric("반경 밖 아동인구", f"{summary['uncovered_children']:,.0f}명")
+    distance = summary['weighted_mean_distance_m']
+    col3.metric("인구가중 평균 거리", f"{distance:,.0f}m" if distance is not None else "-")
+
+    table = underserved_dongs(covered)
+    with st.expander(f"📉 서비스 부족 동 ({len(table)}곳)", expanded=False):
+        if table.empty:
+            st.caption("커버리지 비율이 기준 미만인 동이 없습니다")
+        else:
+            st.dataframe(table, width="stretch", hide_index=True)
+
+
+def show_profile(slot, run):
+    """이번 실행의 단계별 소요 시간/메모리 피크와 캐시 적중률을 디버그 패널 자리에 표시"""
+    run.record_caches({
+        '파이프라인': get_pipeline_cache_stats(),
+        '인구 CSV': get_population_cache_stats(),
+        '지도 렌더': get_render_cache_stats(),
+        '공간 인덱스': get_spatial_index_cache_stats(),
+        '인구 격자': get_coverage_cache_stats(),
+        '인구 추이': get_population_store_cache_stats(),
+    })
+    with slot.container():
+        for name, stats in run.caches.items():
+            size = f" ({stats['bytes'] / 1024:,.0f} KB)" if stats['bytes'] else ""
+            st.caption(f"{name} 캐시: {stats['size']}/{stats['max_entries']}개{size}, "
+                       f"적중 {stats['hits']} / 미스 {stats['misses']} ({stats['hit_rate'] * 100:.0f}%)")
+        if not run.enabled:
+            return
+        history = st.session_state.setdefault('profile_runs', [])
+        history.append(run)
+        del history[:-PROFILING_MAX_RUNS]
+
+        st.caption(f"이번 실행 {run.total_ms:,.0f}ms")
+        rows = [
+            {
+                '단계': '\u3000' * r['depth'] + r['name'],
+                'ms': round(r['ms'], 1),
+                '피크 KB': round(r['peak_kb']) if r['peak_kb'] is not None else None,
+                '속성': ', '.join(f"{k}={v}" for k, v in r['attrs'].items()),
+            }
+            for r in run.ordered_records()
+        ]
+        if rows:
+            st.dataframe(pd.DataFrame(rows), width="stretch", hide_index=True)
+        st.download_button(
+            f"📤 프로파일 내보내기 (최근 {len(history)}회, JSONL)", runs_to_jsonl(history),
+            file_name="profile.jsonl", mime="application/x-ndjson",
+        )
+
 
 def main():
-    """메인 애플리케이션"""
+    """메인 애플리케이션 (실행 전체를 프로파일링 구간으로 기록)"""
     st.set_page_config(page_title="도시별 인구 현황 및 키즈룸 분석", layout="wide")
 
+    run = ProfileRun(
+        enabled=st.session_state.get('profiling_enabled', True),
+        trace_memory=st.session_state.get('profiling_memory', False),
+    )
+    with run:
+        profile_slot = render_page()
+    show_profile(profile_slot, run)
+
+
+def render_page():
+    """페이지 렌더링 -> 프로파일 표시용 디버그 패널 자리 반환"""
     st.title("🧒 도시별 동별 인구 현황 및 키즈룸 지도")
     st.markdown("행정동별 총인구 데이터와 키즈룸 위치를 결합한 지도 기반 상권 분석 시각화")
 
+    render_api_key_status()
     initialize_session_state()
 
     csv_file_path, geo_file_path, use_files, map_type, mix_weight, opacity, city_name = render_file_upload_section()
+    coverage_radius, show_coverage_overlay = render_coverage_settings()
+    with span('ensure_population_store'):
+        ensure_population_store()
+    trend_start, trend_end = render_trend_settings(list_months(city_name))
+    if current_run() is not None:
+        current_run().label = f"{city_name}/{map_type}"
 
     # ==== 사이드바 디버그 / 동기화 기능 추가 ====
     with st.sidebar.expander("데이터 동기화 & 디버그", expanded=False):
-        st.caption(f"현재 kidsroom 파일 해시: {st.session_state.get('kidsroom_file_hash')}")
+        st.caption(f"현재 kidsroom 파일 해시: {get_kidsroom_file_hash()}")
+        st.caption(f"변경 감지: {get_kidsroom_watch_mode()} (세대 {st.session_state.get('kidsroom_generation')})")
         always_reload = st.checkbox("매 실행마다 kidsroom_data.json 강제 재로딩", value=st.session_state.get('always_reload', False))
         st.session_state.always_reload = always_reload
         if st.button("🔄 세션 초기화"):
@@ -51,10 +146,21 @@ def main():
             st.success("세션 스테이트 초기화 완료 (페이지 자동 새로고됨)")
             st.rerun()
         if st.button("📥 파일에서 강제 재로딩"):
-            st.session_state.kidsroom_list = load_kidsroom_data()
-            st.session_state.kidsroom_file_hash = get_kidsroom_file_hash()
+            st.session_state.kidsroom_seq, st.session_state.kidsroom_list = load_kidsroom_state()
+            st.session_state.kidsroom_generation = get_kidsroom_generation()
             st.success("파일 재로딩 완료")
             st.rerun()
+        # 단계별 프로파일 + 캐시 상태 (실행이 끝난 뒤 채움)
+        st.checkbox("단계별 프로파일링", value=True, key='profiling_enabled')
+        st.checkbox("메모리 피크 측정 (tracemalloc, 실행이 느려짐)", value=False, key='profiling_memory')
+        profile_slot = st.empty()
+        # 지오코딩 제공자 지연시간/오류
+        provider_metrics = get_client_metrics()
+        for provider, pm in provider_metrics.items():
+            lat_ms = pm['latency']
+            st.caption(f"{provider}: 요청 {pm['requests']} (오류 {pm['http_errors'] + pm['exceptions']}), p50 {lat_ms['p50_ms']:.0f}ms / p95 {lat_ms['p95_ms']:.0f}ms")
+        if provider_metrics:
+            st.download_button("📤 지오코딩 메트릭 내보내기", metrics_to_prometheus(provider_metrics), file_name="geocode_metrics.prom", mime="text/plain")
         # 데이터 요약
         kr_list = st.session_state.get('kidsroom_list', [])
         st.write(f"키즈룸 개수: {len(kr_list)}")
@@ -62,23 +168,33 @@ def main():
             preview_names = ', '.join(k['name'] for k in kr_list[:5])
             st.write(f"미리보기: {preview_names}{' ...' if len(kr_list)>5 else ''}")
 
-    # 파일 변경 감지 또는 항상 재로딩 옵션 적용
-    current_hash = get_kidsroom_file_hash()
+    # 파일 변경 감지 또는 항상 재로딩 옵션 적용 (파일을 읽지 않고 변경 감지 세대 번호만 비교)
+    generation = get_kidsroom_generation()
     if st.session_state.get('always_reload'):
-        st.session_state.kidsroom_list = load_kidsroom_data()
-        st.session_state.kidsroom_file_hash = current_hash
-    elif current_hash and current_hash != st.session_state.get('kidsroom_file_hash'):
-        st.info("🔁 파일 내용 변경 감지 → 자동 재로딩")
-        st.session_state.kidsroom_list = load_kidsroom_data()
-        st.session_state.kidsroom_file_hash = current_hash
+        st.session_state.kidsroom_seq, st.session_state.kidsroom_list = load_kidsroom_state()
+        st.session_state.kidsroom_generation = generation
+    elif st.session_state.get('kidsroom_seq') is None or generation != st.session_state.get('kidsroom_generation'):
+        # 마지막으로 본 seq 이후 바뀐 레코드만 반영 (이력이 없으면 전체 재로딩)
+        with span('sync_kidsroom_list'):
+            st.session_state.kidsroom_list, st.session_state.kidsroom_seq, changed = sync_kidsroom_list(
+                st.session_state.kidsroom_list, st.session_state.get('kidsroom_seq')
+            )
+        if changed:
+            st.info(f"🔁 파일 내용 변경 감지 → {changed}건 반영")
+        elif changed is None:
+            st.info("🔁 파일 내용 변경 감지 → 전체 재로딩")
+        st.session_state.kidsroom_generation = generation
 
     # ===== 상단 지도 우선 렌더링 =====
     if use_files:
-        df = load_csv_file(csv_file_path)
-        gdf = load_geojson_file(geo_file_path)
-        df = process_population_data(df)
-        gdf_filtered = process_geodata(gdf, city_name=city_name)
-        merged = merge_data(gdf_filtered, df)
+        merged = get_merged_data(csv_file_path, geo_file_path, city_name)
+        # 동별 키즈룸 수 / 아동 천 명당 키즈룸 / 최근접 거리 (경계 인덱스는 데이터셋마다 한 번 생성)
+        with span('add_kidsroom_metrics'):
+            merged = add_kidsroom_metrics(merged, st.session_state.kidsroom_list)
+        # 반경 안 인구 / 인구가중 거리 (인구 격자는 데이터셋마다 한 번 생성)
+        with span('add_coverage_metrics', radius_m=coverage_radius):
+            merged, coverage_summary = add_coverage_metrics(merged, st.session_state.kidsroom_list, coverage_radius)
+        merged = add_trend_metrics(merged, city_name, trend_start, trend_end)
 
         # 데이터 매칭 정보 & kidsroom ���약 상단 표시
         info_col1, info_col2 = st.columns([2,1])
@@ -91,14 +207,27 @@ def main():
                 st.caption(', '.join(k['name'] for k in st.session_state.kidsroom_list[:3]) + (" ..." if len(st.session_state.kidsroom_list)>3 else ""))
 
         st.subheader(f"📊 {city_name} 동별 인구 분포 지도")
-        population_map = create_population_map(merged, st.session_state.kidsroom_list, opacity, map_type, mix_weight)
-        st_folium(population_map, width=1200, height=600)
+        # 같은 데이터/스타일의 지도는 한 번만 렌더링하고 직렬화된 HTML을 재사용
+        # 렌더 캐시 키는 merged 전체를 해시하지 않고 merged를 만든 입력으로 정함
+        # (기본 데이터 파이프라인 키 + 커버리지 반경 + 추이 기간/저장소 세대, 키즈룸 목록은 렌더 캐시가 따로 해시)
+        data_key = (pipeline_cache_key(csv_file_path, geo_file_path, city_name), coverage_radius,
+                    trend_key(city_name, trend_start, trend_end))
+        map_html = render_population_map_html(
+            merged, st.session_state.kidsroom_list, opacity, map_type, mix_weight,
+            coverage_radius=coverage_radius if show_coverage_overlay else None,
+            data_key=data_key,
+        )
+        with span('components.html'):
+            components.html(map_html, width=1200, height=600)
+        with span('show_coverage_summary'):
+            show_coverage_summary(merged, coverage_summary)
 
         st.divider()
         st.subheader("🎪 키즈룸 위치 추가 / 관리")
         render_kidsroom_input_section()
     else:
         st.info("📁 CSV와 GeoJSON 파일을 모두 업로드하거나 기본 파일을 사용해주세요.")
+    return profile_slot
 
 
 if __name__ == "__main__":
@@ -0,0 +1,75 @@
+"""
+전체 도시 일괄 로드 모듈 - Streamlit 없이 실행 가능 (야간 리포트 등 헤드리스 용도)
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import geopandas as gpd
+import pandas as pd
+from config import CITIES, DEFAULT_GEO_FILE, get_city_csv_path
+from data_processing import read_population_csv, prepare_population_data, process_geodata, merge_data
+
+
+def _load_city_population(city, path):
+    """프로세스 풀 워커: 단일 도시 CSV 파싱 + 처리 -> (도시, DataFrame, 오류 메시지)"""
+    try:
+        return city, prepare_population_data(read_population_csv(path)), None
+    except Exception as e:
+        return city, None, str(e)
+
+
+def load_populations_parallel(cities=None, max_workers=None):
+    """도시별 인구 CSV를 프로세스 풀로 병렬 파싱
+
+    반환값: ({city: processed_df}, {city: 오류 메시지})
+    """
+    cities = list(CITIES if cities is None else cities)
+    jobs = []
+    errors = {}
+    for city in cities:
+        path = get_city_csv_path(city)
+        if not path or not path.endswith('.csv') or not os.path.exists(path):
+            errors[city] = f"도시 CSV 파일을 찾을 수 없습니다: {city}"
+        else:
+            jobs.append((city, path))
+
+    if max_workers is None:
+        max_workers = min(len(jobs), os.cpu_count() or 1)
+
+    if max_workers <= 1 or len(jobs) <= 1:
+        outcomes = [_load_city_population(city, path) for city, path in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = [pool.submit(_load_city_population, city, path) for city, path in jobs]
+            outcomes = [f.result() for f in futures]
+
+    result = {}
+    for city, df, error in outcomes:
+        if error is None:
+            result[city] = df
+        else:
+            errors[city] = error
+    return result, errors
+
+
+def build_all_cities(geo_path=DEFAULT_GEO_FILE, cities=None, max_workers=None):
+    """전체 도시 병합 GeoDataFrame 생성
+
+    경계 파일은 한 번만 읽고, 도시별로 필터/병합한 결과를 (city, adm_code) 인덱스로 결합
+    (동 이름은 도시 안에서도 겹치거나 읍/면이면 비어 있어 키로 쓰지 않음, adm_cd2가 없는 경계 파일이면 adm_code는 결측)
+    반환값: (combined_gdf, {city: 오류 메시지})
+    """
+    populations, errors = load_populations_parallel(cities, max_workers=max_workers)
+    boundaries = gpd.read_file(geo_path)
+
+    frames = []
+    for city, df in populations.items():
+        merged = merge_data(process_geodata(boundaries, city_name=city), df)
+        merged.insert(0, 'city', city)
+        frames.append(merged)
+
+    if not frames:
+        combined = gpd.GeoDataFrame(columns=['city', 'adm_code', 'geometry'], geometry='geometry', crs=boundaries.crs)
+    else:
+        combined = gpd.GeoDataFrame(pd.concat(frames, ignore_index=True), geometry='geometry', crs=boundaries.crs)
+    return combined.set_index(['city', 'adm_code']), errors
@@ -0,0 +1,63 @@
+"""
+import 시간 벤치마크 - 모듈마다 새 인터프리터에서 import 소요 시간과 함께 로드된 무거운 패키지 확인
+
+사용 예: python benchmarks/import_time.py --repeat 7 app config report_cli
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = ("config", "data_processing", "kidsroom_manager", "ui_components", "app", "report_cli")
+# 콜드 스타트에 영향이 큰 패키지 (import 후 sys.modules에 있으면 표시)
+HEAVY_PACKAGES = ("streamlit", "pandas", "geopandas", "pyproj", "folium", "requests", "geopy", "sqlite3", "asyncio")
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"ms": elapsed * 1000, "loaded": [p for p in {heavy!r} if p in sys.modules]}}))
+"""
+
+
+def measure(module, repeat=5, python=sys.executable):
+    """새 프로세스에서 repeat번 import -> {'module', 'median_ms', 'min_ms', 'loaded'}"""
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    code = _PROBE.format(module=module, heavy=HEAVY_PACKAGES)
+    samples, loaded = [], []
+    for _ in range(repeat):
+        out = subprocess.run([python, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        samples.append(result["ms"])
+        loaded = result["loaded"]
+    return {
+        "module": module,
+        "median_ms": statistics.median(samples),
+        "min_ms": min(samples),
+        "loaded": loaded,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="모듈 import 시간 측정 (콜드 스타트)")
+    parser.add_argument("modules", nargs="*", default=list(DEFAULT_MODULES))
+    parser.add_argument("--repeat", type=int, default=5, help="모듈마다 반복 횟수 (중앙값 보고)")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일")
+    args = parser.parse_args(argv)
+
+    results = [measure(module, args.repeat) for module in args.modules]
+    print(f"{'module':<20}{'median_ms':>12}{'min_ms':>10}  loaded")
+    for r in results:
+        print(f"{r['module']:<20}{r['median_ms']:>12.1f}{r['min_ms']:>10.1f}  {', '.join(r['loaded']) or '-'}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""
+데이터/지도 파이프라인 벤치마크 - 단계별 소요 시간(중앙값), 메모리 피크(tracemalloc), 지도 HTML 크기 측정 후 기준선과 비교
+
+데이터셋
+- 번들 데이터: data/ 의 도시별 CSV + 경기도 GeoJSON + 키즈룸 목록
+- gyeonggi_synthetic: 경기도 전체 행정동에 대한 합성 인구 CSV (같은 난수 시드로 항상 동일) + 합성 키즈룸 10,000개
+
+사용 예:
+    python benchmarks/pipeline_bench.py                     # 측정 후 benchmarks/baseline.json과 비교 (회귀 시 종료 코드 1)
+    python benchmarks/pipeline_bench.py --save-baseline     # 기준선 갱신 (requirements.txt로 설치한 환경에서)
+    python benchmarks/pipeline_bench.py --datasets 성남시 --repeat 3 --output /tmp/bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import numpy as np
+import pandas as pd
+import shapely
+from config import CITIES, DEFAULT_GEO_FILE, COVERAGE_DEFAULT_RADIUS_M, get_city_csv_path
+from data_loader import load_csv_file, load_geojson_file, process_population_data
+from data_processing import process_geodata, merge_data
+from kidsroom_manager import load_kidsroom_data
+from map_generator import _build_feature_collection, create_population_map
+from spatial_index import add_kidsroom_metrics, clear_spatial_index_cache
+from coverage import add_coverage_metrics, clear_coverage_cache
+
+BASELINE_FILE = os.path.join(ROOT, "benchmarks", "baseline.json")
+SYNTHETIC_DATASET = "gyeonggi_synthetic"
+SYNTHETIC_KIDSROOMS = 10_000
+SYNTHETIC_SEED = 20251031
+
+# 회귀 판정: 기준선 대비 배율을 넘고 절대 차이도 잡음 하한보다 클 때
+TIME_TOLERANCE = 1.3
+TIME_NOISE_MS = 5.0
+MEMORY_TOLERANCE = 1.3
+MEMORY_NOISE_KB = 512.0
+HTML_TOLERANCE = 1.02
+# 기준선과 설치된 버전이 다르면 비교하지 않는다 (라이브러리 변경이 회귀/개선으로 오인됨)
+VERSIONED_MODULES = (np, pd, shapely)
+
+
+def _population_row(name, rng, age_cols):
+    ages = rng.integers(50, 400, size=14)
+    total = int(ages.sum() * rng.uniform(6, 12))
+    row = {'행정구역': name}
+    for sex, share in (('계', 1.0), ('남', 0.49), ('여', 0.51)):
+        row[f'2025년10월_{sex}_총인구수'] = f"{int(total * share):,}"
+        row[f'2025년10월_{sex}_연령구간인구수'] = f"{int(ages.sum() * share):,}"
+        for age in range(14):
+            row[age_cols[sex][age]] = f"{int(ages[age] * share):,}"
+    return row
+
+
+def write_synthetic_population_csv(boundaries, path, seed=SYNTHETIC_SEED):
+    """경기도 전체 행정동에 대한 합성 인구 CSV (행정안전부 연령별 인구 현황 형식, 숫자는 천 단위 구분 문자열)
+
+    행정구역 끝에 10자리 코드를 붙여 merge_data가 코드로 병합 (같은 이름의 동, 읍/면 포함 모든 경계가 한 행씩 매칭)
+    """
+    rng = np.random.default_rng(seed)
+    age_cols = {sex: [f'2025년10월_{sex}_{age}세' for age in range(14)] for sex in ('계', '남', '여')}
+    rows = [_population_row(f"{adm_nm}({code})", rng, age_cols)
+            for adm_nm, code in zip(boundaries['adm_nm'], boundaries['adm_cd2'])]
+    pd.DataFrame(rows).to_csv(path, index=False, encoding='utf-8')
+    return path
+
+
+def synthetic_kidsrooms(boundaries, count=SYNTHETIC_KIDSROOMS, seed=SYNTHETIC_SEED):
+    """경계 안 무작위 좌표 키즈룸 count개 (같은 시드면 항상 동일)"""
+    rng = np.random.default_rng(seed)
+    area = shapely.union_all(np.asarray(boundaries.geometry.values, dtype=object))
+    shapely.prepare(area)
+    minx, miny, maxx, maxy = area.bounds
+    lats, lons = [], []
+    while len(lats) < count:
+        x = rng.uniform(minx, maxx, count)
+        y = rng.uniform(miny, maxy, count)
+        inside = shapely.contains_xy(area, x, y)
+        lons.extend(x[inside].tolist())
+        lats.extend(y[inside].tolist())
+    return [
+        {'id': f'bench{i:05d}', 'version': 1, 'name': f'키즈룸{i}', 'address': f'합성 주소 {i}', 'lat': lat, 'lon': lon}
+        for i, (lat, lon) in enumerate(zip(lats[:count], lons[:count]))
+    ]
+
+
+def _stages(csv_path, geo_path, city_name, kidsroom_list):
+    """(단계 이름, 함수(ctx)) 목록 - 앞 단계 결과를 ctx로 넘김"""
+    def map_html(ctx):
+        html = create_population_map(ctx['covered'], kidsroom_list).get_root().render()
+        ctx['html_bytes'] = len(html.encode('utf-8'))
+
+    def kidsroom_metrics(ctx):
+        clear_spatial_index_cache()
+        ctx['with_metrics'] = add_kidsroom_metrics(ctx['merged'], kidsroom_list)
+
+    def coverage_metrics(ctx):
+        clear_coverage_cache()
+        ctx['covered'], _ = add_coverage_metrics(ctx['with_metrics'], kidsroom_list, COVERAGE_DEFAULT_RADIUS_M)
+
+    return [
+        ('load_csv_file', lambda ctx: ctx.update(raw=load_csv_file(csv_path))),
+        ('process_population_data', lambda ctx: ctx.update(df=process_population_data(ctx['raw']))),
+        ('load_geojson_file', lambda ctx: ctx.update(boundaries=load_geojson_file(geo_path))),
+        ('process_geodata', lambda ctx: ctx.update(gdf=process_geodata(ctx['boundaries'], city_name=city_name))),
+        ('merge_data', lambda ctx: ctx.update(merged=merge_data(ctx['gdf'], ctx['df']))),
+        ('add_kidsroom_metrics', kidsroom_metrics),
+        ('add_coverage_metrics', coverage_metrics),
+        ('_build_feature_collection', lambda ctx: _build_feature_collection(ctx['merged'], ['총인구'])),
+        ('create_population_map', map_html),
+    ]
+
+
+def run_dataset(csv_path, geo_path, city_name, kidsroom_list, repeat=3):
+    """데이터셋 하나를 repeat번 실행 (시간) + tracemalloc 켜고 1번 실행 (메모리) -> {단계: 측정값}"""
+    stages = _stages(csv_path, geo_path, city_name, kidsroom_list)
+    samples = {name: [] for name, _ in stages}
+    ctx = {}
+    for _ in range(repeat):
+        ctx = {}
+        for name, fn in stages:
+            start = time.perf_counter()
+            fn(ctx)
+            samples[name].append((time.perf_counter() - start) * 1000)
+
+    peaks = {}
+    tracemalloc.start()
+    try:
+        mem_ctx = {}
+        for name, fn in stages:
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            fn(mem_ctx)
+            peaks[name] = (tracemalloc.get_traced_memory()[1] - current) / 1024
+    finally:
+        tracemalloc.stop()
+
+    result = {
+        name: {'median_ms': statistics.median(samples[name]), 'min_ms': min(samples[name]), 'peak_kb': peaks[name]}
+        for name, _ in stages
+    }
+    result['create_population_map']['html_bytes'] = ctx['html_bytes']
+    result['_meta'] = {'dongs': len(ctx['merged']), 'kidsrooms': len(kidsroom_list)}
+    return result
+
+
+def run_benchmarks(datasets=None, repeat=3, geo_path=DEFAULT_GEO_FILE):
+    datasets = list(datasets or (CITIES + [SYNTHETIC_DATASET]))
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in datasets:
+            if name == SYNTHETIC_DATASET:
+                boundaries = load_geojson_file(geo_path)
+                csv_path = write_synthetic_population_csv(boundaries, os.path.join(tmp, 'gyeonggi.csv'))
+                # 빈 문자열은 모든 시군구와 일치 -> 경기도 전체
+                results[name] = run_dataset(csv_path, geo_path, '', synthetic_kidsrooms(boundaries), repeat)
+            else:
+                results[name] = run_dataset(get_city_csv_path(name), geo_path, name, load_kidsroom_data(), repeat)
+            print(f"  {name}: 완료", file=sys.stderr)
+    return {
+        'meta': {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'repeat': repeat,
+            'versions': installed_versions(),
+        },
+        'results': results,
+    }
+
+
+def installed_versions():
+    return {m.__name__: m.__version__ for m in VERSIONED_MODULES}
+
+
+def version_mismatches(baseline):
+    """기준선 meta에 기록된 라이브러리 버전과 설치된 버전의 차이 -> ['numpy 2.3.4 -> 2.4.6', ...]"""
+    recorded = baseline.get('meta', {}).get('versions', {})
+    return [f"{name} {recorded.get(name, '?')} -> {version}"
+            for name, version in installed_versions().items() if recorded.get(name) != version]
+
+
+def compare(current, baseline):
+    """기준선 대비 비교 -> (표 행 목록, 회귀 목록)"""
+    rows, regressions = [], []
+    for dataset, stages in current['results'].items():
+        base_stages = baseline.get('results', {}).get(dataset, {})
+        for stage, m in stages.items():
+            if stage == '_meta':
+                continue
+            b = base_stages.get(stage)
+            row = {'dataset': dataset, 'stage': stage, **m}
+            if b:
+                row['time_ratio'] = m['median_ms'] / b['median_ms'] if b['median_ms'] else None
+                row['peak_ratio'] = m['peak_kb'] / b['peak_kb'] if b['peak_kb'] > 0 else None
+                if m['median_ms'] > b['median_ms'] * TIME_TOLERANCE and m['median_ms'] - b['median_ms'] > TIME_NOISE_MS:
+                    regressions.append(f"{dataset}/{stage}: 시간 {b['median_ms']:.1f} -> {m['median_ms']:.1f}ms")
+                if m['peak_kb'] > b['peak_kb'] * MEMORY_TOLERANCE and m['peak_kb'] - b['peak_kb'] > MEMORY_NOISE_KB:
+                    regressions.append(f"{dataset}/{stage}: 메모리 {b['peak_kb']:,.0f} -> {m['peak_kb']:,.0f}KB")
+                if 'html_bytes' in m and 'html_bytes' in b and m['html_bytes'] > b['html_bytes'] * HTML_TOLERANCE:
+                    regressions.append(f"{dataset}/{stage}: HTML {b['html_bytes']:,} -> {m['html_bytes']:,}B")
+            rows.append(row)
+    return rows, regressions
+
+
+def format_table(rows):
+    header = f"{'dataset':<20}{'stage':<28}{'median_ms':>11}{'x base':>8}{'peak_kb':>11}{'x base':>8}{'html_bytes':>12}"
+    lines = [header, '-' * len(header)]
+    for r in rows:
+        ratio = lambda v: f"{v:>8.2f}" if v is not None else f"{'-':>8}"
+        html = f"{r['html_bytes']:>12,}" if 'html_bytes' in r else f"{'':>12}"
+        lines.append(f"{r['dataset']:<20}{r['stage']:<28}{r['median_ms']:>11.1f}{ratio(r.get('time_ratio'))}"
+                     f"{r['peak_kb']:>11,.0f}{ratio(r.get('peak_ratio'))}{html}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="데이터/지도 파이프라인 벤치마크")
+    parser.add_argument("--datasets", nargs="+", choices=CITIES + [SYNTHETIC_DATASET], help="기본: 번들 도시 전체 + 합성 경기도")
+    parser.add_argument("--repeat", type=int, default=3, help="시간 측정 반복 횟수 (중앙값 보고)")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="비교할 기준선 JSON")
+    parser.add_argument("--save-baseline", action="store_true", help="이번 결과로 기준선 갱신")
+    parser.add_argument("--output", help="이번 결과를 저장할 JSON 파일")
+    parser.add_argument("--ignore-versions", action="store_true", help="라이브러리 버전이 기준선과 달라도 경고만 하고 비교")
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+    mismatches = version_mismatches(baseline) if baseline else []
+    if mismatches:
+        print("기준선과 라이브러리 버전이 다릅니다: " + ", ".join(mismatches), file=sys.stderr)
+        if not args.ignore_versions:
+            print("requirements.txt로 설치한 환경에서 실행하거나 --ignore-versions로 비교하세요", file=sys.stderr)
+            return 2
+
+    current = run_benchmarks(args.datasets, args.repeat)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(current, f, ensure_ascii=False, indent=2)
+
+    rows, regressions = compare(current, baseline)
+    print(format_table(rows))
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(current, f, ensure_ascii=False, indent=2)
+        print(f"\n기준선 저장: {args.baseline}")
+        return 0
+    if not baseline:
+        print("\n기준선이 없습니다 (--save-baseline으로 생성)")
+        return 0
+    if mismatches:
+        print("\n(주의) 라이브러리 버전이 달라 아래 판정은 참고용입니다: " + ", ".join(mismatches))
+    if regressions:
+        print("\n회귀 감지:\n  " + "\n  ".join(regressions))
+        return 1
+    print("\n회귀 없음")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
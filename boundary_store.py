@@ -0,0 +1,205 @@
+"""
+행정동 경계 저장소 모듈 - GeoJSON을 시군구(sggnm)별 GeoParquet로 변환하여 보관
+"""
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import unicodedata
+
+import geopandas as gpd
+import pandas as pd
+from config import BOUNDARY_STORE_DIR
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+MANIFEST_NAME = "manifest.json"
+STORE_FORMAT_VERSION = 1
+
+_thread_lock = threading.Lock()
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """파일 내용 SHA256 해시 (청크 단위로 읽어 메모리 사용 최소화)"""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _store_dir_for(geo_path, store_dir):
+    """원본 파일명별 저장소 하위 디렉토리 (NFC 정규화로 macOS 파일명 차이 흡수)"""
+    stem = os.path.splitext(os.path.basename(geo_path))[0]
+    return os.path.join(store_dir, unicodedata.normalize("NFC", stem))
+
+
+def _partition_filename(source_hash, sggnm):
+    key = hashlib.sha1(sggnm.encode('utf-8')).hexdigest()[:12]
+    return f"{source_hash[:12]}_{key}.parquet"
+
+
+def _read_manifest(path):
+    manifest_path = os.path.join(path, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        return None
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except Exception:
+        return None
+    if manifest.get("version") != STORE_FORMAT_VERSION:
+        return None
+    return manifest
+
+
+def _write_manifest(path, manifest):
+    """매니페스트 원자적 교체 (임시 파일 작성 후 os.replace)"""
+    fd, tmp_path = tempfile.mkstemp(dir=path, prefix=".manifest_", suffix=".json")
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, os.path.join(path, MANIFEST_NAME))
+
+
+@contextlib.contextmanager
+def _store_lock(path):
+    """저장소 생성 잠금 (프로세스 내부는 Lock, 프로세스 간은 잠금 파일) - 여러 세션이 동시에 처음 생성하는 경우 대비"""
+    with _thread_lock:
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, ".lock"), 'a+b') as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _write_partition(path, fname, part):
+    """파티션 원자적 교체 (임시 파일 작성 후 os.replace, 읽는 쪽이 쓰는 중인 파일을 보지 않도록)"""
+    fd, tmp_path = tempfile.mkstemp(dir=path, prefix=".part_", suffix=".parquet")
+    os.close(fd)
+    try:
+        # 원본 인덱스를 함께 저장하여 로드 시 원래 행 순서/라벨 복원
+        part.to_parquet(tmp_path, index=True)
+        os.replace(tmp_path, os.path.join(path, fname))
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _build_locked(geo_path, path):
+    """GeoJSON 전체를 한 번 파싱하여 파티션/매니페스트 생성 (_store_lock 안에서 호출)"""
+    source_hash = file_sha256(geo_path)
+    stat = os.stat(geo_path)
+    gdf = gpd.read_file(geo_path)
+
+    partitions = {}
+    for sggnm, part in gdf.groupby("sggnm", sort=False):
+        fname = _partition_filename(source_hash, sggnm)
+        _write_partition(path, fname, part)
+        partitions[sggnm] = {"file": fname, "rows": len(part)}
+
+    manifest = {
+        "version": STORE_FORMAT_VERSION,
+        "source": os.path.basename(geo_path),
+        "source_sha256": source_hash,
+        "source_size": stat.st_size,
+        "source_mtime_ns": stat.st_mtime_ns,
+        "crs": gdf.crs.to_string() if gdf.crs is not None else None,
+        "columns": list(gdf.columns),
+        "partitions": partitions,
+    }
+    _write_manifest(path, manifest)
+
+    # 이전 버전 파티션과 중단된 생성의 임시 파일 정리 (잠금 안이라 다른 생성 작업이 쓰는 중인 파일은 없음)
+    live = {p["file"] for p in partitions.values()}
+    for name in os.listdir(path):
+        if name.endswith(".parquet") and name not in live:
+            try:
+                os.remove(os.path.join(path, name))
+            except OSError:
+                pass
+    return manifest
+
+
+def _is_current(geo_path, path, manifest):
+    """매니페스트가 원본과 일치하는지 (크기/mtime이 같으면 해시 계산 없이 통과, mtime만 바뀌었으면 매니페스트 갱신)"""
+    if manifest is None:
+        return False
+    stat = os.stat(geo_path)
+    if stat.st_size == manifest["source_size"] and stat.st_mtime_ns == manifest["source_mtime_ns"]:
+        return True
+    if stat.st_size == manifest["source_size"] and file_sha256(geo_path) == manifest["source_sha256"]:
+        # 내용은 동일하고 mtime만 변경된 경우 (git checkout 등)
+        manifest["source_mtime_ns"] = stat.st_mtime_ns
+        _write_manifest(path, manifest)
+        return True
+    return False
+
+
+def build_boundary_store(geo_path, store_dir=BOUNDARY_STORE_DIR):
+    """GeoJSON 전체를 한 번 파싱하여 sggnm별 GeoParquet 파티션과 매니페스트 생성"""
+    path = _store_dir_for(geo_path, store_dir)
+    with _store_lock(path):
+        return _build_locked(geo_path, path)
+
+
+def ensure_boundary_store(geo_path, store_dir=BOUNDARY_STORE_DIR):
+    """저장소가 원본과 일치하면 매니페스트 반환, 아니면 재생성
+
+    크기/mtime이 같으면 잠금/해시 계산 없이 통과. 재생성은 잠금을 잡은 뒤 다시 확인하므로
+    여러 세션이 동시에 요청해도 한 번만 생성
+    """
+    path = _store_dir_for(geo_path, store_dir)
+    manifest = _read_manifest(path)
+    if manifest is not None:
+        stat = os.stat(geo_path)
+        if stat.st_size == manifest["source_size"] and stat.st_mtime_ns == manifest["source_mtime_ns"]:
+            return manifest
+
+    with _store_lock(path):
+        manifest = _read_manifest(path)
+        if _is_current(geo_path, path, manifest):
+            return manifest
+        return _build_locked(geo_path, path)
+
+
+def load_city_boundaries(geo_path, city_name, store_dir=BOUNDARY_STORE_DIR):
+    """선택한 도시(sggnm에 city_name 포함)의 파티션만 읽어 GeoDataFrame 반환
+
+    읽기는 잠그지 않으므로, 매니페스트를 읽은 뒤 다른 프로세스가 재구축하며 이전 파티션을 지우면
+    FileNotFoundError가 날 수 있음 -> 매니페스트를 다시 읽어 한 번 재시도
+    """
+    path = _store_dir_for(geo_path, store_dir)
+    for attempt in range(2):
+        manifest = ensure_boundary_store(geo_path, store_dir)
+        try:
+            frames = [
+                gpd.read_parquet(os.path.join(path, info["file"]))
+                for sggnm, info in manifest["partitions"].items()
+                if city_name in sggnm
+            ]
+            break
+        except FileNotFoundError:
+            if attempt:
+                raise
+    if not frames:
+        return gpd.GeoDataFrame(columns=manifest["columns"], geometry="geometry", crs=manifest["crs"])
+
+    gdf = pd.concat(frames) if len(frames) > 1 else frames[0]
+    return gpd.GeoDataFrame(gdf, geometry="geometry", crs=manifest["crs"]).sort_index()
@@ -0,0 +1,275 @@
+"""
+대량 지오코딩 모듈 - CSV/Excel 주소 목록을 asyncio로 동시 변환하여 키즈룸 일괄 등록
+(Streamlit 비의존: 진행 상황은 on_result 콜백으로 전달)
+"""
+import asyncio
+import random
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import pandas as pd
+from config import (
+    get_kakao_api_key,
+    BULK_GEOCODE_CONCURRENCY,
+    BULK_GEOCODE_MAX_RETRIES,
+    BULK_GEOCODE_PROVIDER_RATES,
+)
+from geocode_cache import cached_geocode, normalize_address
+from geo_client import get_client, KAKAO_KEYWORD_PATH, KAKAO_ADDRESS_PATH, NOMINATIM_SEARCH_PATH, NOMINATIM_USER_AGENT
+
+NAME_COLUMNS = ("이름", "name", "상호", "업체명", "키즈룸")
+ADDRESS_COLUMNS = ("주소", "address", "도로명주소", "지번주소")
+
+_RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class ProviderError(Exception):
+    """재시도 후에도 제공자 응답을 받지 못한 경우"""
+
+
+@dataclass
+class BulkGeocodeResult:
+    index: int
+    address: str
+    name: str | None
+    lat: float | None = None
+    lon: float | None = None
+    found_address: str | None = None
+    place_name: str | None = None
+    provider: str | None = None
+    cached: bool = False
+    error: str | None = None
+
+    @property
+    def ok(self):
+        return self.lat is not None and self.lon is not None
+
+
+class AsyncRateLimiter:
+    """제공자별 초당 요청 수 제한 (요청 시작 시각을 일정 간격으로 배치)"""
+
+    def __init__(self, rate_per_sec):
+        self.interval = 1.0 / rate_per_sec if rate_per_sec else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class BulkGeocoder:
+    def __init__(self, client=None, concurrency=BULK_GEOCODE_CONCURRENCY, max_retries=BULK_GEOCODE_MAX_RETRIES,
+                 provider_rates=None, use_cache=True):
+        self.client = client or get_client()
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.use_cache = use_cache
+        self._rates = dict(BULK_GEOCODE_PROVIDER_RATES if provider_rates is None else provider_rates)
+        self._kakao_headers = {"Authorization": f"KakaoAK {get_kakao_api_key()}"}
+
+    async def _get_json(self, limiters, provider, path, params, headers):
+        """레이트 리밋 + 지수 백오프 재시도 GET -> JSON 응답 (실패 시 ProviderError)"""
+        import requests  # 지오코딩을 실제로 할 때만 로드
+        limiter = limiters[provider]
+        for attempt in range(self.max_retries + 1):
+            await limiter.acquire()
+            try:
+                response = await asyncio.to_thread(self.client.get, provider, path, params=params, headers=headers)
+            except requests.RequestException as e:
+                if attempt == self.max_retries:
+                    raise ProviderError(f"{provider}: {e}") from e
+            else:
+                if response.status_code == 200:
+                    return response.json()
+                if response.status_code not in _RETRY_STATUS or attempt == self.max_retries:
+                    raise ProviderError(f"{provider}: HTTP {response.status_code}")
+            await asyncio.sleep(min(8.0, 0.5 * 2 ** attempt) * (0.5 + random.random()))
+        raise ProviderError(provider)
+
+    async def _kakao(self, limiters, path, query):
+        data = await self._get_json(limiters, "kakao", path, {"query": query}, self._kakao_headers)
+        docs = data.get("documents") or []
+        return docs[0] if docs else None
+
+    async def _resolve(self, address, limiters):
+        """geocoding.geocode_address와 같은 순서로 제공자 조회
+
+        반환값: (lat, lon, found_address, place_name, provider, cacheable)
+        """
+        errors = 0
+
+        try:
+            doc = await self._kakao(limiters, KAKAO_KEYWORD_PATH, address)
+            if doc:
+                return float(doc["y"]), float(doc["x"]), doc.get("address_name", address), doc.get("place_name", ""), "kakao_keyword", True
+        except ProviderError:
+            errors += 1
+
+        try:
+            doc = await self._kakao(limiters, KAKAO_ADDRESS_PATH, address)
+            if doc:
+                return float(doc["y"]), float(doc["x"]), address, "", "kakao_address", True
+        except ProviderError:
+            errors += 1
+
+        simplified = re.sub(r'\s*\d+층.*|\s*\d+호.*', '', address)
+        if simplified != address:
+            try:
+                doc = await self._kakao(limiters, KAKAO_ADDRESS_PATH, simplified)
+                if doc:
+                    return float(doc["y"]), float(doc["x"]), simplified, "", "kakao_address_simplified", True
+            except ProviderError:
+                errors += 1
+
+        try:
+            data = await self._get_json(
+                limiters, "nominatim", NOMINATIM_SEARCH_PATH,
+                {"q": address, "format": "json", "limit": 1},
+                {"User-Agent": NOMINATIM_USER_AGENT},
+            )
+            if data:
+                return float(data[0]["lat"]), float(data[0]["lon"]), address, "", "nominatim", True
+        except ProviderError:
+            errors += 1
+
+        return None, None, None, None, None, errors == 0
+
+    async def _cached_resolve(self, address, limiters, executor):
+        """geocode_cache.cached_geocode(임대 + 주소별 잠금)를 거쳐 조회
+
+        cached_geocode는 동기 함수라 전용 스레드에서 실행하고, 캐시 미스일 때 호출되는 resolve는
+        이벤트 루프에 _resolve를 맡긴 뒤 결과를 기다림 (기본 스레드 풀은 _get_json의 HTTP 요청용으로 남겨둠)
+        """
+        loop = asyncio.get_running_loop()
+        cacheable = True
+
+        def resolve(addr):
+            nonlocal cacheable
+            coro = self._resolve(addr, limiters)
+            try:
+                future = asyncio.run_coroutine_threadsafe(coro, loop)
+            except RuntimeError:
+                coro.close()  # 스트림이 닫히고 루프도 종료된 뒤 -> 조회하지 않음 (캐시에도 저장 안 됨)
+                raise
+            *found, cacheable = future.result()
+            return (*found, cacheable)
+
+        (lat, lon, found, place, provider), from_cache = await loop.run_in_executor(
+            executor, cached_geocode, address, resolve)
+        return lat, lon, found, place, provider, cacheable, from_cache
+
+    async def _geocode_one(self, index, name, address, semaphore, limiters, executor):
+        result = BulkGeocodeResult(index=index, address=address, name=name)
+        async with semaphore:
+            try:
+                if self.use_cache:
+                    lat, lon, found, place, provider, cacheable, result.cached = await self._cached_resolve(
+                        address, limiters, executor)
+                else:
+                    lat, lon, found, place, provider, cacheable = await self._resolve(address, limiters)
+                result.lat, result.lon, result.found_address, result.place_name, result.provider = lat, lon, found, place, provider
+                if not result.ok:
+                    result.error = "주소를 찾을 수 없음" if cacheable else "API 오류"
+            except Exception as e:
+                result.error = str(e)
+        return result
+
+    async def geocode_stream(self, rows):
+        """rows: [(name, address)] -> 완료 순서대로 BulkGeocodeResult 생성 (async generator)
+
+        같은 정규화 주소는 한 번만 조회하고 결과를 공유
+        """
+        # 호출마다 새로 만들어 인자로 전달 (같은 인스턴스의 동시 스트림이 서로의 제한기를 덮어쓰지 않도록)
+        limiters = {p: AsyncRateLimiter(r) for p, r in self._rates.items()}
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        first_index = {}
+        duplicates = {}
+        tasks = []
+        # 스트림을 끝까지 소비하지 않고 닫아도 이벤트 루프를 막지 않도록 기다리지 않고 종료
+        executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="geocode-cache")
+        try:
+            for i, (name, address) in enumerate(rows):
+                key = normalize_address(address)
+                if key in first_index:
+                    duplicates.setdefault(first_index[key], []).append((i, name))
+                    continue
+                first_index[key] = i
+                tasks.append(asyncio.create_task(self._geocode_one(i, name, address, semaphore, limiters, executor)))
+
+            for fut in asyncio.as_completed(tasks):
+                result = await fut
+                yield result
+                for dup_index, dup_name in duplicates.get(result.index, []):
+                    yield BulkGeocodeResult(
+                        index=dup_index, address=result.address, name=dup_name, lat=result.lat, lon=result.lon,
+                        found_address=result.found_address, place_name=result.place_name,
+                        provider=result.provider, cached=True, error=result.error,
+                    )
+        finally:
+            for task in tasks:
+                task.cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def geocode_all(self, rows, on_result=None):
+        """동기 진입점: 전체 결과를 입력 순서대로 반환 (on_result는 완료될 때마다 호출)"""
+        async def run():
+            results = []
+            async for result in self.geocode_stream(rows):
+                results.append(result)
+                if on_result is not None:
+                    on_result(result, len(results), len(rows))
+            return results
+
+        return sorted(asyncio.run(run()), key=lambda r: r.index)
+
+
+def _pick_column(columns, candidates):
+    lowered = {str(c).strip().lower(): c for c in columns}
+    for cand in candidates:
+        if cand.lower() in lowered:
+            return lowered[cand.lower()]
+    return None
+
+
+def read_address_file(source, filename=None):
+    """CSV/Excel 주소 목록 읽기 -> [(name 또는 None, address)]
+
+    주소 컬럼은 '주소'/'address' 등 이름으로 찾고, 없으면 첫 번째 컬럼 사용
+    """
+    filename = filename or getattr(source, "name", source if isinstance(source, str) else "")
+    if str(filename).lower().endswith(".xlsx"):
+        df = pd.read_excel(source, dtype=str)
+    else:
+        if hasattr(source, "seek"):
+            source.seek(0)
+        try:
+            df = pd.read_csv(source, dtype=str, encoding="utf-8-sig")
+        except UnicodeDecodeError:
+            if hasattr(source, "seek"):
+                source.seek(0)
+            df = pd.read_csv(source, dtype=str, encoding="cp949")
+
+    address_col = _pick_column(df.columns, ADDRESS_COLUMNS) or df.columns[0]
+    name_col = _pick_column(df.columns, NAME_COLUMNS)
+    addresses = df[address_col].fillna("").str.strip().tolist()
+    names = df[name_col].fillna("").str.strip().tolist() if name_col is not None else [""] * len(df)
+    return [(name or None, address) for name, address in zip(names, addresses) if address]
+
+
+def results_to_kidsrooms(results):
+    """성공한 결과를 kidsroom 레코드로 변환 (이름: 파일 값 → 장소명 → 주소 마지막 단어)"""
+    records = []
+    for r in results:
+        if not r.ok:
+            continue
+        name = r.name or r.place_name or (r.address.split()[-1] if r.address else "키즈룸")
+        records.append({"name": name, "address": r.found_address or r.address, "lat": r.lat, "lon": r.lon})
+    return records
@@ -2,23 +2,49 @@
 설정 파일
 """
 
-import streamlit as st
 import os
 import unicodedata
+from functools import lru_cache
 
-# 카카오 API 키 (Streamlit Secrets 또는 환경변수에서 로드)
-# 우선순위: st.secrets -> 환경변수 -> 빈 문자열
-_kakao_secret = st.secrets.get("KAKAO_API_KEY") if hasattr(st, 'secrets') else None
-_env_key = os.environ.get("KAKAO_API_KEY")
 
-if _kakao_secret:
-    KAKAO_API_KEY = _kakao_secret
-elif _env_key:
-    KAKAO_API_KEY = _env_key
-    st.info("환경변수 KAKAO_API_KEY 사용 중")
-else:
-    KAKAO_API_KEY = ""
-    st.warning("KAKAO_API_KEY가 설정되지 않았습니다. .streamlit/secrets.toml 또는 환경변수로 설정해주세요.")
+# 카카오 API 키 우선순위: st.secrets -> 환경변수 -> 빈 문자열
+# import 시점에는 아무것도 읽지 않음 (UI 메시지는 앱이 get_kakao_api_key_source()로 직접 표시)
+def resolve_kakao_api_key(secrets=None, environ=None):
+    """주어진 secrets/환경변수 매핑에서 키와 출처 결정 -> (키, 'secrets' | 'env' | None)"""
+    secret = (secrets or {}).get("KAKAO_API_KEY")
+    if secret:
+        return secret, "secrets"
+    env_key = (environ or {}).get("KAKAO_API_KEY")
+    if env_key:
+        return env_key, "env"
+    return "", None
+
+
+def _read_streamlit_secrets():
+    """st.secrets 읽기 (secrets.toml이 없는 헤드리스 실행에서도 실패하지 않도록 빈 dict로 대체)"""
+    try:
+        import streamlit as st
+        return {"KAKAO_API_KEY": st.secrets.get("KAKAO_API_KEY")}
+    except Exception:
+        return {}
+
+
+@lru_cache(maxsize=1)
+def _load_kakao_api_key():
+    # st.secrets를 읽으면 최상위 항목이 환경변수로 복사되므로 환경변수를 먼저 스냅샷
+    environ = dict(os.environ)
+    return resolve_kakao_api_key(_read_streamlit_secrets(), environ)
+
+
+def get_kakao_api_key():
+    """카카오 API 키 (첫 호출 시 한 번만 확인)"""
+    return _load_kakao_api_key()[0]
+
+
+def get_kakao_api_key_source():
+    """카카오 API 키 출처 ('secrets' / 'env' / 설정 안 됨이면 None)"""
+    return _load_kakao_api_key()[1]
+
 
 # ===== 도시별 기본 CSV 파일 매핑 추가 =====
 DEFAULT_CITY = "성남시"
@@ -32,12 +58,115 @@ CITIES = list(CITY_FILE_MAP.keys())
 
 # 기본 CSV 파일 (도시 postfix 적용)
 DEFAULT_CSV_FILE = CITY_FILE_MAP.get(DEFAULT_CITY)
-DEFAULT_GEO_FILE = "data/HangJeongDong_ver20250401.geojson"
+DEFAULT_GEO_FILE = "data/hangjeongdong_경기도.geojson"
 KIDSROOM_DATA_FILE = "data/kidsroom_data.json"
+# 키즈룸 변경 저널 (스냅샷 이후 변경 내역) / 압축 주기(건) / 보관할 스냅샷 개수
+KIDSROOM_JOURNAL_FILE = "data/kidsroom_journal.jsonl"
+KIDSROOM_COMPACT_EVERY = 200
+KIDSROOM_SNAPSHOT_KEEP = 10
+# 키즈룸 파일 변경 감지: "auto"(Linux면 inotify 감시 스레드, 아니면 stat 비교) / "inotify" / "poll"
+KIDSROOM_WATCH_MODE = os.environ.get("KIDSROOM_WATCH_MODE", "auto")
+# 키즈룸 검색 인덱스 - 역색인 n-gram 길이 / 삭제·수정으로 남은 묘비가 이 비율을 넘으면 역색인 재구성
+KIDSROOM_SEARCH_NGRAM = 2
+KIDSROOM_SEARCH_REBUILD_RATIO = 0.25
+
+# 행정동 경계 GeoParquet 저장소 (GeoJSON 최초 1회 변환 후 도시별 로드)
+BOUNDARY_STORE_DIR = "data/boundary_store"
+
+# 병합 파이프라인 결과 캐시 최대 항목 수 (서버 프로세스 전체 공유, LRU 방출)
+PIPELINE_CACHE_MAX_ENTRIES = 16
+# 처리된 인구 CSV 캐시 최대 항목 수 (CSV 내용 해시 기준, 경계 파일/도시가 바뀌어도 재파싱 안 함)
+POPULATION_CACHE_MAX_ENTRIES = 16
+# 인구 CSV 인코딩 판별에 쓰는 앞부분 바이트 수 (UTF-8로 디코딩되지 않으면 CP949)
+CSV_ENCODING_PROBE_BYTES = 64 * 1024
+
+# 인구 시계열 저장소 (도시 x 기준 월 Parquet 파티션) / 추이 지표 캐시 최대 항목 수
+POPULATION_STORE_DIR = "data/population_store"
+POPULATION_STORE_CACHE_MAX_ENTRIES = 32
+
+# 아동 연령대 구간 (이름, 시작 나이, 끝 나이 포함) - 동별 '아동_<이름>' 컬럼과 지도 시각화 기준으로 사용
+CHILD_AGE_BANDS = (
+    ("0~3세", 0, 3),
+    ("4~7세", 4, 7),
+    ("8~13세", 8, 13),
+)
+# 아동인구로 합산할 최대 나이 (0세 ~ CHILD_MAX_AGE세)
+CHILD_MAX_AGE = 13
+# 연령대별 아동인구 컬럼 이름
+CHILD_BAND_COLUMNS = tuple(f"아동_{label}" for label, _, _ in CHILD_AGE_BANDS)
+
+# 면적/거리 계산용 투영 좌표계 (미터 단위, 중부원점 TM)
+METRIC_CRS_EPSG = 5186
+# 행정동 공간 인덱스(STRtree) 캐시 최대 항목 수 (병합 데이터셋당 1개)
+SPATIAL_INDEX_CACHE_MAX_ENTRIES = 16
+
+# 커버리지 분석 - 인구 격자 크기(m) / 기본 반경(m) / 커버 인구 비율이 이 값 미만이면 서비스 부족 동
+COVERAGE_GRID_CELL_M = 100
+COVERAGE_DEFAULT_RADIUS_M = 1000
+COVERAGE_UNDERSERVED_SHARE = 0.5
+# 격자 생성/거리 계산 시 한 번에 처리할 점 개수 (메모리 상한)
+COVERAGE_CHUNK_SIZE = 200_000
+
+# 지오코딩 영구 캐시 (SQLite) - 성공 결과 TTL / 실패 결과 TTL / 동시 조회 임대 시간(초)
+GEOCODE_CACHE_FILE = "data/geocode_cache.sqlite3"
+GEOCODE_CACHE_TTL = 90 * 24 * 3600
+GEOCODE_NEGATIVE_TTL = 6 * 3600
+GEOCODE_LEASE_TIMEOUT = 30
+
+# 지오코딩 제공자 API 주소 (환경변수로 로컬 스텁 서버 지정 가능) / 요청 타임아웃(초) / 연결 풀 크기
+GEOCODE_PROVIDER_URLS = {
+    "kakao": os.environ.get("KAKAO_API_BASE_URL", "https://dapi.kakao.com"),
+    "nominatim": os.environ.get("NOMINATIM_BASE_URL", "https://nominatim.openstreetmap.org"),
+}
+GEOCODE_PROVIDER_TIMEOUTS = {"kakao": 5, "nominatim": 10}
+GEOCODE_POOL_SIZE = 16
+
+# 대량 지오코딩 - 동시 요청 수 / 재시도 횟수 / 제공자별 초당 요청 수
+BULK_GEOCODE_CONCURRENCY = 8
+BULK_GEOCODE_MAX_RETRIES = 3
+BULK_GEOCODE_PROVIDER_RATES = {"kakao": 10.0, "nominatim": 1.0}
 
 # 지도 설정
 MAP_CENTER = [37.4, 127.13]
 MAP_ZOOM_START = 12
+# 지도 HTML에 넣는 경계 좌표 소수점 자릿수 (5자리 ≈ 1.1m)
+MAP_COORD_PRECISION = 5
+# 동 레이어 렌더링 방식: "single"(단일 GeoJson + 일괄 라벨) / "per_feature"(동마다 개별 레이어)
+DONG_LAYER_MODE = "single"
+# 키즈룸 마커 렌더링 방식: "icon"(아이콘 마커) / "canvas"(캔버스 원 마커) / "auto"(KIDSROOM_CANVAS_MARKER_THRESHOLD개 이상이면 canvas)
+# 어느 방식이든 키즈룸 정보는 JS 배열 하나로 싣고 팝업은 클릭할 때 만듦
+KIDSROOM_MARKER_MODE = "auto"
+KIDSROOM_CANVAS_MARKER_THRESHOLD = 500
+
+# 지도 시각화 기준(map_type = merged 컬럼명) -> 색상표 / 범례 / 표시 단위 / 소수 자릿수 / 화면 표시 이름
+# (사이드바가 folium을 불러오지 않고도 선택지를 그릴 수 있도록 map_generator가 아닌 설정에 둠)
+CHOROPLETH_METRICS = {
+    '총인구': {'fill_color': 'YlOrRd', 'legend': '총인구수', 'unit': '명', 'digits': 0, 'label': '총인구'},
+    '인구밀도': {'fill_color': 'PuBuGn', 'legend': '인구밀도 (명/km²)', 'unit': '명/km²', 'digits': 0, 'label': '인구밀도'},
+    '아동인구': {'fill_color': 'YlGn', 'legend': f'아동인구 (0~{CHILD_MAX_AGE}세)', 'unit': '명', 'digits': 0, 'label': '아동인구'},
+    **{
+        col: {'fill_color': 'YlGn', 'legend': f'아동인구 ({label})', 'unit': '명', 'digits': 0, 'label': f'아동인구 {label}'}
+        for col, (label, _, _) in zip(CHILD_BAND_COLUMNS, CHILD_AGE_BANDS)
+    },
+    '키즈룸수': {'fill_color': 'BuPu', 'legend': '키즈룸 수', 'unit': '개', 'digits': 0, 'label': '키즈룸 수'},
+    '아동천명당_키즈룸': {'fill_color': 'BuPu', 'legend': f'아동(0~{CHILD_MAX_AGE}세) 1,000명당 키즈룸 수', 'unit': '개', 'digits': 2, 'label': '아동 천 명당 키즈룸'},
+    '최근접_키즈룸거리': {'fill_color': 'OrRd', 'legend': '동 중심에서 가장 가까운 키즈룸까지 거리 (m)', 'unit': 'm', 'digits': 0, 'label': '가장 가까운 키즈룸 거리'},
+    '커버리지_비율': {'fill_color': 'RdYlGn', 'legend': '키즈룸 반경 안 인구 비율 (%)', 'unit': '%', 'digits': 1, 'label': '커버리지 비율'},
+    '미커버_아동인구': {'fill_color': 'Reds', 'legend': '키즈룸 반경 밖 아동인구', 'unit': '명', 'digits': 0, 'label': '반경 밖 아동인구'},
+    '인구가중_평균거리': {'fill_color': 'OrRd', 'legend': '주민 기준 가장 가까운 키즈룸까지 평균 거리 (m)', 'unit': 'm', 'digits': 0, 'label': '인구가중 평균 거리'},
+    # 인구 시계열 저장소 추이 지표 (diverging=True면 0을 가운데 두는 대칭 구간으로 색칠)
+    '기간_인구증감': {'fill_color': 'RdBu', 'legend': '기간 인구 증감 (명)', 'unit': '명', 'digits': 0, 'label': '기간 인구 증감', 'diverging': True},
+    '기간_인구증감률': {'fill_color': 'RdBu', 'legend': '기간 인구 증감률 (%)', 'unit': '%', 'digits': 2, 'label': '기간 인구 증감률', 'diverging': True},
+    '전월대비_인구증감': {'fill_color': 'RdBu', 'legend': '전월 대비 인구 증감 (명)', 'unit': '명', 'digits': 0, 'label': '전월 대비 인구 증감', 'diverging': True},
+    '전월대비_아동인구증감': {'fill_color': 'RdBu', 'legend': f'전월 대비 아동인구(0~{CHILD_MAX_AGE}세) 증감 (명)', 'unit': '명', 'digits': 0, 'label': '전월 대비 아동인구 증감', 'diverging': True},
+}
+
+# 디버그 패널 프로파일링 - 세션마다 보관할 최근 실행 수 (JSON lines 내보내기 대상)
+PROFILING_MAX_RUNS = 50
+
+# 렌더링된 지도 HTML 캐시 한도 (항목 수 / 총 바이트, LRU 방출)
+MAP_RENDER_CACHE_MAX_ENTRIES = 64
+MAP_RENDER_CACHE_MAX_BYTES = 256 * 1024 * 1024
 
 
 def _normalize_existing(path: str) -> str:
@@ -0,0 +1,184 @@
+"""
+커버리지 분석 모듈 - 키즈룸 반경 X m 안의 인구, 인구가중 거리, 서비스 부족 동 (격자 기반 벡터 연산)
+
+행정동 경계 안에 정사각 격자(투영 좌표계, COVERAGE_GRID_CELL_M 간격)를 깔고 동 인구를 격자에 균등 배분한 뒤,
+격자점마다 가장 가까운 키즈룸까지 거리를 STRtree로 한 번에 계산. 격자는 병합 데이터셋마다 한 번 만들어 캐시
+"""
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+from config import (
+    METRIC_CRS_EPSG,
+    SPATIAL_INDEX_CACHE_MAX_ENTRIES,
+    COVERAGE_GRID_CELL_M,
+    COVERAGE_UNDERSERVED_SHARE,
+    COVERAGE_CHUNK_SIZE,
+)
+from pipeline_cache import LRUCache, geometry_hash
+from profiling import span
+from spatial_index import KIDSROOM_CRS, kidsroom_coordinates
+
+# add_coverage_metrics가 추가하는 컬럼
+COVERAGE_METRIC_COLUMNS = ('커버리지_비율', '커버_인구', '미커버_아동인구', '인구가중_평균거리')
+
+
+class PopulationGrid:
+    """행정동 경계 안의 격자점 (투영 좌표계 x/y, 소속 동 위치, 동 인구 중 격자점 하나가 차지하는 비율)"""
+
+    def __init__(self, merged, cell_m=COVERAGE_GRID_CELL_M, chunk_size=COVERAGE_CHUNK_SIZE):
+        self.cell_m = cell_m
+        self.chunk_size = chunk_size
+        projected = merged.geometry.to_crs(epsg=METRIC_CRS_EPSG)
+        polygons = np.asarray(projected.values, dtype=object)
+        n = len(polygons)
+        cell_ids, dong_all = [], []
+
+        if n:
+            # 동마다 경계 상자 범위의 격자점만 만들어 준비된(prepared) 경계로 포함 여부 판정
+            # (전체 격자점을 STRtree에 질의하는 것보다 수십 배 빠르고 Point 객체를 만들지 않음)
+            shapely.prepare(polygons)
+            minx, miny, maxx, maxy = projected.total_bounds
+            xs = np.arange(minx + cell_m / 2, maxx, cell_m)
+            ys = np.arange(miny + cell_m / 2, maxy, cell_m)
+            for i, (x0, y0, x1, y1) in enumerate(shapely.bounds(polygons)):
+                ix0, ix1 = np.searchsorted(xs, [x0, x1])
+                iy0, iy1 = np.searchsorted(ys, [y0, y1])
+                if ix0 == ix1 or iy0 == iy1:
+                    continue
+                gx, gy = np.meshgrid(np.arange(ix0, ix1), np.arange(iy0, iy1))
+                gx, gy = gx.ravel(), gy.ravel()
+                inside = shapely.contains_xy(polygons[i], xs[gx], ys[gy])
+                cell_ids.append(gy[inside] * len(xs) + gx[inside])
+                dong_all.append(np.full(int(inside.sum()), i, dtype=np.int64))
+
+        if cell_ids:
+            # 겹치는 경계가 있어도 격자점은 한 동에만 배정
+            cell_id, first = np.unique(np.concatenate(cell_ids), return_index=True)
+            dong = np.concatenate(dong_all)[first]
+            x, y = xs[cell_id % len(xs)], ys[cell_id // len(xs)]
+        else:
+            x, y, dong = np.empty(0), np.empty(0), np.empty(0, dtype=np.int64)
+
+        # 격자 간격보다 작은 동은 내부 대표점 하나로 대신
+        missing = np.flatnonzero(np.bincount(dong, minlength=n) == 0)
+        if len(missing):
+            reps = shapely.point_on_surface(polygons[missing])
+            x = np.concatenate([x, shapely.get_x(reps)])
+            y = np.concatenate([y, shapely.get_y(reps)])
+            dong = np.concatenate([dong, missing])
+
+        self.x, self.y, self.dong = x, y, dong
+        self.n_dongs = n
+        self.share = 1.0 / np.bincount(dong, minlength=n)[dong] if len(dong) else np.empty(0)
+
+    def __len__(self):
+        return len(self.x)
+
+    def nearest_distance(self, lats, lons):
+        """격자점마다 가장 가까운 키즈룸까지 거리 (m, 키즈룸이 없으면 NaN)"""
+        result = np.full(len(self), np.nan)
+        if len(lats) == 0 or len(self) == 0:
+            return result
+        venues = gpd.GeoSeries(shapely.points(lons, lats), crs=KIDSROOM_CRS).to_crs(epsg=METRIC_CRS_EPSG)
+        tree = shapely.STRtree(np.asarray(venues.values, dtype=object))
+        for start in range(0, len(self), self.chunk_size):
+            stop = start + self.chunk_size
+            points = shapely.points(self.x[start:stop], self.y[start:stop])
+            (point_idx, _), distances = tree.query_nearest(points, return_distance=True, all_matches=False)
+            result[start + point_idx] = distances
+        return result
+
+    def per_dong(self, values):
+        """격자점 값의 동별 인구가중 평균 (동 안에서는 격자점 가중치가 같음)"""
+        return np.bincount(self.dong, weights=self.share * values, minlength=self.n_dongs)
+
+
+_grid_cache = LRUCache(SPATIAL_INDEX_CACHE_MAX_ENTRIES)
+
+
+def get_population_grid(merged, cell_m=COVERAGE_GRID_CELL_M):
+    """병합 데이터셋의 인구 격자 (geometry 해시 + 격자 크기 기준 캐시)
+
+    격자는 경계 geometry로만 정해지므로 키즈룸 지표 등 속성 컬럼이 바뀌어도 다시 만들지 않음
+    (인구는 add_coverage_metrics가 매번 merged에서 읽음)
+    """
+    def build():
+        with span('population_grid', cell_m=cell_m):
+            return PopulationGrid(merged, cell_m)
+
+    return _grid_cache.get_or_compute((geometry_hash(merged), cell_m), build)
+
+
+def get_coverage_cache_stats():
+    return _grid_cache.stats()
+
+
+def clear_coverage_cache():
+    _grid_cache.clear()
+
+
+def add_coverage_metrics(merged, kidsroom_list, radius_m, cell_m=COVERAGE_GRID_CELL_M):
+    """반경 radius_m 커버리지 지표 컬럼을 추가한 사본과 전체 요약 반환 -> (GeoDataFrame, dict)
+
+    - 커버리지_비율: 동 인구 중 키즈룸 반경 안에 사는 비율 (%, 인구는 동 안에 고르게 분포한다고 가정)
+    - 커버_인구: 총인구 x 커버리지 비율
+    - 미커버_아동인구: 아동인구 중 반경 밖 인구
+    - 인구가중_평균거리: 동 주민에서 가장 가까운 키즈룸까지 평균 거리 (m)
+    """
+    grid = get_population_grid(merged, cell_m)
+    lats, lons, _ = kidsroom_coordinates(kidsroom_list)
+    with span('coverage.nearest_distance', cells=len(grid), venues=len(lats)):
+        distances = grid.nearest_distance(lats, lons)
+
+    has_venues = len(lats) > 0
+    covered_share = grid.per_dong((distances <= radius_m).astype(float))
+    mean_distance = grid.per_dong(distances) if has_venues else np.full(len(merged), np.nan)
+
+    population = merged['총인구'].to_numpy(dtype=float)
+    children = merged['아동인구'].to_numpy(dtype=float) if '아동인구' in merged.columns else np.full(len(merged), np.nan)
+    matched = ~np.isnan(population)
+    covered_share = np.where(matched, covered_share, np.nan)
+
+    result = merged.assign(**{
+        '커버리지_비율': covered_share * 100,
+        '커버_인구': population * covered_share,
+        '미커버_아동인구': children * (1 - covered_share),
+        '인구가중_평균거리': np.where(matched, mean_distance, np.nan),
+    })
+
+    total = np.nansum(population)
+    covered = np.nansum(result['커버_인구'].to_numpy(dtype=float))
+    summary = {
+        'radius_m': radius_m,
+        'kidsrooms': int(len(lats)),
+        'grid_cells': len(grid),
+        'population': float(total),
+        'covered_population': float(covered),
+        'covered_share': float(covered / total) if total else 0.0,
+        'uncovered_children': float(np.nansum(result['미커버_아동인구'].to_numpy(dtype=float))),
+        'weighted_mean_distance_m': (
+            float(np.nansum(population * mean_distance) / total) if has_venues and total else None
+        ),
+    }
+    return result, summary
+
+
+def underserved_dongs(covered, max_share=COVERAGE_UNDERSERVED_SHARE):
+    """커버리지 비율이 max_share 미만인 동 (반경 밖 아동인구 많은 순)"""
+    table = pd.DataFrame(covered.drop(columns=covered.geometry.name))
+    table = table[table['커버리지_비율'] < max_share * 100]
+    columns = ['adm_nm', '총인구', '아동인구', '커버리지_비율', '미커버_아동인구', '인구가중_평균거리']
+    return table.sort_values('미커버_아동인구', ascending=False)[[c for c in columns if c in table.columns]].reset_index(drop=True)
+
+
+def coverage_area(kidsroom_list, radius_m, simplify_m=None):
+    """키즈룸 반경 radius_m 영역 합집합 (위경도 geometry, 키즈룸이 없으면 None)"""
+    lats, lons, _ = kidsroom_coordinates(kidsroom_list)
+    if len(lats) == 0:
+        return None
+    venues = gpd.GeoSeries(shapely.points(lons, lats), crs=KIDSROOM_CRS).to_crs(epsg=METRIC_CRS_EPSG)
+    area = shapely.union_all(shapely.buffer(np.asarray(venues.values, dtype=object), radius_m, quad_segs=8))
+    simplify_m = radius_m / 50 if simplify_m is None else simplify_m
+    area = shapely.simplify(area, simplify_m)
+    return gpd.GeoSeries([area], crs=METRIC_CRS_EPSG).to_crs(KIDSROOM_CRS).iloc[0]
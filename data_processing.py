@@ -0,0 +1,331 @@
+"""
+데이터 처리 핵심 모듈 - Streamlit 없이 동작하는 순수 로드/처리/병합 함수
+(UI 오류 표시는 data_loader에서 담당)
+"""
+import codecs
+import csv
+import io
+import re
+
+import numpy as np
+import pandas as pd
+from config import METRIC_CRS_EPSG, CHILD_AGE_BANDS, CHILD_MAX_AGE, CHILD_BAND_COLUMNS, CSV_ENCODING_PROBE_BYTES
+from profiling import span
+
+_AGE_COLUMN_RE = re.compile(r'_(계|남|여)_(\d+)세$')
+# 행정안전부 월간 내보내기 컬럼의 기준 월 (예: '2025년10월_계_총인구수' -> 2025, 10)
+_MONTH_COLUMN_RE = re.compile(r'^(\d{4})년(\d{2})월_')
+# 행정구역 끝의 괄호 안 10자리 행정기관 코드 (예: "... 도촌동(4113101000)")
+_ADMIN_CODE_RE = r'\((\d{10})\)\s*$'
+
+# merge_data가 추가하는 행정동별 병합 기준 컬럼 ('코드' / '이름' / 매칭 실패 시 None)
+JOIN_BASIS_COLUMN = '병합_기준'
+
+
+class PopulationDataError(ValueError):
+    """인구 CSV 구조가 예상과 다를 때 발생"""
+
+
+def detect_csv_encoding(prefix):
+    """파일 앞부분 바이트로 인코딩 판별 (BOM -> utf-8-sig, UTF-8로 디코딩되면 utf-8, 아니면 cp949)
+
+    잘린 끝부분의 멀티바이트 문자는 증분 디코더가 다음 입력을 기다리므로 오류로 보지 않음
+    """
+    if prefix.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(prefix, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "cp949"
+
+
+def population_months(columns):
+    """컬럼 이름에 들어 있는 기준 월 목록 ('YYYYMM', 오름차순)"""
+    months = {f"{m.group(1)}{m.group(2)}" for m in map(_MONTH_COLUMN_RE.match, map(str, columns)) if m}
+    return sorted(months)
+
+
+def month_columns(columns, month):
+    """기준 월('YYYYMM') 컬럼만 (월 접두어가 없는 컬럼 포함)"""
+    prefix = f"{month[:4]}년{month[4:]}월_"
+    return [c for c in columns if str(c).startswith(prefix) or not _MONTH_COLUMN_RE.match(str(c))]
+
+
+def population_columns(columns, month=None):
+    """prepare_population_data가 쓰는 컬럼만 (행정구역, 총인구, 아동 연령대 계산에 필요한 나이별 '계' 컬럼)
+
+    여러 달이 들어 있는 파일은 month('YYYYMM')의 컬럼, month가 없으면 find_* 함수가 고르는 (첫 번째) 컬럼을 그대로 고름
+    """
+    if month is not None:
+        columns = month_columns(columns, month)
+    max_age = max([CHILD_MAX_AGE] + [hi for _, _, hi in CHILD_AGE_BANDS])
+    ages = _age_columns(columns)
+    selected = ["행정구역", _total_population_column(columns)] + [c for a, c in sorted(ages.items()) if a <= max_age]
+    return list(dict.fromkeys(selected))
+
+
+def _read_bytes_or_path(source):
+    """경로는 그대로, 파일 객체는 내용 바이트로 (업로드 파일을 되감아 다시 읽지 않도록 한 번만 읽음)"""
+    if isinstance(source, str):
+        return source, None
+    if hasattr(source, "getvalue"):
+        return None, source.getvalue()
+    source.seek(0)
+    return None, source.read()
+
+
+def read_population_csv(source, all_months=False):
+    """인구 CSV 로드 - 경로 또는 파일 객체 (all_months=True면 파일에 든 모든 기준 월의 컬럼을 읽음)
+
+    - 앞부분 CSV_ENCODING_PROBE_BYTES 바이트로 인코딩을 정한 뒤 한 번만 파싱 (앞부분 이후에 UTF-8이 깨지면 CP949로 재시도)
+    - 헤더를 먼저 읽어 처리에 필요한 컬럼만 파싱하고, 숫자 컬럼은 천 단위 구분 기호(',')를 빼고 float로 바로 변환
+    - 필요한 컬럼을 못 찾거나 숫자 변환이 안 되는 파일은 전체 컬럼을 문자열 그대로 읽음 (오류 메시지는 처리 단계에서)
+    """
+    path, data = _read_bytes_or_path(source)
+    if path is not None:
+        with open(path, "rb") as f:
+            prefix = f.read(CSV_ENCODING_PROBE_BYTES)
+    else:
+        prefix = data[:CSV_ENCODING_PROBE_BYTES]
+
+    def parse(encoding, **kwargs):
+        return pd.read_csv(path if path is not None else io.BytesIO(data), encoding=encoding, **kwargs)
+
+    def read_header(encoding):
+        # 컬럼이 수천 개인 다개월 파일은 pandas로 헤더만 읽어도 느려서 첫 줄만 csv 모듈로 분리
+        if path is not None:
+            with open(path, encoding=encoding, newline="") as f:
+                line = f.readline()
+        else:
+            line = data[:data.find(b"\n") + 1 or len(data)].decode(encoding)
+        return next(csv.reader([line.lstrip("\ufeff")]), [])
+
+    def parse_population(encoding):
+        try:
+            header = read_header(encoding)
+            if all_months and population_months(header):
+                usecols = list(dict.fromkeys(c for month in population_months(header) for c in population_columns(header, month)))
+            else:
+                usecols = population_columns(header)
+        except PopulationDataError:
+            return parse(encoding)
+        numeric = {c: "float64" for c in usecols if c != "행정구역"}
+        try:
+            return parse(encoding, usecols=usecols, dtype={"행정구역": str, **numeric}, thousands=",")
+        except UnicodeDecodeError:
+            raise
+        except ValueError:
+            return parse(encoding)
+
+    encoding = detect_csv_encoding(prefix)
+    try:
+        return parse_population(encoding)
+    except UnicodeDecodeError:
+        if encoding == "cp949":
+            raise
+        return parse_population("cp949")
+
+
+def find_total_population_column(df):
+    """총인구 컬럼 찾기 (패턴 강화)"""
+    return _total_population_column(df.columns)
+
+
+def _total_population_column(columns):
+    total_candidates = [c for c in columns if ('총인구' in c or '총인구수' in c) and ('계' in c or '계_' in c)]
+    if not total_candidates:
+        raise PopulationDataError(f"총인구 컬럼을 찾을 수 없습니다. 사용 가능한 컬럼: {list(columns)[:15]} ...")
+    return total_candidates[0]
+
+
+def find_age_columns(df, sex='계'):
+    """나이별 인구 컬럼 {나이: 컬럼명} (예: '2025년10월_계_0세' -> {0: ...})"""
+    return _age_columns(df.columns, sex)
+
+
+def _age_columns(columns, sex='계'):
+    ages = {}
+    for c in columns:
+        m = _AGE_COLUMN_RE.search(str(c))
+        if m and m.group(1) == sex:
+            ages.setdefault(int(m.group(2)), c)
+    return ages
+
+
+def age_matrix(df, sex='계'):
+    """나이별 인구 컬럼을 한 번에 숫자 행렬로 변환 -> (나이 배열, 행 x 나이 float 행렬)
+
+    '1,234' 형식 문자열도 블록 단위로 한 번에 변환 (변환 불가 값은 NaN)
+    """
+    ages = find_age_columns(df, sex)
+    order = sorted(ages)
+    block = df[[ages[a] for a in order]]
+    if all(pd.api.types.is_numeric_dtype(t) for t in block.dtypes):
+        values = block.to_numpy(dtype=float)
+    else:
+        text = np.char.replace(block.to_numpy(dtype=str), ',', '')
+        try:
+            values = np.where(text == '', 'nan', text).astype(float)
+        except ValueError:
+            values = block.apply(lambda c: pd.to_numeric(c.astype(str).str.replace(',', '', regex=False), errors='coerce')).to_numpy(dtype=float)
+    return np.asarray(order, dtype=int), values
+
+
+def aggregate_age_bands(ages, values, bands):
+    """나이별 행렬 -> 구간별 합계 행렬 (행 x 구간), 구간 가중치 행렬 곱 한 번으로 계산
+
+    bands: [(시작 나이, 끝 나이)] (끝 포함), 한 행의 해당 나이 값이 모두 NaN이면 NaN
+    """
+    weights = np.array([(ages >= lo) & (ages <= hi) for lo, hi in bands], dtype=float).T
+    totals = np.nan_to_num(values) @ weights
+    observed = (~np.isnan(values)).astype(float) @ weights
+    totals[observed == 0] = np.nan
+    return totals
+
+
+def prepare_population_data(df):
+    """인구 데이터 처리 (총인구/아동인구 수치화 + 정규화된 동명 추출)"""
+    total_pop_col = find_total_population_column(df)
+    if pd.api.types.is_numeric_dtype(df[total_pop_col]):
+        df['총인구'] = df[total_pop_col].astype(float)
+    else:
+        df['총인구'] = df[total_pop_col].replace(",", "", regex=True).astype(float)
+
+    # 아동인구 (0세 ~ CHILD_MAX_AGE세) 및 연령대별 아동인구 (나이별 컬럼이 없으면 NaN)
+    ages, values = age_matrix(df)
+    bands = [(0, CHILD_MAX_AGE)] + [(lo, hi) for _, lo, hi in CHILD_AGE_BANDS]
+    if len(ages):
+        totals = aggregate_age_bands(ages, values, bands)
+    else:
+        totals = np.full((len(df), len(bands)), np.nan)
+    for i, col in enumerate(('아동인구',) + CHILD_BAND_COLUMNS):
+        df[col] = totals[:, i]
+
+    # 행정구역에서 동 이름만 추출
+    # 예: "경기도 성남시 중원구 도촌동(4113101000)" -> "도촌동"
+    # 방법: 마지막 단어에서 '(' 앞부분만 정규식으로 한 번에 추출 ('동'이 없는 행은 None)
+    names = df["행정구역"]
+    is_dong = names.str.contains('동', regex=False, na=False).astype(bool)
+    df["정규화된_동명"] = names.str.extract(r'([^\s(]*)\S*\s*$', expand=False).where(is_dong, None)
+    df["행정코드"] = parse_admin_codes(names)
+
+    return df
+
+
+def process_geodata(gdf, city_name="성남시"):
+    """GeoJSON 데이터 처리"""
+    # 특정 도시만 필터링
+    gdf_filtered = gdf[gdf["sggnm"].str.contains(city_name, na=False)].copy()
+
+    # adm_nm에서 동 이름만 추출
+    # 예: "경기도 성남시중원구 도촌동" -> "도촌동"
+    # 방법: 마지막 단어를 정규식으로 한 번에 추출 ('동'이 없는 행은 None)
+    names = gdf_filtered['adm_nm']
+    is_dong = names.str.contains('동', regex=False, na=False).astype(bool)
+    gdf_filtered['dong_nm'] = names.str.extract(r'(\S+)\s*$', expand=False).where(is_dong, None)
+    # 10자리 행정기관 코드 (인구 CSV의 괄호 안 코드와 같은 체계)
+    # adm_cd2가 없는 경계 파일은 결측 코드로 두어 컬럼 구성을 맞춤 (병합은 동 이름 보완으로 처리)
+    if 'adm_cd2' in gdf_filtered.columns:
+        gdf_filtered['adm_code'] = pd.to_numeric(gdf_filtered['adm_cd2'], errors='coerce').astype('Int64')
+    else:
+        gdf_filtered['adm_code'] = pd.array([pd.NA] * len(gdf_filtered), dtype='Int64')
+
+    return gdf_filtered
+
+
+def parse_admin_codes(names):
+    """행정구역 문자열에서 10자리 행정기관 코드를 정수로 추출 (없으면 <NA>)"""
+    return pd.to_numeric(names.str.extract(_ADMIN_CODE_RE, expand=False), errors='coerce').astype('Int64')
+
+
+def _int_keys(codes):
+    """Int64 코드 -> int64 배열 (결측은 -1, 코드는 모두 양수라 충돌 없음)"""
+    return codes.fillna(-1).to_numpy(dtype=np.int64)
+
+
+def _unique_name_index(names):
+    """한쪽에 두 번 이상 나오는 이름과 결측을 뺀 (이름 Index, 원래 위치) - 동명 다대다 병합 방지"""
+    names = pd.Series(names, dtype=object).reset_index(drop=True)
+    keep = names.notna() & ~names.duplicated(keep=False)
+    return pd.Index(names[keep]), np.flatnonzero(keep)
+
+
+def join_population(gdf_filtered, df):
+    """행정동 경계와 인구 행을 행정기관 코드로 병합, 코드로 못 찾은 행만 동 이름으로 보완 -> (GeoDataFrame, dict)
+
+    - 경계 쪽 코드로 해시 인덱스를 한 번 만들고 인구 행 코드를 일괄 조회 (경계마다 최대 한 행, 행 수에 선형)
+    - 이름 보완은 코드로 짝을 못 찾은 경계/행 중 양쪽에서 이름이 하나뿐인 경우에만 적용
+    - 결과는 경계 순서 그대로 한 경계당 한 행 (매칭 실패 경계는 인구 컬럼이 NaN)
+    - 요약: 경계 수, 코드/이름 매칭 수, 매칭 안 된 경계(adm_nm)와 인구 행(행정구역, 시군구 합계 행 제외)
+    """
+    boundaries = gdf_filtered.reset_index(drop=True)
+    rows = df.reset_index(drop=True)
+    n_boundaries = len(boundaries)
+    row_for_boundary = np.full(n_boundaries, -1, dtype=np.int64)
+
+    if 'adm_code' in boundaries.columns and '행정코드' in rows.columns:
+        boundary_keys = _int_keys(boundaries['adm_code'])
+        index = pd.Index(boundary_keys)
+        first = ~index.duplicated() & (boundary_keys >= 0)
+        index, positions = index[first], np.flatnonzero(first)
+        hit = index.get_indexer(_int_keys(rows['행정코드']))
+        matched_rows = np.flatnonzero(hit >= 0)
+        # 같은 코드 행이 여러 개면 먼저 나온 행 사용 (np.unique의 첫 등장 위치로 경계당 한 행만 남김)
+        targets, first_match = np.unique(positions[hit[matched_rows]], return_index=True)
+        row_for_boundary[targets] = matched_rows[first_match]
+    by_code = row_for_boundary >= 0
+
+    # 동 이름 보완 (코드 체계가 다르거나 코드가 없는 데이터)
+    if 'dong_nm' in boundaries.columns and '정규화된_동명' in rows.columns:
+        free_rows = np.setdiff1d(np.arange(len(rows)), row_for_boundary[by_code])
+        free_boundaries = np.flatnonzero(~by_code)
+        row_names, row_pos = _unique_name_index(rows['정규화된_동명'].to_numpy(dtype=object)[free_rows])
+        boundary_names, boundary_pos = _unique_name_index(boundaries['dong_nm'].to_numpy(dtype=object)[free_boundaries])
+        hit = row_names.get_indexer(boundary_names)
+        found = hit >= 0
+        row_for_boundary[free_boundaries[boundary_pos[found]]] = free_rows[row_pos[hit[found]]]
+    by_name = (row_for_boundary >= 0) & ~by_code
+
+    merged = boundaries.join(rows.reindex(row_for_boundary).reset_index(drop=True))
+    merged[JOIN_BASIS_COLUMN] = np.select([by_code, by_name], ['코드', '이름'], default=None)
+
+    used = np.zeros(len(rows), dtype=bool)
+    used[row_for_boundary[row_for_boundary >= 0]] = True
+    unmatched_rows = rows[~used]
+    if '행정코드' in rows.columns:
+        # 시/구 합계 행(읍면동 자리 000)은 대응하는 경계가 없으므로 보고에서 제외
+        emd = unmatched_rows['행정코드'] // 100 % 1000
+        unmatched_rows = unmatched_rows[emd.isna() | (emd != 0)]
+    report = {
+        'boundaries': int(n_boundaries),
+        'matched_by_code': int(by_code.sum()),
+        'matched_by_name': int(by_name.sum()),
+        'unmatched_boundaries': boundaries.loc[row_for_boundary < 0, 'adm_nm'].tolist() if 'adm_nm' in boundaries.columns else [],
+        'unmatched_rows': unmatched_rows['행정구역'].tolist() if '행정구역' in rows.columns else [],
+    }
+    return merged, report
+
+
+def merge_data(gdf_filtered, df):
+    """인구 데이터와 지리 데이터 병합 및 인구밀도 계산
+
+    병합 요약(join_population 참고)은 merged.attrs['join_report']에 보관
+    """
+    merged, report = join_population(gdf_filtered, df)
+    merged.attrs['join_report'] = report
+
+    # 면적 계산 (CRS를 EPSG:5186으로 변환하여 제곱미터 단위로 계산)
+    # to_crs(5186)을 사용하면 정확한 면적 계산이 가능
+    with span('merge_data.reproject'):
+        merged['면적'] = merged['geometry'].to_crs(epsg=METRIC_CRS_EPSG).area
+
+    # 인구밀도 계산 (명/km²)
+    # 면적이 0보다 클 경우에만 계산 (그 외 0)
+    area_km2 = merged['면적'].to_numpy(dtype=float) / 1_000_000
+    has_area = area_km2 > 0
+    density = np.zeros(len(merged))
+    np.divide(merged['총인구'].to_numpy(dtype=float), area_km2, out=density, where=has_area)
+    merged['인구밀도'] = density
+
+    return merged
@@ -0,0 +1,186 @@
+"""
+파일 변경 감지 모듈 - (mtime_ns, size, inode) 비교 후 바뀐 파일만 해시, Linux에서는 inotify 감시 스레드로 세대(generation) 증가
+
+세션은 파일을 직접 읽지 않고 generation 값만 비교하면 됨
+"""
+import ctypes
+import ctypes.util
+import hashlib
+import os
+import select
+import struct
+import sys
+import threading
+
+# inotify 이벤트 마스크 (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_IGNORED = 0x00008000
+IN_CLOEXEC = 0o2000000
+IN_NONBLOCK = 0o4000
+
+_WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+def _stat_sig(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def _file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class FileChangeDetector:
+    """여러 파일의 내용 변경 감지 (stat이 그대로면 해시 생략, 바뀐 파일만 다시 해시)
+
+    내용이 실제로 바뀐 경우에만 generation 증가 (touch 등 stat만 바뀐 경우는 유지)
+    """
+
+    def __init__(self, paths):
+        self.paths = list(paths)
+        self.generation = 0
+        self._lock = threading.Lock()
+        self._sigs = {}
+        self._hashes = {}
+        self.check()
+
+    def check(self):
+        """stat 비교 후 바뀐 파일만 해시 -> 현재 generation"""
+        with self._lock:
+            changed = False
+            for path in self.paths:
+                sig = _stat_sig(path)
+                if path in self._sigs and sig == self._sigs[path]:
+                    continue
+                self._sigs[path] = sig
+                try:
+                    digest = _file_sha256(path) if sig is not None else None
+                except FileNotFoundError:
+                    digest = None
+                if self._hashes.get(path) != digest:
+                    self._hashes[path] = digest
+                    changed = True
+            if changed:
+                self.generation += 1
+            return self.generation
+
+    def content_hash(self):
+        """전체 파일 내용 해시 (파일 해시를 합친 값, 파일이 모두 없으면 None)"""
+        with self._lock:
+            if all(self._hashes.get(p) is None for p in self.paths):
+                return None
+            h = hashlib.sha256()
+            for path in self.paths:
+                h.update((self._hashes.get(path) or '').encode())
+                h.update(b'\0')
+            return h.hexdigest()
+
+
+class InotifyWatcher:
+    """디렉터리 inotify 감시 스레드 - 대상 파일 이름에 이벤트가 오면 detector.check() 호출
+
+    파일을 os.replace로 교체해도 감시가 끊기지 않도록 파일이 아니라 디렉터리를 감시
+    """
+
+    def __init__(self, detector):
+        self.detector = detector
+        self.directories = sorted({os.path.dirname(os.path.abspath(p)) for p in detector.paths})
+        self._names = {os.path.basename(p) for p in detector.paths}
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._fd = libc.inotify_init1(IN_CLOEXEC | IN_NONBLOCK)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 실패")
+        self._wds = set()
+        for directory in self.directories:
+            os.makedirs(directory, exist_ok=True)
+            wd = libc.inotify_add_watch(self._fd, os.fsencode(directory), _WATCH_MASK)
+            if wd < 0:
+                errno = ctypes.get_errno()
+                os.close(self._fd)
+                raise OSError(errno, f"inotify_add_watch 실패: {directory}")
+            self._wds.add(wd)
+        self._stop = threading.Event()
+        self.alive = True
+        self._thread = threading.Thread(target=self._run, name='kidsroom-inotify', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            while not self._stop.is_set():
+                ready, _, _ = select.select([self._fd], [], [], 1.0)
+                if not ready:
+                    continue
+                try:
+                    buf = os.read(self._fd, 64 * 1024)
+                except BlockingIOError:
+                    continue
+                relevant = False
+                offset = 0
+                while offset < len(buf):
+                    wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(buf, offset)
+                    name = buf[offset + _EVENT_HEADER.size:offset + _EVENT_HEADER.size + length].rstrip(b'\0')
+                    offset += _EVENT_HEADER.size + length
+                    if mask & (IN_IGNORED | IN_DELETE_SELF | IN_MOVE_SELF):
+                        self._wds.discard(wd)
+                    elif os.fsdecode(name) in self._names:
+                        relevant = True
+                if relevant:
+                    self.detector.check()
+                if not self._wds:
+                    # 감시 디렉터리가 사라짐 -> stat 비교 방식으로 전환
+                    break
+        finally:
+            self.alive = False
+            os.close(self._fd)
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=2)
+
+
+class WatchedFiles:
+    """변경 감지 서비스: inotify 감시가 살아 있으면 generation만 반환, 아니면 호출마다 stat 비교"""
+
+    def __init__(self, paths, mode='auto'):
+        self.detector = FileChangeDetector(paths)
+        self.watcher = None
+        if mode == 'inotify' or (mode == 'auto' and sys.platform.startswith('linux')):
+            try:
+                self.watcher = InotifyWatcher(self.detector)
+            except (OSError, AttributeError):
+                if mode == 'inotify':
+                    raise
+
+    @property
+    def mode(self):
+        return 'inotify' if self.watcher is not None and self.watcher.alive else 'poll'
+
+    def generation(self):
+        if self.watcher is not None and self.watcher.alive:
+            return self.detector.generation
+        return self.detector.check()
+
+    def content_hash(self):
+        if self.watcher is None or not self.watcher.alive:
+            self.detector.check()
+        return self.detector.content_hash()
+
+    def stop(self):
+        if self.watcher is not None:
+            self.watcher.stop()
@@ -0,0 +1,154 @@
+"""
+지오코딩 제공자 HTTP 클라이언트 모듈 - keep-alive 세션 풀, 제공자별 타임아웃, 지연시간 히스토그램/오류 카운터
+"""
+import bisect
+import threading
+import time
+
+from config import GEOCODE_PROVIDER_URLS, GEOCODE_PROVIDER_TIMEOUTS, GEOCODE_POOL_SIZE
+
+
+KAKAO_KEYWORD_PATH = "/v2/local/search/keyword.json"
+KAKAO_ADDRESS_PATH = "/v2/local/search/address.json"
+NOMINATIM_SEARCH_PATH = "/search"
+NOMINATIM_USER_AGENT = "seongnam_kidsroom_app"
+
+# 지연시간 히스토그램 버킷 상한 (ms)
+LATENCY_BUCKETS_MS = (25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class LatencyHistogram:
+    """고정 버킷 지연시간 히스토그램 (마지막 버킷은 +Inf)"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms):
+        self.counts[bisect.bisect_left(self.buckets, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def quantile(self, q):
+        """버킷 상한 기준 근사 분위수 (ms)"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= target:
+                return float(self.buckets[i]) if i < len(self.buckets) else self.max_ms
+        return self.max_ms
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "p50_ms": self.quantile(0.5),
+            "p95_ms": self.quantile(0.95),
+            "max_ms": self.max_ms,
+            "buckets": {str(b): c for b, c in zip(self.buckets + ("+Inf",), self.counts)},
+        }
+
+
+class ProviderClient:
+    """제공자(kakao, nominatim) 공용 HTTP 클라이언트
+
+    base_urls를 바꾸면 로컬 스텁 서버(geocode_stub_server)로 요청을 보낼 수 있음
+    """
+
+    def __init__(self, base_urls=None, timeouts=None, pool_size=GEOCODE_POOL_SIZE):
+        self.base_urls = dict(GEOCODE_PROVIDER_URLS if base_urls is None else base_urls)
+        self.timeouts = dict(GEOCODE_PROVIDER_TIMEOUTS if timeouts is None else timeouts)
+        # requests는 첫 클라이언트 생성 시 로드 (지오코딩을 쓰지 않는 세션의 콜드 스타트 단축)
+        import requests
+        from requests.adapters import HTTPAdapter
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=len(self.base_urls) or 1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+
+    def _record(self, provider, ms, outcome):
+        with self._lock:
+            self._histograms.setdefault(provider, LatencyHistogram()).observe(ms)
+            counters = self._counters.setdefault(provider, {"requests": 0, "ok": 0, "http_errors": 0, "exceptions": 0})
+            counters["requests"] += 1
+            counters[outcome] += 1
+
+    def get(self, provider, path, params=None, headers=None, timeout=None):
+        """제공자 API GET 요청 (응답 상태와 무관하게 Response 반환, 네트워크 예외는 기록 후 재발생)"""
+        import requests
+        url = self.base_urls[provider].rstrip("/") + path
+        timeout = timeout if timeout is not None else self.timeouts.get(provider, 5)
+        start = time.perf_counter()
+        try:
+            response = self.session.get(url, params=params, headers=headers, timeout=timeout)
+        except requests.RequestException:
+            self._record(provider, (time.perf_counter() - start) * 1000, "exceptions")
+            raise
+        self._record(provider, (time.perf_counter() - start) * 1000, "ok" if response.status_code == 200 else "http_errors")
+        return response
+
+    def metrics(self):
+        """제공자별 지연시간/카운터 스냅샷 {provider: {...}}"""
+        with self._lock:
+            return {
+                provider: {**self._counters[provider], "latency": hist.snapshot()}
+                for provider, hist in self._histograms.items()
+            }
+
+    def reset_metrics(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+
+def metrics_to_prometheus(metrics):
+    """metrics() 결과를 Prometheus 텍스트 형식으로 변환"""
+    lines = []
+    for provider, m in metrics.items():
+        label = f'provider="{provider}"'
+        for key in ("requests", "ok", "http_errors", "exceptions"):
+            lines.append(f"geocode_{key}_total{{{label}}} {m[key]}")
+        cumulative = 0
+        for bucket, count in m["latency"]["buckets"].items():
+            cumulative += count
+            lines.append(f'geocode_latency_ms_bucket{{{label},le="{bucket}"}} {cumulative}')
+        lines.append(f"geocode_latency_ms_count{{{label}}} {m['latency']['count']}")
+        lines.append(f"geocode_latency_ms_sum{{{label}}} {m['latency']['mean_ms'] * m['latency']['count']:.3f}")
+    return "\n".join(lines) + "\n"
+
+
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def get_client():
+    """프로세스 공용 클라이언트 (첫 사용 시 생성)"""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = ProviderClient()
+        return _default_client
+
+
+def get_client_metrics():
+    """공용 클라이언트 메트릭 (아직 요청이 없어 클라이언트가 없으면 빈 dict, 클라이언트를 새로 만들지 않음)"""
+    with _default_lock:
+        client = _default_client
+    return client.metrics() if client is not None else {}
+
+
+def set_client(client):
+    """공용 클라이언트 교체 (스텁 서버 테스트 등)"""
+    global _default_client
+    with _default_lock:
+        _default_client = client
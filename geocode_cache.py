@@ -0,0 +1,177 @@
+"""
+지오코딩 캐시 모듈 - 정규화된 주소 기준 SQLite 영구 캐시 (실패 결과는 짧은 TTL)
+"""
+import contextlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+import uuid
+
+from config import GEOCODE_CACHE_FILE, GEOCODE_CACHE_TTL, GEOCODE_NEGATIVE_TTL, GEOCODE_LEASE_TIMEOUT
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS geocode_cache (
+    address_key   TEXT PRIMARY KEY,
+    provider      TEXT,
+    lat           REAL,
+    lon           REAL,
+    found_address TEXT,
+    place_name    TEXT,
+    created_at    REAL NOT NULL,
+    expires_at    REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS geocode_lease (
+    address_key TEXT PRIMARY KEY,
+    owner       TEXT NOT NULL,
+    expires_at  REAL NOT NULL
+);
+"""
+
+_init_lock = threading.Lock()
+_initialized = set()
+
+# 같은 프로세스(Streamlit 세션 스레드) 안에서 같은 주소 동시 조회 방지
+# {주소 키: [Lock, 대기/사용 중인 스레드 수]} - 아무도 쓰지 않게 되면 바로 삭제 (주소 수만큼 계속 늘지 않도록)
+_key_locks = {}
+_key_locks_guard = threading.Lock()
+
+
+def normalize_address(address):
+    """캐시 키용 주소 정규화 (NFC, 공백 통일, 소문자)"""
+    text = unicodedata.normalize("NFC", address or "")
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+def _connect(db_path):
+    conn = sqlite3.connect(db_path, timeout=10)
+    with _init_lock:
+        if db_path not in _initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            _initialized.add(db_path)
+    return conn
+
+
+def get_cached(address, db_path=GEOCODE_CACHE_FILE, now=None):
+    """캐시 조회 -> None(미적중) 또는 (lat, lon, found_address, place_name, provider)
+
+    실패 결과가 캐시된 경우 (None, None, None, None, None) 반환
+    """
+    if not os.path.exists(db_path):
+        return None
+    now = time.time() if now is None else now
+    conn = _connect(db_path)
+    try:
+        row = conn.execute(
+            "SELECT lat, lon, found_address, place_name, provider FROM geocode_cache "
+            "WHERE address_key = ? AND expires_at > ?",
+            (normalize_address(address), now),
+        ).fetchone()
+    finally:
+        conn.close()
+    return tuple(row) if row else None
+
+
+def put_cached(address, lat, lon, found_address, place_name, provider, db_path=GEOCODE_CACHE_FILE, now=None):
+    """결과 저장 (좌표가 없으면 실패 결과로 짧은 TTL 적용)"""
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    now = time.time() if now is None else now
+    ttl = GEOCODE_CACHE_TTL if lat is not None and lon is not None else GEOCODE_NEGATIVE_TTL
+    conn = _connect(db_path)
+    try:
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO geocode_cache "
+                "(address_key, provider, lat, lon, found_address, place_name, created_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (normalize_address(address), provider, lat, lon, found_address, place_name, now, now + ttl),
+            )
+    finally:
+        conn.close()
+
+
+def _acquire_lease(key, owner, db_path):
+    """다른 프로세스와의 중복 조회 방지용 임대(lease) 획득 시도"""
+    now = time.time()
+    conn = _connect(db_path)
+    try:
+        with conn:
+            conn.execute("DELETE FROM geocode_lease WHERE address_key = ? AND expires_at <= ?", (key, now))
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO geocode_lease (address_key, owner, expires_at) VALUES (?, ?, ?)",
+                (key, owner, now + GEOCODE_LEASE_TIMEOUT),
+            )
+            return cur.rowcount == 1
+    finally:
+        conn.close()
+
+
+def _release_lease(key, owner, db_path):
+    conn = _connect(db_path)
+    try:
+        with conn:
+            conn.execute("DELETE FROM geocode_lease WHERE address_key = ? AND owner = ?", (key, owner))
+    finally:
+        conn.close()
+
+
+@contextlib.contextmanager
+def _key_lock(key):
+    """주소 키별 잠금 (참조 수를 세어 마지막 사용자가 놓을 때 사전에서 제거)"""
+    with _key_locks_guard:
+        entry = _key_locks.get(key)
+        if entry is None:
+            entry = _key_locks[key] = [threading.Lock(), 0]
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _key_locks_guard:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del _key_locks[key]
+
+
+def cached_geocode(address, resolve, db_path=GEOCODE_CACHE_FILE, poll_interval=0.2):
+    """캐시 우선 지오코딩
+
+    resolve(address) -> (lat, lon, found_address, place_name, provider, cacheable)
+    반환값: ((lat, lon, found_address, place_name, provider), 캐시 적중 여부)
+    cacheable이 False면 (API 오류 등) 실패 결과를 캐시하지 않음
+    """
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    key = normalize_address(address)
+
+    hit = get_cached(address, db_path)
+    if hit is not None:
+        return hit, True
+
+    with _key_lock(key):
+        hit = get_cached(address, db_path)
+        if hit is not None:
+            return hit, True
+
+        owner = uuid.uuid4().hex
+        deadline = time.time() + GEOCODE_LEASE_TIMEOUT
+        leased = _acquire_lease(key, owner, db_path)
+        while not leased and time.time() < deadline:
+            # 다른 프로세스가 조회 중 -> 결과가 저장되기를 기다림
+            time.sleep(poll_interval)
+            hit = get_cached(address, db_path)
+            if hit is not None:
+                return hit, True
+            leased = _acquire_lease(key, owner, db_path)
+
+        try:
+            lat, lon, found_address, place_name, provider, cacheable = resolve(address)
+            if cacheable or (lat is not None and lon is not None):
+                put_cached(address, lat, lon, found_address, place_name, provider, db_path)
+            return (lat, lon, found_address, place_name, provider), False
+        finally:
+            if leased:
+                _release_lease(key, owner, db_path)
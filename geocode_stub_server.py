@@ -0,0 +1,86 @@
+"""
+지오코딩 스텁 서버 - 카카오/Nominatim 응답 형식을 흉내내는 로컬 HTTP 서버 (외부 API 없이 테스트용)
+
+사용 예:
+    python geocode_stub_server.py --port 8765 --fixtures fixtures.json
+    KAKAO_API_BASE_URL=http://127.0.0.1:8765 NOMINATIM_BASE_URL=http://127.0.0.1:8765 streamlit run app.py
+
+fixtures.json 형식: {"주소 또는 장소명": {"lat": 37.4, "lon": 127.1, "place_name": "...", "address_name": "..."}}
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def _make_handler(fixtures, latency_ms):
+    class StubHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, body, status=200):
+            payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            if latency_ms:
+                time.sleep(latency_ms / 1000)
+            parsed = urlparse(self.path)
+            query = parse_qs(parsed.query)
+            text = (query.get("query") or query.get("q") or [""])[0]
+            hit = fixtures.get(text)
+
+            if parsed.path in ("/v2/local/search/keyword.json", "/v2/local/search/address.json"):
+                docs = []
+                if hit:
+                    docs.append({
+                        "y": str(hit["lat"]),
+                        "x": str(hit["lon"]),
+                        "address_name": hit.get("address_name", text),
+                        "place_name": hit.get("place_name", "") if parsed.path.endswith("keyword.json") else "",
+                    })
+                self._send_json({"documents": docs, "meta": {"total_count": len(docs)}})
+            elif parsed.path == "/search":
+                self._send_json([{"lat": str(hit["lat"]), "lon": str(hit["lon"]), "display_name": text}] if hit else [])
+            else:
+                self._send_json({"message": "not found"}, status=404)
+
+    return StubHandler
+
+
+def start_stub_server(fixtures, host="127.0.0.1", port=0, latency_ms=0):
+    """백그라운드 스레드로 스텁 서버 시작 -> (server, base_url), 종료는 server.shutdown()"""
+    server = ThreadingHTTPServer((host, port), _make_handler(fixtures, latency_ms))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="카카오/Nominatim 지오코딩 스텁 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixtures", help="주소 -> 좌표 JSON 파일")
+    parser.add_argument("--latency-ms", type=int, default=0, help="응답마다 추가할 지연 (ms)")
+    args = parser.parse_args()
+
+    fixtures = {}
+    if args.fixtures:
+        with open(args.fixtures, "r", encoding="utf-8") as f:
+            fixtures = json.load(f)
+
+    server = ThreadingHTTPServer((args.host, args.port), _make_handler(fixtures, args.latency_ms))
+    print(f"stub geocoder listening on http://{args.host}:{args.port} ({len(fixtures)} fixtures)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
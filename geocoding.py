@@ -2,18 +2,26 @@
 지오코딩 모듈 - 주소를 좌표로 변환
 """
 import re
-import requests
+import threading
 import streamlit as st
-from geopy.geocoders import Nominatim
-from config import KAKAO_API_KEY
+from config import get_kakao_api_key
+from geocode_cache import cached_geocode
+from geo_client import get_client, KAKAO_KEYWORD_PATH, KAKAO_ADDRESS_PATH, NOMINATIM_SEARCH_PATH, NOMINATIM_USER_AGENT
+
+
+# 조회 중 API 오류(인증/상태 코드/예외) 발생 여부 - 오류로 인한 실패는 캐시하지 않기 위함
+_provider_errors = threading.local()
+
+
+def _note_provider_error():
+    _provider_errors.count = getattr(_provider_errors, 'count', 0) + 1
 
 
 def geocode_with_kakao_keyword(address, headers):
     """카카오 키워드 검색 API"""
     try:
-        url = "https://dapi.kakao.com/v2/local/search/keyword.json"
         params = {"query": address}
-        response = requests.get(url, headers=headers, params=params, timeout=5)
+        response = get_client().get("kakao", KAKAO_KEYWORD_PATH, params=params, headers=headers)
 
         st.info(f"카카오 키워드 검색 API 호출 - 상태 코드: {response.status_code}")
 
@@ -30,10 +38,13 @@ def geocode_with_kakao_keyword(address, headers):
             else:
                 st.warning("카카오 키워드 검색: 결과 없음")
         elif response.status_code == 403:
+            _note_provider_error()
             st.error(f"❌ 카카오 API 인증 오류 (403): API 키를 확인해주세요")
         else:
+            _note_provider_error()
             st.warning(f"카카오 키워드 검색 실패 - 상태: {response.status_code}")
     except Exception as e:
+        _note_provider_error()
         st.error(f"카카오 키워드 검색 오류: {str(e)}")
 
     return None, None, None, None
@@ -42,9 +53,8 @@ def geocode_with_kakao_keyword(address, headers):
 def geocode_with_kakao_address(address, headers):
     """카카오 주소 검색 API"""
     try:
-        url = "https://dapi.kakao.com/v2/local/search/address.json"
         params = {"query": address}
-        response = requests.get(url, headers=headers, params=params, timeout=5)
+        response = get_client().get("kakao", KAKAO_ADDRESS_PATH, params=params, headers=headers)
 
         st.info(f"카카오 주소 검색 API 호출 - 상태 코드: {response.status_code}")
 
@@ -59,12 +69,15 @@ def geocode_with_kakao_address(address, headers):
             else:
                 st.warning("카카오 주소 검색: 결과 없음")
         elif response.status_code == 403:
+            _note_provider_error()
             st.error(f"❌ 카카오 API 인증 오류 (403): API 키를 확인해주세요")
             st.code(f"응답: {response.text[:200]}")
         else:
+            _note_provider_error()
             st.warning(f"카카오 주소 검색 실패 - 상태: {response.status_code}")
             st.code(f"응답: {response.text[:200]}")
     except Exception as e:
+        _note_provider_error()
         st.error(f"카카오 주소 검색 오류: {str(e)}")
 
     return None, None, None, None
@@ -74,36 +87,41 @@ def geocode_with_nominatim(address):
     """Nominatim 지오코더"""
     st.info("Nominatim 지오코더로 시도 중...")
     try:
-        geolocator = Nominatim(user_agent="seongnam_kidsroom_app")
-        location = geolocator.geocode(address, timeout=10)
-        if location:
-            st.success(f"✅ Nominatim 검색 성공")
-            return location.latitude, location.longitude, address, ""
+        params = {"q": address, "format": "json", "limit": 1}
+        response = get_client().get("nominatim", NOMINATIM_SEARCH_PATH, params=params, headers={"User-Agent": NOMINATIM_USER_AGENT})
+        if response.status_code == 200:
+            results = response.json()
+            if results:
+                st.success(f"✅ Nominatim 검색 성공")
+                return float(results[0]['lat']), float(results[0]['lon']), address, ""
+        else:
+            _note_provider_error()
     except:
-        pass
+        _note_provider_error()
 
     return None, None, None, None
 
 
-def geocode_address(address):
-    """
-    주소로 좌표 찾기 함수 (카카오 API 우선, Nominatim 백업)
-    반환값: (위도, 경도, 주소, 장소명)
+def _geocode_uncached(address):
+    """외부 API 순차 조회 (카카오 키워드 → 카카오 주소 → 간소화 주소 → Nominatim)
+
+    반환값: (위도, 경도, 주소, 장소명, 제공자, 캐시 가능 여부)
     """
+    _provider_errors.count = 0
     headers = {
-        "Authorization": f"KakaoAK {KAKAO_API_KEY}",
+        "Authorization": f"KakaoAK {get_kakao_api_key()}",
         "KA": "sdk/1.0 os/javascript lang/ko-KR device/Win32 origin/http://localhost:8501"
     }
 
     # 1. 카카오 키워드 검색 API 우선 시도 (장소명 추출을 위해)
     lat, lon, found_address, place_name = geocode_with_kakao_keyword(address, headers)
     if lat and lon:
-        return lat, lon, found_address, place_name
+        return lat, lon, found_address, place_name, "kakao_keyword", True
 
     # 2. 카카오 주소 검색 API 시도
     lat, lon, found_address, place_name = geocode_with_kakao_address(address, headers)
     if lat and lon:
-        return lat, lon, found_address, place_name
+        return lat, lon, found_address, place_name, "kakao_address", True
 
     # 3. 층/호수 정보 제거한 주소로 재시도
     simplified_address = re.sub(r'\s*\d+층.*|\s*\d+호.*', '', address)
@@ -111,12 +129,27 @@ def geocode_address(address):
         lat, lon, found_address, place_name = geocode_with_kakao_address(simplified_address, headers)
         if lat and lon:
             st.success(f"✅ 간소화된 주소로 성공: {simplified_address}")
-            return lat, lon, found_address, place_name
+            return lat, lon, found_address, place_name, "kakao_address_simplified", True
 
     # 4. Nominatim으로 백업 시도
     lat, lon, found_address, place_name = geocode_with_nominatim(address)
     if lat and lon:
-        return lat, lon, found_address, place_name
+        return lat, lon, found_address, place_name, "nominatim", True
 
-    return None, None, None, None
+    # 모든 제공자가 정상 응답으로 "결과 없음"을 준 경우에만 실패 결과 캐시
+    return None, None, None, None, None, _provider_errors.count == 0
 
+
+def geocode_address(address):
+    """
+    주소로 좌표 찾기 함수 (영구 캐시 우선, 카카오 API, Nominatim 백업)
+    반환값: (위도, 경도, 주소, 장소명)
+    """
+    (lat, lon, found_address, place_name, provider), from_cache = cached_geocode(address, _geocode_uncached)
+    if from_cache:
+        if lat is not None and lon is not None:
+            st.info(f"💾 캐시된 검색 결과 사용 ({provider})")
+        else:
+            st.warning("최근 검색에서 결과가 없었던 주소입니다 (캐시된 실패 결과)")
+            return None, None, None, None
+    return lat, lon, found_address, place_name
@@ -1,101 +1,578 @@
 """
 키즈룸 데이터 관리 모듈
+
+저장 구조:
+- KIDSROOM_DATA_FILE   : 스냅샷 {"seq": N, "updated_at": ..., "kidsrooms": [...]} (구버전 리스트 형식도 읽기 지원)
+- KIDSROOM_JOURNAL_FILE: 스냅샷 이후 변경 내역 (JSON Lines, 변경마다 한 줄 추가)
+- BACKUP_DIR           : 압축(compaction) 시점 스냅샷과 지난 저널 구간 (시점 복원용)
+
+동시성:
+- 키즈룸마다 고정 id와 version을 두고 수정/삭제는 id로 기록 (목록 순서가 바뀌어도 안전)
+- 쓰기는 잠금 파일(fcntl/msvcrt)로 프로세스 간 직렬화, 수정/삭제 시 version이 다르면 VersionConflictError
+- 프로세스마다 현재 상태를 메모리에 두고 저널에서 새로 추가된 부분만 읽어 갱신
 """
 import json
 import os
+import re
 import datetime
-import hashlib
-from config import KIDSROOM_DATA_FILE
+import tempfile
+import threading
+import uuid
+from contextlib import contextmanager
+from config import KIDSROOM_DATA_FILE, KIDSROOM_JOURNAL_FILE, KIDSROOM_COMPACT_EVERY, KIDSROOM_SNAPSHOT_KEEP, KIDSROOM_WATCH_MODE
+from file_watch import WatchedFiles
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
 
 
 BACKUP_DIR = os.path.join(os.path.dirname(KIDSROOM_DATA_FILE), 'backups')
+LOCK_FILE = KIDSROOM_DATA_FILE + '.lock'
 
+_SNAPSHOT_RE = re.compile(r'^kidsroom_snapshot_(\d+)\.json$')
+_SEGMENT_RE = re.compile(r'^kidsroom_journal_(\d+)_(\d+)\.jsonl$')
 
-def load_kidsroom_data():
-    """키즈룸 데이터 로드"""
-    if os.path.exists(KIDSROOM_DATA_FILE):
+# 변경 이력(get_kidsroom_changes용)을 메모리에 유지할 최대 항목 수
+_MAX_TRACKED_CHANGES = 10000
+
+
+class VersionConflictError(Exception):
+    """다른 세션이 먼저 수정/삭제한 키즈룸을 이전 version 기준으로 변경하려는 경우"""
+
+    def __init__(self, kidsroom_id, expected, actual):
+        self.kidsroom_id = kidsroom_id
+        self.expected = expected
+        self.actual = actual
+        state = "삭제됨" if actual is None else f"현재 version {actual}"
+        super().__init__(f"키즈룸 {kidsroom_id} 변경 충돌 (기대 version {expected}, {state})")
+
+
+def _now():
+    return datetime.datetime.now().isoformat(timespec='seconds')
+
+
+def new_kidsroom_id():
+    return uuid.uuid4().hex[:12]
+
+
+def _with_identity(record, fallback_id):
+    """id/version이 없는 구버전 레코드에 결정적인 id 부여 (같은 파일이면 어느 프로세스에서나 같은 id)"""
+    record = dict(record)
+    record.setdefault('id', fallback_id)
+    record.setdefault('version', 1)
+    return record
+
+
+_thread_lock = threading.RLock()
+
+
+@contextmanager
+def _file_lock():
+    """쓰기 잠금: 프로세스 내부는 RLock, 프로세스 간은 잠금 파일 (재진입 시 파일 잠금은 한 번만)"""
+    with _thread_lock:
+        if getattr(_file_lock, 'depth', 0):
+            _file_lock.depth += 1
+            try:
+                yield
+            finally:
+                _file_lock.depth -= 1
+            return
+        os.makedirs(os.path.dirname(LOCK_FILE) or '.', exist_ok=True)
+        with open(LOCK_FILE, 'a+b') as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            _file_lock.depth = 1
+            try:
+                yield
+            finally:
+                _file_lock.depth = 0
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _atomic_write_json(path, payload):
+    """임시 파일에 쓴 뒤 os.replace로 교체 (쓰는 도중 중단돼도 기존 파일 유지)"""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp_', suffix='.json')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _read_snapshot(path=KIDSROOM_DATA_FILE):
+    """스냅샷 로드 -> (seq, updated_at, records)"""
+    if not os.path.exists(path):
+        return 0, None, []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            payload = json.load(f)
+    except Exception:
+        return 0, None, []
+    if isinstance(payload, list):
+        # 저널 도입 전 형식
+        seq, updated_at, records = 0, None, payload
+    else:
+        seq, updated_at, records = payload.get('seq', 0), payload.get('updated_at'), payload.get('kidsrooms', [])
+    return seq, updated_at, [_with_identity(r, f's{seq}-{i}') for i, r in enumerate(records)]
+
+
+def _parse_journal_lines(lines):
+    """저널 줄 파싱 (쓰다 만 줄을 만나면 중단)"""
+    entries = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
         try:
-            with open(KIDSROOM_DATA_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except:
+            entries.append(json.loads(line))
+        except ValueError:
+            break
+    return entries
+
+
+def _read_journal(path=KIDSROOM_JOURNAL_FILE):
+    """저널 항목 목록 (마지막 줄이 쓰다 만 상태면 무시)"""
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return _parse_journal_lines(f)
+
+
+def _apply_op(records, entry):
+    """저널 항목 하나를 {id: record}에 적용 -> 영향받은 id 목록"""
+    op = entry['op']
+    if op == 'add':
+        record = _with_identity(entry['record'], f"s{entry['seq']}")
+        records[record['id']] = record
+        return [record['id']]
+    if op == 'replace':
+        affected = list(records)
+        records.clear()
+        for i, r in enumerate(entry['records']):
+            record = _with_identity(r, f"s{entry['seq']}-{i}")
+            records[record['id']] = record
+        return affected + list(records)
+
+    key = entry.get('id')
+    if key is None:
+        # id 도입 전 저널: 목록 위치 기준
+        index = entry['index']
+        if not 0 <= index < len(records):
             return []
-    return []
+        key = list(records)[index]
+    current = records.get(key)
+    if current is None:
+        return []
+    if op == 'update':
+        records[key] = {**current, **entry['fields'], 'version': entry.get('version', current['version'] + 1)}
+    elif op == 'remove':
+        del records[key]
+    return [key]
+
+
+def _replay(base_seq, records, entries, until=None):
+    """base_seq 이후 저널 항목 적용 (until 필터 함수가 False를 주는 항목에서 중단)"""
+    seq = base_seq
+    updated_at = None
+    for entry in entries:
+        if entry['seq'] <= base_seq:
+            continue
+        if until is not None and not until(entry):
+            break
+        _apply_op(records, entry)
+        seq = entry['seq']
+        updated_at = entry.get('ts')
+    return seq, updated_at, records
+
 
+class _StoreState:
+    """프로세스 공용 현재 상태 (스냅샷 + 저널 재생 결과, _thread_lock 안에서만 변경)"""
 
-def _backup_current(data):
-    os.makedirs(BACKUP_DIR, exist_ok=True)
-    ts = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
-    backup_path = os.path.join(BACKUP_DIR, f'kidsroom_data_{ts}.json')
+    def __init__(self):
+        self.snapshot_sig = None
+        self.journal_id = None
+        self.offset = 0
+        self.base_seq = 0
+        self.seq = 0
+        self.updated_at = None
+        self.records = {}
+        self.changes = []        # [(seq, id)] - tracked_since 이후 변경 이력
+        self.tracked_since = 0
+
+
+_state = _StoreState()
+
+
+def _stat(path):
     try:
-        with open(backup_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-    except Exception:
-        pass
+        return os.stat(path)
+    except FileNotFoundError:
+        return None
 
 
-def save_kidsroom_data(data):
+def _refresh():
+    """스냅샷이 바뀌었거나 저널이 교체됐으면 다시 읽고, 아니면 저널에 새로 붙은 줄만 적용"""
+    s = _state
+    snap = _stat(KIDSROOM_DATA_FILE)
+    snapshot_sig = (snap.st_ino, snap.st_size, snap.st_mtime_ns) if snap else None
+    journal = _stat(KIDSROOM_JOURNAL_FILE)
+    journal_id = (journal.st_dev, journal.st_ino) if journal else None
+    rotated = s.offset > 0 and (journal_id != s.journal_id or journal.st_size < s.offset)
+
+    if snapshot_sig != s.snapshot_sig or rotated:
+        base_seq, updated_at, records = _read_snapshot()
+        if s.tracked_since <= base_seq <= s.seq:
+            # 다른 프로세스의 압축: 이미 본 상태이므로 변경 이력은 이어서 사용
+            s.changes = [c for c in s.changes if c[0] <= base_seq]
+        else:
+            s.changes = []
+            s.tracked_since = base_seq
+        s.snapshot_sig = snapshot_sig
+        s.base_seq = s.seq = base_seq
+        s.updated_at = updated_at
+        s.records = {r['id']: r for r in records}
+        s.offset = 0
+        s.journal_id = None
+
+    if journal is not None and journal.st_size > s.offset:
+        with open(KIDSROOM_JOURNAL_FILE, 'rb') as f:
+            f.seek(s.offset)
+            data = f.read(journal.st_size - s.offset)
+        complete = data[:data.rfind(b'\n') + 1]
+        for entry in _parse_journal_lines(complete.decode('utf-8').splitlines()):
+            if entry['seq'] <= s.seq:
+                continue
+            for key in _apply_op(s.records, entry):
+                s.changes.append((entry['seq'], key))
+            s.seq = entry['seq']
+            s.updated_at = entry.get('ts')
+        s.offset += len(complete)
+        s.journal_id = journal_id
+
+    if len(s.changes) > _MAX_TRACKED_CHANGES:
+        drop = len(s.changes) - _MAX_TRACKED_CHANGES
+        s.tracked_since = s.changes[drop - 1][0]
+        s.changes = s.changes[drop:]
+
+
+def load_kidsroom_state():
+    """현재 seq와 키즈룸 목록을 함께 반환 -> (seq, records)"""
+    with _thread_lock:
+        _refresh()
+        return _state.seq, [dict(r) for r in _state.records.values()]
+
+
+def load_kidsroom_data():
+    """키즈룸 데이터 로드 (스냅샷 + 저널 재생)"""
     try:
-        if os.path.exists(KIDSROOM_DATA_FILE):
-            # 기존 내용 로드하여 백업
-            try:
-                with open(KIDSROOM_DATA_FILE, 'r', encoding='utf-8') as f:
-                    old = json.load(f)
-            except Exception:
-                old = []
-            _backup_current(old)
+        return load_kidsroom_state()[1]
     except Exception:
-        pass
-    with open(KIDSROOM_DATA_FILE, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+        return []
+
+
+def get_kidsroom_changes(since_seq):
+    """since_seq 이후 바뀐 레코드 -> (seq, 추가/수정된 레코드, 삭제된 id 목록)
+
+    변경 이력이 남아 있지 않으면 (재시작, 이력 한도 초과 등) None -> 전체 재로딩 필요
+    """
+    with _thread_lock:
+        _refresh()
+        s = _state
+        if since_seq is None or not s.tracked_since <= since_seq <= s.seq:
+            return None
+        keys = dict.fromkeys(key for seq, key in s.changes if seq > since_seq)
+        upserts = [dict(s.records[k]) for k in keys if k in s.records]
+        removed = [k for k in keys if k not in s.records]
+        return s.seq, upserts, removed
+
+
+def apply_kidsroom_changes(kidsroom_list, upserts, removed_ids):
+    """세션 목록에 변경분 반영 (기존 항목은 제자리 교체, 새 항목은 끝에 추가)"""
+    removed = set(removed_ids)
+    by_id = {r['id']: r for r in upserts}
+    merged = [by_id.pop(item.get('id'), item) for item in kidsroom_list if item.get('id') not in removed]
+    merged.extend(by_id.values())
+    return merged
+
+
+def sync_kidsroom_list(kidsroom_list, since_seq):
+    """since_seq 시점의 세션 목록을 최신으로 -> (목록, seq, 바뀐 레코드 수 또는 None=전체 재로딩)"""
+    changes = get_kidsroom_changes(since_seq)
+    if changes is None:
+        seq, records = load_kidsroom_state()
+        return records, seq, None
+    seq, upserts, removed = changes
+    if not upserts and not removed:
+        return kidsroom_list, seq, 0
+    return apply_kidsroom_changes(kidsroom_list, upserts, removed), seq, len(upserts) + len(removed)
+
+
+def _snapshot_path(seq):
+    return os.path.join(BACKUP_DIR, f'kidsroom_snapshot_{seq:08d}.json')
+
+
+def _commit(build_ops):
+    """쓰기 잠금 안에서 최신 상태 기준으로 변경 생성 후 저널에 한 번에 추가, 일정 건수마다 스냅샷으로 압축
+
+    build_ops(records) -> [(op, fields)] (records는 {id: record}, 충돌이면 예외를 던져 중단)
+    """
+    with _file_lock():
+        _refresh()
+        s = _state
+        ops = build_ops(s.records)
+        if not ops:
+            return []
+
+        if s.seq == s.base_seq and not os.path.exists(_snapshot_path(s.base_seq)):
+            # 저널 구간의 시작 상태를 보관해 두어야 시점 복원 가능
+            _atomic_write_json(_snapshot_path(s.base_seq), {
+                'seq': s.base_seq, 'updated_at': s.updated_at, 'kidsrooms': list(s.records.values()),
+            })
+
+        ts = _now()
+        new_entries = [{'seq': s.seq + i, 'ts': ts, 'op': op, **fields} for i, (op, fields) in enumerate(ops, start=1)]
+        os.makedirs(os.path.dirname(KIDSROOM_JOURNAL_FILE) or '.', exist_ok=True)
+        with open(KIDSROOM_JOURNAL_FILE, 'a', encoding='utf-8') as f:
+            f.write(''.join(json.dumps(e, ensure_ascii=False) + '\n' for e in new_entries))
+            f.flush()
+            os.fsync(f.fileno())
+        _refresh()
+
+        if s.seq - s.base_seq >= KIDSROOM_COMPACT_EVERY:
+            compact_journal()
+        return new_entries
+
+
+def compact_journal():
+    """저널을 새 스냅샷으로 압축하고 지난 저널 구간은 BACKUP_DIR로 보관"""
+    with _file_lock():
+        _refresh()
+        s = _state
+        if s.seq == s.base_seq:
+            return s.seq
+
+        snapshot = {'seq': s.seq, 'updated_at': s.updated_at, 'kidsrooms': list(s.records.values())}
+        os.makedirs(BACKUP_DIR, exist_ok=True)
+        _atomic_write_json(_snapshot_path(s.seq), snapshot)
+        _atomic_write_json(KIDSROOM_DATA_FILE, snapshot)
+        # 스냅샷 교체 후 중단되더라도 seq가 스냅샷 이하인 저널 항목은 재생 시 건너뜀
+        if os.path.exists(KIDSROOM_JOURNAL_FILE):
+            os.replace(KIDSROOM_JOURNAL_FILE, os.path.join(BACKUP_DIR, f'kidsroom_journal_{s.base_seq + 1:08d}_{s.seq:08d}.jsonl'))
+        # 메모리 상태는 그대로 유효 - 파일 위치 정보만 갱신
+        snap = os.stat(KIDSROOM_DATA_FILE)
+        s.snapshot_sig = (snap.st_ino, snap.st_size, snap.st_mtime_ns)
+        s.base_seq = s.seq
+        s.offset = 0
+        s.journal_id = None
+        _prune_backups()
+        return s.seq
+
+
+def _list_backups():
+    snapshots, segments = [], []
+    if os.path.isdir(BACKUP_DIR):
+        for name in os.listdir(BACKUP_DIR):
+            m = _SNAPSHOT_RE.match(name)
+            if m:
+                snapshots.append((int(m.group(1)), os.path.join(BACKUP_DIR, name)))
+                continue
+            m = _SEGMENT_RE.match(name)
+            if m:
+                segments.append((int(m.group(1)), int(m.group(2)), os.path.join(BACKUP_DIR, name)))
+    return sorted(snapshots), sorted(segments)
+
+
+def _prune_backups():
+    """최근 KIDSROOM_SNAPSHOT_KEEP개 스냅샷과 그 이후 저널 구간만 유지"""
+    snapshots, segments = _list_backups()
+    if len(snapshots) <= KIDSROOM_SNAPSHOT_KEEP:
+        return
+    oldest_kept = snapshots[-KIDSROOM_SNAPSHOT_KEEP][0]
+    for seq, path in snapshots[:-KIDSROOM_SNAPSHOT_KEEP]:
+        os.remove(path)
+    for first, last, path in segments:
+        if last <= oldest_kept:
+            os.remove(path)
+
+
+def restore_kidsroom_data(at=None, seq=None, apply=False):
+    """시점 복원: at(datetime 또는 ISO 문자열) 이전 또는 seq 이하의 마지막 상태 반환
+
+    apply=True면 복원 결과를 'replace' 변경으로 저널에 기록 (복원 자체도 되돌릴 수 있음)
+    """
+    if at is not None and not isinstance(at, str):
+        at = at.isoformat(timespec='seconds')
+
+    def until(entry):
+        if seq is not None and entry['seq'] > seq:
+            return False
+        return at is None or entry.get('ts', '') <= at
+
+    snapshots, segments = _list_backups()
+    base = None
+    for snap_seq, path in snapshots:
+        snap = _read_snapshot(path)
+        fits = (seq is None or snap_seq <= seq) and (at is None or not snap[1] or snap[1] <= at)
+        if fits:
+            base = snap
+    if base is None:
+        raise ValueError("복원 가능한 스냅샷이 없습니다 (요청 시점이 보관 기간 이전)")
+
+    base_seq, _, base_records = base
+    entries = []
+    for first, last, path in segments:
+        if last > base_seq:
+            entries.extend(_read_journal(path))
+    entries.extend(_read_journal())
+    entries.sort(key=lambda e: e['seq'])
+    _, _, records = _replay(base_seq, {r['id']: r for r in base_records}, entries, until=until)
+    records = list(records.values())
+
+    if apply:
+        save_kidsroom_data(records)
+    return records
+
+
+def save_kidsroom_data(data):
+    """전체 목록 교체 저장 (저널에 'replace' 한 건으로 기록)"""
+    records = [r if 'id' in r else _with_identity(r, new_kidsroom_id()) for r in data]
+    _commit(lambda current: [('replace', {'records': records})])
+
+
+def _new_record(name, address, lat, lon):
+    return {"id": new_kidsroom_id(), "version": 1, "name": name, "address": address, "lat": lat, "lon": lon}
 
 
 def add_kidsroom(kidsroom_list, name, address, lat, lon):
     """키즈룸 추가"""
-    kidsroom_list.append({
-        "name": name,
-        "address": address,
-        "lat": lat,
-        "lon": lon
-    })
-    save_kidsroom_data(kidsroom_list)
+    record = _new_record(name, address, lat, lon)
+    _commit(lambda current: [('add', {'record': record})])
+    kidsroom_list.append(dict(record))
     return kidsroom_list
 
 
-def remove_kidsroom(kidsroom_list, index):
-    """키즈룸 삭제"""
-    kidsroom_list.pop(index)
-    save_kidsroom_data(kidsroom_list)
+def add_kidsrooms(kidsroom_list, records):
+    """키즈룸 여러 개를 한 번에 추가 (저널 쓰기 1회)"""
+    new_records = [_new_record(r["name"], r["address"], r["lat"], r["lon"]) for r in records]
+    _commit(lambda current: [('add', {'record': r}) for r in new_records])
+    kidsroom_list.extend(dict(r) for r in new_records)
     return kidsroom_list
 
 
-def update_kidsroom(kidsroom_list, index, name=None, address=None, lat=None, lon=None):
-    """기존 키즈룸 정보 수정 후 저장"""
-    if 0 <= index < len(kidsroom_list):
-        item = kidsroom_list[index]
-        if name is not None and name.strip():
-            item['name'] = name.strip()
-        if address is not None and address.strip():
-            item['address'] = address.strip()
-        if lat is not None:
-            try:
-                item['lat'] = float(lat)
-            except ValueError:
-                pass
-        if lon is not None:
-            try:
-                item['lon'] = float(lon)
-            except ValueError:
-                pass
-        save_kidsroom_data(kidsroom_list)
+def _resolve(kidsroom_list, kidsroom_id):
+    """id (또는 구버전 호출 방식인 목록 인덱스) -> (id, 세션 목록의 해당 항목)"""
+    if isinstance(kidsroom_id, int):
+        item = kidsroom_list[kidsroom_id] if 0 <= kidsroom_id < len(kidsroom_list) else None
+        return (item.get('id') if item else None), item
+    return kidsroom_id, next((k for k in kidsroom_list if k.get('id') == kidsroom_id), None)
+
+
+def remove_kidsroom(kidsroom_list, kidsroom_id, expected_version=None):
+    """키즈룸 삭제 (expected_version을 생략하면 세션 목록의 version 기준, 이미 삭제됐으면 목록에서만 제거)"""
+    key, item = _resolve(kidsroom_list, kidsroom_id)
+    if key is None:
+        return kidsroom_list
+    if expected_version is None and item is not None:
+        expected_version = item.get('version')
+
+    def build(records):
+        current = records.get(key)
+        if current is None:
+            return []
+        if expected_version is not None and current['version'] != expected_version:
+            raise VersionConflictError(key, expected_version, current['version'])
+        return [('remove', {'id': key})]
+
+    _commit(build)
+    kidsroom_list[:] = [k for k in kidsroom_list if k.get('id') != key]
     return kidsroom_list
 
 
-def get_kidsroom_file_hash():
-    """kidsroom_data.json 파일 내용 SHA256 해시 반환 (없으면 None)"""
-    if os.path.exists(KIDSROOM_DATA_FILE):
+def update_kidsroom(kidsroom_list, kidsroom_id, name=None, address=None, lat=None, lon=None, expected_version=None):
+    """기존 키즈룸 정보 수정 후 저장 (변경된 필드만 저널에 기록)
+
+    expected_version을 생략하면 세션 목록의 version 기준으로 확인하고,
+    그 사이 다른 세션이 수정/삭제했으면 VersionConflictError
+    """
+    key, item = _resolve(kidsroom_list, kidsroom_id)
+    if key is None:
+        return kidsroom_list
+    if expected_version is None and item is not None:
+        expected_version = item.get('version')
+
+    fields = {}
+    if name is not None and name.strip():
+        fields['name'] = name.strip()
+    if address is not None and address.strip():
+        fields['address'] = address.strip()
+    if lat is not None:
         try:
-            with open(KIDSROOM_DATA_FILE, 'rb') as f:
-                return hashlib.sha256(f.read()).hexdigest()
-        except Exception:
-            return None
-    return None
+            fields['lat'] = float(lat)
+        except ValueError:
+            pass
+    if lon is not None:
+        try:
+            fields['lon'] = float(lon)
+        except ValueError:
+            pass
+
+    def build(records):
+        current = records.get(key)
+        actual = current['version'] if current else None
+        if current is None or (expected_version is not None and actual != expected_version):
+            raise VersionConflictError(key, expected_version, actual)
+        return [('update', {'id': key, 'fields': fields, 'version': actual + 1})]
+
+    entry = _commit(build)[0]
+    if item is not None:
+        item.update(fields)
+        item['version'] = entry['version']
+    return kidsroom_list
+
+
+_watched = None
+_watched_lock = threading.Lock()
+
+
+def _get_watched_files():
+    """스냅샷 + 저널 변경 감지 서비스 (프로세스당 하나, 첫 사용 시 시작)"""
+    global _watched
+    with _watched_lock:
+        if _watched is None:
+            _watched = WatchedFiles([KIDSROOM_DATA_FILE, KIDSROOM_JOURNAL_FILE], mode=KIDSROOM_WATCH_MODE)
+        return _watched
+
+
+def get_kidsroom_generation():
+    """키즈룸 파일 내용이 바뀔 때마다 증가하는 세대 번호 (세션은 이 값만 비교)"""
+    return _get_watched_files().generation()
+
+
+def get_kidsroom_watch_mode():
+    """변경 감지 방식: 'inotify' 또는 'poll'"""
+    return _get_watched_files().mode
+
+
+def get_kidsroom_file_hash():
+    """스냅샷 + 저널 파일 내용 SHA256 해시 반환 (없으면 None, 파일 stat이 바뀐 경우에만 다시 해시)"""
+    try:
+        return _get_watched_files().content_hash()
+    except Exception:
+        return None
@@ -0,0 +1,371 @@
+"""
+키즈룸 검색 인덱스 - 이름/주소 문자 n-gram 역색인 + 한글 자모 단위 확인 + 초성 검색
+
+- 후보 추출: 정규화한 이름/주소의 문자 2-gram 역색인 (한글은 음절 하나가 정보량이 커서 2글자 검색어가 가장 흔함)
+  n글자 이하 검색어("키", "키즈")는 마지막 글자가 될 수 있는 음절까지 포함하는 n-gram 목록으로 조회
+- 확인/순위: 자모로 풀어 쓴 문자열에서 부분 일치를 확인하므로 입력 중인 글자("키즈루", "키즈ㄹ")도 검색됨
+- 초성만 입력("ㅋㅈㄹ")하면 이름 초성 문자열에서 검색
+- 변경분만 반영: sync()가 id별 (version, 이름, 주소)를 비교해 바뀐 항목만 다시 색인,
+  삭제 항목은 묘비(tombstone)로 두었다가 일정 비율을 넘으면 역색인을 새로 만듦
+"""
+import re
+import unicodedata
+
+from config import KIDSROOM_SEARCH_NGRAM, KIDSROOM_SEARCH_REBUILD_RATIO
+
+_HANGUL_BASE = 0xAC00
+_HANGUL_LAST = 0xD7A3
+# 호환용 자모 (키보드 입력 그대로의 글자)
+_CHOSEONG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+_JUNGSEONG = ['ㅏ', 'ㅐ', 'ㅑ', 'ㅒ', 'ㅓ', 'ㅔ', 'ㅕ', 'ㅖ', 'ㅗ', 'ㅗㅏ', 'ㅗㅐ', 'ㅗㅣ', 'ㅛ', 'ㅜ', 'ㅜㅓ', 'ㅜㅔ',
+              'ㅜㅣ', 'ㅠ', 'ㅡ', 'ㅡㅣ', 'ㅣ']
+_JONGSEONG = ['', 'ㄱ', 'ㄲ', 'ㄱㅅ', 'ㄴ', 'ㄴㅈ', 'ㄴㅎ', 'ㄷ', 'ㄹ', 'ㄹㄱ', 'ㄹㅁ', 'ㄹㅂ', 'ㄹㅅ', 'ㄹㅌ', 'ㄹㅍ', 'ㄹㅎ',
+              'ㅁ', 'ㅂ', 'ㅂㅅ', 'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ']
+# 겹모음/겹받침 호환 자모를 낱자로 (입력기가 조합 중에 보여주는 글자)
+_COMPOUND_JAMO = {
+    'ㄳ': 'ㄱㅅ', 'ㄵ': 'ㄴㅈ', 'ㄶ': 'ㄴㅎ', 'ㄺ': 'ㄹㄱ', 'ㄻ': 'ㄹㅁ', 'ㄼ': 'ㄹㅂ', 'ㄽ': 'ㄹㅅ', 'ㄾ': 'ㄹㅌ',
+    'ㄿ': 'ㄹㅍ', 'ㅀ': 'ㄹㅎ', 'ㅄ': 'ㅂㅅ', 'ㅘ': 'ㅗㅏ', 'ㅙ': 'ㅗㅐ', 'ㅚ': 'ㅗㅣ', 'ㅝ': 'ㅜㅓ', 'ㅞ': 'ㅜㅔ',
+    'ㅟ': 'ㅜㅣ', 'ㅢ': 'ㅡㅣ',
+}
+_CHOSEONG_SET = frozenset(_CHOSEONG)
+_SPACES = re.compile(r'\s+')
+
+# 순위 점수 (검색어 단어마다 합산)
+_SCORE_NAME_EXACT = 100
+_SCORE_NAME_PREFIX = 80
+_SCORE_NAME_WORD = 60
+_SCORE_NAME = 50
+_SCORE_NAME_CHOSEONG = 40
+_SCORE_ADDRESS_WORD = 30
+_SCORE_ADDRESS = 20
+# 인덱스마다 결과를 보관할 최근 검색어 수
+_RESULT_CACHE_SIZE = 8
+
+
+def normalize(text):
+    """검색용 정규화 (NFC, 소문자, 연속 공백 하나로)"""
+    return _SPACES.sub(' ', unicodedata.normalize('NFC', str(text or '')).lower()).strip()
+
+
+def _syllables():
+    for offset in range(_HANGUL_LAST - _HANGUL_BASE + 1):
+        yield _HANGUL_BASE + offset, offset // 588, offset % 588 // 28, offset % 28
+
+
+# str.translate용 변환표 (음절 11,172자를 미리 풀어 두어 글자마다 파이썬 연산을 하지 않음)
+_JAMO_TABLE = {code: _CHOSEONG[cho] + _JUNGSEONG[jung] + _JONGSEONG[jong] for code, cho, jung, jong in _syllables()}
+_JAMO_TABLE.update({ord(ch): jamo for ch, jamo in _COMPOUND_JAMO.items()})
+_CHOSEONG_TABLE = {code: _CHOSEONG[cho] for code, cho, _, _ in _syllables()}
+_CHOSEONG_TABLE[ord(' ')] = None
+
+
+def decompose(text):
+    """한글 음절을 호환 자모로 풀어 쓴 문자열 ("룸" -> "ㄹㅜㅁ", 한글 외 글자는 그대로)"""
+    return text.translate(_JAMO_TABLE)
+
+
+def choseong(text):
+    """한글 음절의 초성만 모은 문자열 (공백 제외, 한글 외 글자는 그대로)"""
+    return text.translate(_CHOSEONG_TABLE)
+
+
+def is_choseong_query(term):
+    return len(term) > 1 and all(ch in _CHOSEONG_SET for ch in term)
+
+
+def ngrams(text, n=KIDSROOM_SEARCH_NGRAM):
+    """공백을 뺀 문자 n-gram 집합 (n보다 짧으면 문자열 전체)"""
+    compact = text.replace(' ', '')
+    if len(compact) <= n:
+        return {compact} if compact else set()
+    return {compact[i:i + n] for i in range(len(compact) - n + 1)}
+
+
+def _is_jamo(ch):
+    return 'ㄱ' <= ch <= 'ㆎ'
+
+
+def _last_char_prefix(ch):
+    """검색어 마지막 글자와 자모 단위로 일치할 수 있는 문서 글자의 공통 자모 접두 (음절은 초성+중성, 낱자는 첫 자모)
+
+    예: '즐' -> 'ㅈㅡ' ('즈' + 다음 글자 초성 'ㄹ'일 수도 있으므로 받침은 뺌), '호' -> 'ㅎㅗ' ('화', '황'도 포함)
+    """
+    code = ord(ch)
+    if _HANGUL_BASE <= code <= _HANGUL_LAST:
+        offset = code - _HANGUL_BASE
+        return _CHOSEONG[offset // 588] + _JUNGSEONG[offset % 588 // 28]
+    return decompose(ch)[:1]
+
+
+def _syllables_with_prefix(ch):
+    """음절 ch와 초성이 같고 중성이 같거나 그 겹모음인 모든 음절 (받침 포함, '호' -> 호, 혹, ..., 화, ..., 회, ...)"""
+    offset = ord(ch) - _HANGUL_BASE
+    cho, jung = offset // 588, offset % 588 // 28
+    return [
+        chr(_HANGUL_BASE + cho * 588 + other * 28 + jong)
+        for other, vowel in enumerate(_JUNGSEONG) if vowel.startswith(_JUNGSEONG[jung])
+        for jong in range(28)
+    ]
+
+
+def _may_be_composing(ch):
+    """입력기가 아직 조합 중일 수 있는 글자 (낱자, 받침이 있거나 겹모음이 될 수 있는 음절)
+
+    예: "키즐"의 '즐'은 '즈' + 다음 글자 초성 'ㄹ'일 수 있고, '호'는 '화'가 되는 중일 수 있음
+    """
+    if _is_jamo(ch):
+        return True
+    code = ord(ch)
+    if not _HANGUL_BASE <= code <= _HANGUL_LAST:
+        return False
+    offset = code - _HANGUL_BASE
+    return offset % 28 != 0 or _JUNGSEONG[offset % 588 // 28] in ('ㅗ', 'ㅜ', 'ㅡ')
+
+
+class _Doc:
+    __slots__ = ('record', 'signature', 'name', 'address', 'name_jamo', 'address_jamo', 'name_choseong')
+
+    def __init__(self, record, signature):
+        self.record = record
+        self.signature = signature
+        self.name = normalize(record.get('name'))
+        self.address = normalize(record.get('address'))
+        # 앞에 공백을 붙여 두면 단어 시작 일치를 (' ' + 검색어) in 한 번으로 확인 가능
+        self.name_jamo = ' ' + decompose(self.name)
+        self.address_jamo = ' ' + decompose(self.address)
+        self.name_choseong = choseong(self.name)
+
+
+def _signature(record):
+    return record.get('version'), record.get('name'), record.get('address')
+
+
+class KidsroomSearchIndex:
+    """키즈룸 목록 검색 인덱스 (세션마다 하나, sync()로 목록 변경분만 반영)
+
+    내부 문서 번호는 추가 순서대로 증가하며 삭제/수정된 문서 번호는 묘비로 남았다가 재구성 때 정리됨
+    """
+
+    def __init__(self, records=(), n=KIDSROOM_SEARCH_NGRAM, rebuild_ratio=KIDSROOM_SEARCH_REBUILD_RATIO):
+        self.n = n
+        self.rebuild_ratio = rebuild_ratio
+        self._docs = []          # 문서 번호 -> _Doc (삭제되면 None)
+        self._postings = {}      # n-gram -> [문서 번호]
+        self._partials = {}      # n보다 짧은 부분 문자열 -> 그 부분을 포함하는 n-gram 집합
+        self._by_id = {}         # 키즈룸 id -> 문서 번호
+        self._order = {}         # 키즈룸 id -> 목록 내 위치 (동점일 때 원래 순서 유지)
+        self._dead = 0
+        self._results = {}       # 최근 검색어 -> 결과 (페이지 이동 rerun용, 색인이 바뀌면 비움)
+        self.sync(records)
+
+    def __len__(self):
+        return len(self._by_id)
+
+    # ---- 색인 유지 ----
+    def _index(self, record, signature):
+        doc_no = len(self._docs)
+        doc = _Doc(record, signature)
+        self._docs.append(doc)
+        self._by_id[record['id']] = doc_no
+        postings = self._postings
+        for gram in ngrams(doc.name, self.n) | ngrams(doc.address, self.n):
+            bucket = postings.get(gram)
+            if bucket is None:
+                postings[gram] = [doc_no]
+                self._add_partials(gram)
+            else:
+                bucket.append(doc_no)
+
+    def _add_partials(self, gram):
+        partials = self._partials
+        for size in range(1, min(self.n, len(gram) + 1)):
+            for start in range(len(gram) - size + 1):
+                partials.setdefault(gram[start:start + size], set()).add(gram)
+
+    def _drop(self, record_id):
+        doc_no = self._by_id.pop(record_id, None)
+        if doc_no is not None:
+            self._docs[doc_no] = None
+            self._dead += 1
+
+    def _rebuild(self):
+        live = [doc for doc in self._docs if doc is not None]
+        self._docs, self._postings, self._partials, self._by_id, self._dead = [], {}, {}, {}, 0
+        for doc in live:
+            self._index(doc.record, doc.signature)
+
+    def sync(self, records):
+        """목록과 색인을 맞춤 -> 다시 색인한 항목 수
+
+        id별 (version, 이름, 주소)가 같으면 건너뛰고 좌표 등 나머지 필드 변경은 레코드 참조만 교체
+        (이미 색인한 레코드 객체 그대로면 version만 비교 - 제자리 수정도 kidsroom_manager가 version을 올림)
+        """
+        by_id, docs = self._by_id, self._docs
+        changed = matched = 0
+        for record in records:
+            record_id = record.get('id')
+            if record_id is None:
+                continue
+            doc_no = by_id.get(record_id)
+            if doc_no is not None:
+                doc = docs[doc_no]
+                if (doc.record is record and doc.signature[0] == record.get('version')) or doc.signature == _signature(record):
+                    doc.record = record
+                    matched += 1
+                    continue
+                self._drop(record_id)
+            self._index(record, _signature(record))
+            changed += 1
+        if matched + changed != len(by_id):
+            # 목록에서 빠진 항목 삭제 (전부 그대로면 id 집합을 만들지 않음)
+            seen = {record.get('id') for record in records}
+            for record_id in [rid for rid in by_id if rid not in seen]:
+                self._drop(record_id)
+                changed += 1
+        if changed or len(self._order) != len(by_id):
+            self._order = {record.get('id'): pos for pos, record in enumerate(records)}
+            self._results.clear()
+        if self._dead > self.rebuild_ratio * max(len(self._docs), 1):
+            self._rebuild()
+        return changed
+
+    # ---- 조회 ----
+    def get(self, record_id):
+        """id로 레코드 조회 (없으면 None)"""
+        doc_no = self._by_id.get(record_id)
+        return self._docs[doc_no].record if doc_no is not None else None
+
+    def _candidates(self, term):
+        """term과 자모 단위로 일치할 수 있는 문서 번호 집합 (역색인으로 좁힐 수 없으면 None)
+
+        - n글자보다 길면: 조합 중일 수 있는 마지막 글자를 뺀 나머지(stem)의 n-gram을 모두 가진 문서
+        - n글자 이하면: 마지막 글자 앞부분 뒤에 마지막 글자가 될 수 있는 음절이 오는 n-gram들의 문서 합집합
+          ("키즈" -> '키즈' 그대로와 '키즐', '키즘' 등, "키" -> '키', '킥', '킨' 등을 포함하는 n-gram)
+        - 끝의 낱자는 앞 글자의 받침일 수 있으므로("키즈ㄹ" -> '키즐') 빼고, 앞 글자를 마지막 글자로 보고 조회
+        - 낱자 하나만 입력한 경우 등 앞부분 없이 마지막 글자를 음절로 펼칠 수 없을 때만 None -> 전체 확인
+        """
+        extend_last = len(term) > 1 and _is_jamo(term[-1])
+        if extend_last:
+            term = term[:-1]
+        if not term:
+            return None
+        if len(term) <= self.n:
+            return self._short_candidates(term[:-1], term[-1])
+        stem = term[:-1] if extend_last or _may_be_composing(term[-1]) else term
+        if any(_is_jamo(ch) for ch in stem):
+            return None
+        grams = ngrams(stem, self.n)
+        buckets = []
+        for gram in grams:
+            bucket = self._postings.get(gram)
+            if not bucket:
+                return set()
+            buckets.append(bucket)
+        buckets.sort(key=len)
+        result = set(buckets[0])
+        for bucket in buckets[1:]:
+            result.intersection_update(bucket)
+            if not result:
+                break
+        return result
+
+    def _grams_containing(self, part):
+        if len(part) >= self.n:
+            return (part,) if part in self._postings else ()
+        return self._partials.get(part, ())
+
+    def _short_candidates(self, head, last):
+        if any(_is_jamo(ch) for ch in head):
+            return None
+        if not head:
+            if not _HANGUL_BASE <= ord(last) <= _HANGUL_LAST:
+                # 낱자는 앞 글자의 받침일 수도 있어 음절로 펼칠 수 없음, 한글 외 글자는 그 글자 그대로
+                return None if _is_jamo(last) else self._postings_union(self._grams_containing(last))
+            grams = set()
+            for syllable in _syllables_with_prefix(last):
+                grams.update(self._grams_containing(syllable))
+            return self._postings_union(grams)
+        prefix, size = _last_char_prefix(last), len(head)
+        grams = [
+            gram for gram in self._grams_containing(head)
+            if any(gram[i:i + size] == head and decompose(gram[i + size]).startswith(prefix)
+                   for i in range(len(gram) - size))
+        ]
+        return self._postings_union(grams)
+
+    def _postings_union(self, grams):
+        result = set()
+        for gram in grams:
+            result.update(self._postings[gram])
+        return result
+
+    def search(self, query, limit=None):
+        """검색어와 일치하는 레코드를 점수 순으로 반환
+
+        - 공백으로 나눈 단어가 모두 이름 또는 주소에 있어야 일치 (이름 완전 일치 > 이름 시작 > 이름 단어 시작 >
+          이름 포함 > 이름 초성 > 주소 단어 시작 > 주소 포함 점수 합산, 동점이면 원래 목록 순서)
+        - 검색어가 키즈룸 id와 정확히 같으면 그 항목만 반환
+        """
+        raw = str(query or '').strip()
+        if not raw:
+            return []
+        direct = self.get(raw)
+        if direct is not None:
+            return [direct]
+
+        key = normalize(raw)
+        results = self._results.pop(key, None)
+        if results is not None:
+            self._results[key] = results
+        else:
+            results = self._results[key] = self._rank(key.split(' '))
+            if len(self._results) > _RESULT_CACHE_SIZE:
+                self._results.pop(next(iter(self._results)))
+        return results[:limit] if limit is not None else list(results)
+
+    def _rank(self, terms):
+        candidates = None
+        for term in terms:
+            if is_choseong_query(term):
+                continue
+            term_candidates = self._candidates(term)
+            if term_candidates is None:
+                continue
+            candidates = term_candidates if candidates is None else candidates & term_candidates
+            if not candidates:
+                return []
+        if candidates is None:
+            # 낱자/초성 검색 등 역색인으로 좁힐 수 없는 경우 전체 확인
+            candidates = (i for i, doc in enumerate(self._docs) if doc is not None)
+
+        prepared = [(term, decompose(term), is_choseong_query(term)) for term in terms]
+        prepared = [(term, jamo, ' ' + jamo, choseong_only) for term, jamo, choseong_only in prepared]
+        docs, order = self._docs, self._order
+        scored = []
+        for doc_no in candidates:
+            doc = docs[doc_no]
+            if doc is None:
+                continue
+            total = 0
+            for term, jamo, word_start, choseong_only in prepared:
+                if choseong_only:
+                    if term not in doc.name_choseong:
+                        break
+                    total += _SCORE_NAME_CHOSEONG
+                elif doc.name == term:
+                    total += _SCORE_NAME_EXACT
+                elif jamo in doc.name_jamo:
+                    if doc.name_jamo.startswith(word_start):
+                        total += _SCORE_NAME_PREFIX
+                    else:
+                        total += _SCORE_NAME_WORD if word_start in doc.name_jamo else _SCORE_NAME
+                elif jamo in doc.address_jamo:
+                    total += _SCORE_ADDRESS_WORD if word_start in doc.address_jamo else _SCORE_ADDRESS
+                else:
+                    break
+            else:
+                record = doc.record
+                # 목록 위치가 서로 달라 레코드(dict)끼리는 비교되지 않음
+                scored.append((-total, len(doc.name), order.get(record['id'], 0), record))
+        scored.sort()
+        return [item[3] for item in scored]
@@ -1,9 +1,20 @@
 """
 지도 생성 모듈 (클러스터 제거 버전)
 """
+import html
+import json
+
 import folium
+import numpy as np
 import pandas as pd
-from config import MAP_CENTER, MAP_ZOOM_START
+import shapely
+from branca.element import MacroElement
+from jinja2 import Template
+from config import (
+    MAP_CENTER, MAP_ZOOM_START, DONG_LAYER_MODE, CHOROPLETH_METRICS, KIDSROOM_MARKER_MODE, KIDSROOM_CANVAS_MARKER_THRESHOLD,
+)
+from map_payload import optimize_geodata, payload_size_report
+from profiling import current_run, span
 
 
 def extract_dong_name(adm_nm):
@@ -18,53 +29,105 @@ def create_base_map():
     return folium.Map(location=MAP_CENTER, zoom_start=MAP_ZOOM_START)
 
 
-def _build_feature_collection(gdf: pd.DataFrame, value_cols: list[str]):
+def _build_feature_collection(gdf: pd.DataFrame, value_cols: list[str], extra_props: dict | None = None):
+    """geometry + adm_nm/값 컬럼으로 FeatureCollection 생성 (extra_props: 표시용 추가 속성 {이름: 값 리스트})"""
+    adm_names = gdf['adm_nm'].tolist() if 'adm_nm' in gdf.columns else [''] * len(gdf)
+    values = {c: gdf[c].tolist() for c in value_cols if c in gdf.columns}
+    extra_props = extra_props or {}
     features = []
-    for _, row in gdf.iterrows():
+    for i, geom in enumerate(gdf.geometry.values):
         try:
-            geom = row['geometry'].__geo_interface__
+            geom = geom.__geo_interface__
         except Exception:
             continue
-        props = {'adm_nm': row.get('adm_nm', '')}
-        for c in value_cols:
-            if c in row:
-                v = row[c]
-                try:
-                    v = float(v)
-                except Exception:
-                    pass
-                props[c] = v
+        props = {'adm_nm': adm_names[i]}
+        for c, col_values in values.items():
+            v = col_values[i]
+            try:
+                v = float(v)
+            except Exception:
+                pass
+            props[c] = v
+        for c, col_values in extra_props.items():
+            props[c] = col_values[i]
         features.append({'type': 'Feature', 'geometry': geom, 'properties': props})
     return {'type': 'FeatureCollection', 'features': features}
 
 
-def add_choropleth_layer(m, merged, opacity=0.7, map_type='총인구', mix_weight=None):
-    if map_type == '인구밀도':
-        columns = ["adm_nm", "인구밀도"]
-        fill_color = "PuBuGn"
-        legend_name = "인구밀도 (명/km²)"
-    else:
-        columns = ["adm_nm", "총인구"]
-        fill_color = "YlOrRd"
-        legend_name = "총인구수"
+def _format_count(series, unit, digits=0):
+    if digits == 0:
+        return [f"{int(v):,}{unit}" if pd.notna(v) else "-" for v in series.tolist()]
+    return [f"{v:,.{digits}f}{unit}" if pd.notna(v) else "-" for v in series.tolist()]
+
+
+def _dong_display_props(gdf, map_type='총인구'):
+    """툴팁/팝업용 표시 문자열 속성 (기본 지표가 아니면 선택한 지표 표시값 metric_label 추가)"""
+    props = {
+        'dong_label': [extract_dong_name(a) if isinstance(a, str) else '' for a in gdf['adm_nm'].tolist()],
+        'pop_label': _format_count(gdf['총인구'], '명'),
+        'density_label': _format_count(gdf['인구밀도'], '명/km²'),
+    }
+    if map_type not in ('총인구', '인구밀도') and map_type in gdf.columns:
+        spec = CHOROPLETH_METRICS[map_type]
+        props['metric_label'] = _format_count(gdf[map_type], spec['unit'], spec['digits'])
+    return props
+
 
-    fc = _build_feature_collection(merged, [columns[1]])
+def add_choropleth_layer(m, merged, opacity=0.7, map_type='총인구', mix_weight=None, interactive=False):
+    """Choropleth 추가 (interactive=True면 같은 GeoJson 레이어에 툴팁/팝업/하이라이트 부착)
+
+    map_type은 CHOROPLETH_METRICS의 키(merged 컬럼명), 해당 컬럼이 없으면 총인구로 표시
+    """
+    if map_type not in CHOROPLETH_METRICS or map_type not in merged.columns or merged[map_type].notna().sum() == 0:
+        map_type = '총인구'
+    spec = CHOROPLETH_METRICS[map_type]
+    columns = ["adm_nm", map_type]
+    fill_color = spec['fill_color']
+    legend_name = spec['legend']
+
+    display_props = _dong_display_props(merged, map_type) if interactive else None
+    with span('_build_feature_collection', features=len(merged)):
+        fc = _build_feature_collection(merged, [columns[1]], display_props)
     if not fc['features']:
         folium.Marker(MAP_CENTER, icon=folium.DivIcon(html="""<div style='background:white;border:1px solid #999;padding:6px;border-radius:4px;font-size:12px;'>⚠ 매칭된 행정동 없음</div>""")).add_to(m)
         return m
 
-    folium.Choropleth(
+    bins = 6
+    if spec.get('diverging'):
+        # 증감 지표는 0을 가운데 두는 대칭 구간 (감소/증가가 서로 다른 색 계열)
+        bound = float(merged[map_type].abs().max())
+        if bound > 0:
+            bins = list(np.linspace(-bound, bound, 7))
+
+    choropleth = folium.Choropleth(
         geo_data=fc,
         data=merged,
         columns=columns,
         key_on="feature.properties.adm_nm",
         fill_color=fill_color,
+        bins=bins,
         fill_opacity=opacity,
         line_opacity=0.5,
         legend_name=legend_name,
         nan_fill_color="white",
-        highlight=False
+        highlight=interactive
     ).add_to(m)
+
+    if interactive:
+        # geometry를 한 번만 싣고 툴팁/팝업은 feature 속성으로 렌더링
+        has_metric = 'metric_label' in display_props
+        folium.GeoJsonTooltip(
+            fields=['dong_label', 'metric_label' if has_metric else 'pop_label'],
+            labels=False,
+            style="font-size:11px;",
+        ).add_to(choropleth.geojson)
+        folium.GeoJsonPopup(
+            fields=['adm_nm', 'pop_label', 'density_label'] + (['metric_label'] if has_metric else []),
+            aliases=['', '총인구', '인구밀도'] + ([spec['label']] if has_metric else []),
+            labels=True,
+            max_width=250,
+            style="font-size:12px;",
+        ).add_to(choropleth.geojson)
     return m
 
 
@@ -92,21 +155,163 @@ def add_dong_layers(m, merged):
     return m
 
 
-def add_kidsroom_markers(m, kidsroom_list):
-    """키즈룸 마커 단순 추가 (중복 반경 클러스터링 제거)"""
-    for kr in kidsroom_list:
-        folium.Marker(
-            location=[kr["lat"], kr["lon"]],
-            popup=folium.Popup(f"<b>🎪 {kr['name']}</b><br>{kr['address']}", max_width=250),
-            tooltip=kr["name"],
-            icon=folium.Icon(color="red", icon="child", prefix="fa")
-        ).add_to(m)
+class DongLabelLayer(MacroElement):
+    """동 이름 라벨을 하나의 layerGroup으로 일괄 생성 (라벨 데이터는 JS 배열 하나로 직렬화)"""
+
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        var {{ this.get_name() }} = L.layerGroup();
+        {{ this.labels|tojson }}.forEach(function (d) {
+            L.marker([d[0], d[1]], {
+                interactive: false,
+                keyboard: false,
+                icon: L.divIcon({
+                    className: 'dong-label',
+                    html: "<div style='font-size:9px;color:rgba(0,0,0,0.4);font-weight:bold;text-shadow:1px 1px 1px #fff'>" + d[2] + "</div>"
+                })
+            }).addTo({{ this.get_name() }});
+        });
+        {{ this.get_name() }}.addTo({{ this._parent.get_name() }});
+        {% endmacro %}
+    """)
+
+    def __init__(self, labels):
+        super().__init__()
+        self._name = "DongLabelLayer"
+        self.labels = labels
+
+
+def add_dong_labels(m, merged):
+    """인구 데이터가 매칭된 동의 중심점 라벨을 단일 레이어로 추가"""
+    matched = merged[merged['총인구'].notna()]
+    if matched.empty:
+        return m
+    centroids = shapely.centroid(np.asarray(matched.geometry.values, dtype=object))
+    names = [html.escape(extract_dong_name(a)) for a in matched['adm_nm'].tolist()]
+    labels = [
+        [round(y, 6), round(x, 6), name]
+        for x, y, name in zip(shapely.get_x(centroids).tolist(), shapely.get_y(centroids).tolist(), names)
+    ]
+    DongLabelLayer(labels).add_to(m)
     return m
 
 
-def create_population_map(merged, kidsroom_list, opacity=0.7, map_type='총인구', mix_weight=None):
+def add_coverage_overlay(m, area, radius_m=None):
+    """키즈룸 반경 영역(위경도 geometry) 반투명 오버레이"""
+    if area is None or area.is_empty:
+        return m
+    name = f"키즈룸 반경 {int(radius_m):,}m" if radius_m else "키즈룸 반경"
+    folium.GeoJson(
+        area.__geo_interface__,
+        name=name,
+        style_function=lambda x: {'fillColor': '#3388ff', 'color': '#1f5fbf', 'weight': 1, 'fillOpacity': 0.15},
+        interactive=False,
+    ).add_to(m)
+    return m
+
+
+class KidsroomMarkerLayer(MacroElement):
+    """키즈룸 마커를 하나의 featureGroup으로 일괄 생성 (키즈룸 데이터는 JS 배열 하나로 직렬화)
+
+    mode='icon'은 기존 Font Awesome 아이콘 마커, 'canvas'는 캔버스 하나에 그리는 원 마커 (DOM 요소가 마커 수만큼 늘지 않음).
+    툴팁/팝업은 마커마다 미리 만들지 않고 마우스를 올리거나 클릭할 때 만듦
+    """
+
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        var {{ this.get_name() }} = L.featureGroup();
+        (function () {
+            var data = {{ this.data_json }};
+            var group = {{ this.get_name() }};
+            {% if this.mode == 'canvas' %}
+            var renderer = L.canvas({padding: 0.5});
+            {% else %}
+            var icon = L.AwesomeMarkers.icon({icon: 'child', prefix: 'fa', markerColor: 'red', iconColor: 'white'});
+            {% endif %}
+            for (var i = 0; i < data.length; i++) {
+                {% if this.mode == 'canvas' %}
+                var marker = L.circleMarker([data[i][0], data[i][1]], {
+                    renderer: renderer, radius: 5, color: '#b30000', weight: 1, fillColor: '#e31a1c', fillOpacity: 0.85
+                });
+                {% else %}
+                var marker = L.marker([data[i][0], data[i][1]], {icon: icon});
+                {% endif %}
+                marker._kidsroom = i;
+                group.addLayer(marker);
+            }
+            group.on('mouseover', function (e) {
+                if (!e.layer.getTooltip()) {
+                    e.layer.bindTooltip(data[e.layer._kidsroom][2]).openTooltip();
+                }
+            });
+            group.on('click', function (e) {
+                var d = data[e.layer._kidsroom];
+                L.popup({maxWidth: 250})
+                    .setLatLng(e.layer.getLatLng())
+                    .setContent('<b>🎪 ' + d[2] + '</b><br>' + d[3])
+                    .openOn({{ this._parent.get_name() }});
+            });
+        })();
+        {{ this.get_name() }}.addTo({{ this._parent.get_name() }});
+        {% endmacro %}
+    """)
+
+    def __init__(self, points, mode='icon'):
+        super().__init__()
+        self._name = "KidsroomMarkerLayer"
+        # tojson은 한글을 \uXXXX로 늘리므로 UTF-8 그대로 직렬화 (이름/주소는 이스케이프되어 '<'가 없어 </script>에 안전)
+        self.data_json = json.dumps(points, ensure_ascii=False, separators=(',', ':'))
+        self.mode = mode
+
+
+def kidsroom_marker_mode(count, mode=KIDSROOM_MARKER_MODE):
+    """'auto'면 키즈룸 수로 렌더링 방식 결정 ('icon' / 'canvas')"""
+    if mode == 'auto':
+        return 'canvas' if count >= KIDSROOM_CANVAS_MARKER_THRESHOLD else 'icon'
+    return mode
+
+
+def add_kidsroom_markers(m, kidsroom_list, mode=KIDSROOM_MARKER_MODE):
+    """키즈룸 마커를 단일 레이어로 추가 (이름/주소는 HTML 이스케이프 후 [위도, 경도, 이름, 주소] 배열로 직렬화)"""
+    if not kidsroom_list:
+        return m
+    points = [
+        [round(float(kr["lat"]), 6), round(float(kr["lon"]), 6), html.escape(str(kr["name"])), html.escape(str(kr.get("address") or ""))]
+        for kr in kidsroom_list
+    ]
+    KidsroomMarkerLayer(points, kidsroom_marker_mode(len(points), mode)).add_to(m)
+    return m
+
+
+def create_population_map(merged, kidsroom_list, opacity=0.7, map_type='총인구', mix_weight=None, zoom=MAP_ZOOM_START,
+                          dong_layer_mode=DONG_LAYER_MODE, coverage_area=None, coverage_radius=None,
+                          marker_mode=KIDSROOM_MARKER_MODE):
+    """dong_layer_mode: 'single' = Choropleth 레이어 하나에 툴팁/팝업 + 일괄 라벨, 'per_feature' = 동마다 개별 레이어
+
+    marker_mode: 키즈룸 마커 렌더링 방식 ('icon' / 'canvas' / 'auto', config.KIDSROOM_MARKER_MODE 참고)
+
+    coverage_area: 키즈룸 반경 영역 geometry (주면 Choropleth 위에 오버레이)
+    """
     m = create_base_map()
-    m = add_choropleth_layer(m, merged, opacity, map_type, mix_weight)
-    m = add_dong_layers(m, merged)
-    m = add_kidsroom_markers(m, kidsroom_list)
+    # 단순화/양자화된 geometry 한 벌을 Choropleth와 동 레이어가 공유
+    with span('optimize_geodata', dongs=len(merged)):
+        compact = optimize_geodata(merged, zoom=zoom)
+    if current_run() is not None:
+        # 프로파일링 중일 때만 최적화 전/후 geometry 바이트 수를 구간 속성으로 남김 (직렬화 비용이 있어 평소에는 생략)
+        with span('payload_size_report') as attrs:
+            attrs.update(payload_size_report(merged, zoom=zoom, optimized=compact))
+    if dong_layer_mode == 'per_feature':
+        with span('add_choropleth_layer'):
+            m = add_choropleth_layer(m, compact, opacity, map_type, mix_weight)
+        with span('add_dong_layers'):
+            m = add_dong_layers(m, compact)
+    else:
+        with span('add_choropleth_layer'):
+            m = add_choropleth_layer(m, compact, opacity, map_type, mix_weight, interactive=True)
+        with span('add_dong_labels'):
+            m = add_dong_labels(m, compact)
+    with span('add_coverage_overlay'):
+        m = add_coverage_overlay(m, coverage_area, coverage_radius)
+    with span('add_kidsroom_markers', kidsrooms=len(kidsroom_list), mode=kidsroom_marker_mode(len(kidsroom_list), marker_mode)):
+        m = add_kidsroom_markers(m, kidsroom_list, marker_mode)
     return m
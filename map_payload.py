@@ -0,0 +1,73 @@
+"""
+지도 페이로드 최적화 모듈 - 줌 레벨에 맞춘 경계 단순화 및 좌표 양자화
+"""
+import json
+
+import numpy as np
+import shapely
+from config import MAP_ZOOM_START, MAP_COORD_PRECISION
+
+
+# 줌 0에서 타일 256px이 경도 360도를 덮음
+_DEGREES_PER_PIXEL_Z0 = 360.0 / 256
+
+
+def simplify_tolerance(zoom, pixel_tolerance=0.5):
+    """해당 줌 레벨에서 화면상 pixel_tolerance 픽셀에 해당하는 도(degree) 단위 허용 오차"""
+    return _DEGREES_PER_PIXEL_Z0 / (2 ** zoom) * pixel_tolerance
+
+
+def simplify_geometries(geoms, tolerance):
+    """인접 행정동 경계를 공유한 채로 단순화 (경계 사이 틈/겹침 방지)
+
+    GEOS 3.12 미만에서는 도형별 토폴로지 보존 단순화로 대체
+    """
+    arr = np.asarray(geoms, dtype=object)
+    valid = ~shapely.is_missing(arr) & ~shapely.is_empty(arr)
+    out = arr.copy()
+    if not valid.any():
+        return out
+    try:
+        out[valid] = shapely.coverage_simplify(arr[valid], tolerance)
+    except (AttributeError, shapely.errors.UnsupportedGEOSVersionError, shapely.errors.GEOSException):
+        out[valid] = shapely.simplify(arr[valid], tolerance, preserve_topology=True)
+    return out
+
+
+def quantize_geometries(geoms, precision=MAP_COORD_PRECISION):
+    """좌표를 소수점 precision 자리로 반올림 (5자리 ≈ 1.1m)"""
+    arr = np.asarray(geoms, dtype=object)
+    return shapely.transform(arr, lambda coords: np.round(coords, precision))
+
+
+def optimize_geodata(gdf, zoom=MAP_ZOOM_START, precision=MAP_COORD_PRECISION):
+    """지도 표시용 GeoDataFrame 사본 반환 (단순화 + 양자화된 geometry)
+
+    반환된 geometry 한 벌을 Choropleth와 툴팁/팝업 레이어가 함께 사용
+    """
+    compact = gdf.copy()
+    geoms = simplify_geometries(gdf.geometry.values, simplify_tolerance(zoom))
+    compact[compact.geometry.name] = quantize_geometries(geoms, precision)
+    return compact
+
+
+def geometry_payload_bytes(gdf):
+    """geometry를 GeoJSON 직렬화했을 때의 바이트 수"""
+    return sum(
+        len(json.dumps(shapely.geometry.mapping(g)).encode('utf-8'))
+        for g in gdf.geometry.values
+        if g is not None and not g.is_empty
+    )
+
+
+def payload_size_report(gdf, zoom=MAP_ZOOM_START, precision=MAP_COORD_PRECISION, optimized=None):
+    """최적화 전/후 geometry 페이로드 크기 비교 (optimized: 이미 optimize_geodata로 만든 사본이 있으면 재사용)"""
+    before = geometry_payload_bytes(gdf)
+    after = geometry_payload_bytes(optimize_geodata(gdf, zoom, precision) if optimized is None else optimized)
+    return {
+        "zoom": zoom,
+        "precision": precision,
+        "bytes_before": before,
+        "bytes_after": after,
+        "reduction": 1 - after / before if before else 0.0,
+    }
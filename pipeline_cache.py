@@ -0,0 +1,217 @@
+"""
+파이프라인 캐시 모듈 - 병합 결과를 (도시, 입력 해시, 처리 파라미터) 키로 프로세스 내 LRU 캐시
+"""
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import shapely
+
+from config import PIPELINE_CACHE_MAX_ENTRIES, POPULATION_CACHE_MAX_ENTRIES
+from profiling import span
+from boundary_store import file_sha256
+from data_loader import load_csv_file, load_geodata_for_city, process_population_data, process_geodata, merge_data
+
+
+# 처리 로직이 바뀌면 올려서 이전 결과가 재사용되지 않도록 함
+PIPELINE_VERSION = 3
+
+
+class LRUCache:
+    """스레드 안전 LRU 캐시 (같은 서버 프로세스의 모든 세션이 공유)
+
+    max_bytes와 sizeof를 주면 항목 수와 함께 총 크기로도 제한
+    같은 키를 동시에 요청하면 한 세션만 계산하고 나머지는 결과를 기다림
+    """
+
+    def __init__(self, max_entries, max_bytes=None, sizeof=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._data = OrderedDict()
+        self._sizes = {}
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        size = self._sizeof(value) if self._sizeof else 0
+        with self._lock:
+            self._total_bytes += size - self._sizes.get(key, 0)
+            self._data[key] = value
+            self._sizes[key] = size
+            self._data.move_to_end(key)
+            while len(self._data) > 1 and (
+                len(self._data) > self.max_entries
+                or (self.max_bytes is not None and self._total_bytes > self.max_bytes)
+            ):
+                old_key, _ = self._data.popitem(last=False)
+                self._total_bytes -= self._sizes.pop(old_key)
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # 대기하는 동안 다른 세션이 계산을 끝냈을 수 있음
+            with self._lock:
+                if key in self._data:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return self._data[key]
+                self.misses += 1
+            try:
+                value = compute()
+                self.put(key, value)
+                return value
+            finally:
+                with self._lock:
+                    self._key_locks.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+            self._total_bytes = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_entries": self.max_entries,
+                "bytes": self._total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+_merged_cache = LRUCache(PIPELINE_CACHE_MAX_ENTRIES)
+_population_cache = LRUCache(POPULATION_CACHE_MAX_ENTRIES)
+
+# 경로 -> ((크기, mtime_ns), 해시) : 파일이 바뀌지 않았으면 재해시 생략
+_path_hash_memo = {}
+_memo_lock = threading.Lock()
+
+
+def content_hash(source):
+    """파일 경로 또는 업로드 파일 객체의 내용 SHA256 해시"""
+    if isinstance(source, str):
+        stat = os.stat(source)
+        sig = (stat.st_size, stat.st_mtime_ns)
+        with _memo_lock:
+            memo = _path_hash_memo.get(source)
+        if memo and memo[0] == sig:
+            return memo[1]
+        digest = file_sha256(source)
+        with _memo_lock:
+            _path_hash_memo[source] = (sig, digest)
+        return digest
+    return hashlib.sha256(source.getvalue()).hexdigest()
+
+
+def merged_data_hash(merged):
+    """병합 GeoDataFrame 내용 해시 (속성 컬럼 + geometry WKB)"""
+    h = hashlib.sha256()
+    # 컬럼별 hash_pandas_object보다 pickle 직렬화가 훨씬 빠름 (프로세스 내 캐시 키 용도라 충분)
+    attrs = pd.DataFrame(merged).drop(columns=[merged.geometry.name])
+    h.update(pickle.dumps(attrs, protocol=pickle.HIGHEST_PROTOCOL))
+    _update_geometry_hash(h, merged)
+    return h.hexdigest()
+
+
+def geometry_hash(merged):
+    """병합 GeoDataFrame의 좌표계 + geometry WKB만의 해시 (속성 컬럼이 바뀌어도 그대로인 캐시 키 용도)"""
+    h = hashlib.sha256()
+    h.update(str(merged.crs.to_string() if merged.crs is not None else None).encode('utf-8'))
+    _update_geometry_hash(h, merged)
+    return h.hexdigest()
+
+
+def _update_geometry_hash(h, merged):
+    for wkb in shapely.to_wkb(merged.geometry.values):
+        h.update(wkb or b'')
+
+
+def pipeline_cache_key(csv_source, geo_source, city_name):
+    return ("merged", city_name, content_hash(csv_source), content_hash(geo_source), PIPELINE_VERSION)
+
+
+def get_merged_data(csv_source, geo_source, city_name):
+    """load → process → merge 파이프라인 결과를 캐시에서 반환 (없으면 계산 후 저장)
+
+    반환된 GeoDataFrame은 여러 세션이 공유하므로 호출부에서 수정하지 말 것
+    """
+    with span('get_merged_data', city=city_name) as attrs:
+        attrs['cached'] = True
+
+        def compute():
+            attrs['cached'] = False
+            df = get_population_data(csv_source)
+            with span('load_geodata'):
+                boundaries = load_geodata_for_city(geo_source, city_name)
+            with span('process_geodata'):
+                gdf = process_geodata(boundaries, city_name=city_name)
+            with span('merge_data'):
+                return merge_data(gdf, df)
+
+        with span('pipeline_cache_key'):
+            key = pipeline_cache_key(csv_source, geo_source, city_name)
+        return _merged_cache.get_or_compute(key, compute)
+
+
+def get_population_data(csv_source):
+    """인구 CSV 로드 + 처리 결과를 CSV 내용 해시 기준으로 캐시 (경계 파일이나 도시만 바뀐 병합은 재파싱 없음)
+
+    반환된 DataFrame은 여러 병합이 공유하므로 호출부에서 수정하지 말 것
+    """
+    with span('get_population_data') as attrs:
+        attrs['cached'] = True
+
+        def compute():
+            attrs['cached'] = False
+            with span('load_csv_file'):
+                raw = load_csv_file(csv_source)
+            with span('process_population_data'):
+                return process_population_data(raw)
+
+        key = ("population", content_hash(csv_source), PIPELINE_VERSION)
+        return _population_cache.get_or_compute(key, compute)
+
+
+def get_pipeline_cache_stats():
+    return _merged_cache.stats()
+
+
+def get_population_cache_stats():
+    return _population_cache.stats()
+
+
+def clear_pipeline_cache():
+    _merged_cache.clear()
+    _population_cache.clear()
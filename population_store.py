@@ -0,0 +1,353 @@
+"""
+인구 시계열 저장소 모듈 - 월간 인구 CSV를 도시(city) x 기준 월(month)별 Parquet 파티션으로 보관
+
+새 달의 내보내기 파일을 넣으면 그 파일에 든 (도시, 월) 파티션만 새로 쓰고 나머지는 그대로 둠.
+월 범위 조회/전월 대비 증감은 필요한 파티션만 읽으며 결과는 매니페스트 세대(generation) 기준으로 캐시
+
+사용법:
+    python population_store.py ingest data/202511_202511_연령별인구현황_월간_성남시.csv
+    python population_store.py months [--city 성남시]
+"""
+import argparse
+import contextlib
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import unicodedata
+
+import numpy as np
+import pandas as pd
+from config import POPULATION_STORE_DIR, POPULATION_STORE_CACHE_MAX_ENTRIES, CHILD_BAND_COLUMNS, CITY_FILE_MAP, get_city_csv_path
+from data_processing import read_population_csv, prepare_population_data, population_months, month_columns, PopulationDataError
+from pipeline_cache import LRUCache, content_hash
+from profiling import span
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+MANIFEST_NAME = "manifest.json"
+STORE_FORMAT_VERSION = 1
+# 파티션에 저장하는 컬럼 (행정코드 기준으로 달끼리 맞춤)
+STORE_COLUMNS = ('행정코드', '행정구역', '총인구', '아동인구', *CHILD_BAND_COLUMNS)
+# add_trend_metrics가 추가하는 컬럼
+TREND_METRIC_COLUMNS = ('기간_인구증감', '기간_인구증감률', '전월대비_인구증감', '전월대비_아동인구증감')
+
+# 파일명 앞 'YYYYMM_' (월 접두어 컬럼이 없는 내보내기 파일용)
+_FILENAME_MONTH_RE = re.compile(r'^(\d{6})_')
+_CITY_TOKEN_RE = re.compile(r'^\S+[시군구]$')
+
+_thread_lock = threading.Lock()
+_trend_cache = LRUCache(POPULATION_STORE_CACHE_MAX_ENTRIES)
+
+
+@contextlib.contextmanager
+def _store_lock(store_dir):
+    """매니페스트 갱신 잠금 (프로세스 내부는 Lock, 프로세스 간은 잠금 파일)"""
+    with _thread_lock:
+        os.makedirs(store_dir, exist_ok=True)
+        with open(os.path.join(store_dir, ".lock"), 'a+b') as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _empty_manifest():
+    return {"version": STORE_FORMAT_VERSION, "generation": 0, "partitions": {}, "sources": {}}
+
+
+def read_manifest(store_dir=POPULATION_STORE_DIR):
+    """매니페스트 {version, generation, partitions: {도시: {월: 파티션 정보}}, sources: {해시: 원본 정보}}"""
+    manifest_path = os.path.join(store_dir, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        return _empty_manifest()
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except Exception:
+        return _empty_manifest()
+    if manifest.get("version") != STORE_FORMAT_VERSION:
+        return _empty_manifest()
+    return manifest
+
+
+def _write_manifest(store_dir, manifest):
+    """매니페스트 원자적 교체 (임시 파일 작성 후 os.replace)"""
+    fd, tmp_path = tempfile.mkstemp(dir=store_dir, prefix=".manifest_", suffix=".json")
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, os.path.join(store_dir, MANIFEST_NAME))
+
+
+def _partition_path(city, month, source_hash):
+    """저장소 기준 상대 경로 city=<도시>/month=<YYYYMM>/part-<해시>.parquet"""
+    return os.path.join(f"city={city}", f"month={month}", f"part-{source_hash[:12]}.parquet")
+
+
+def _source_name(source):
+    name = source if isinstance(source, (str, os.PathLike)) else getattr(source, 'name', '')
+    return unicodedata.normalize("NFC", os.path.basename(str(name or '')))
+
+
+def _row_city(region):
+    """'경기도 성남시 분당구 ...' -> '성남시' (시도 합계 행 등 도시가 없으면 None)"""
+    tokens = region.split()
+    if len(tokens) >= 2 and _CITY_TOKEN_RE.match(tokens[1]):
+        return tokens[1]
+    return None
+
+
+def _month_frames(raw, name):
+    """원본 DataFrame을 기준 월별로 나눠 정리 -> {월: DataFrame(STORE_COLUMNS)}"""
+    months = population_months(raw.columns)
+    if not months:
+        match = _FILENAME_MONTH_RE.match(name)
+        if not match:
+            raise PopulationDataError(f"기준 월을 알 수 없습니다 (컬럼/파일명에 YYYYMM 없음): {name}")
+        months = [match.group(1)]
+        frames = {months[0]: raw}
+    else:
+        frames = {month: raw[month_columns(raw.columns, month)] for month in months}
+
+    result = {}
+    for month, frame in frames.items():
+        prepared = prepare_population_data(frame.copy())
+        prepared = prepared[prepared['행정코드'].notna()]
+        columns = [c for c in STORE_COLUMNS if c in prepared.columns]
+        result[month] = prepared[columns].astype({'행정코드': 'int64'}).reset_index(drop=True)
+    return result
+
+
+def ingest_population_csv(source, city=None, store_dir=POPULATION_STORE_DIR, name=None):
+    """월간 인구 CSV(경로 또는 파일 객체)를 저장소에 추가 -> 요약 dict
+
+    - 파일에 든 모든 기준 월을 한 번에 파싱해 (도시, 월) 파티션으로 저장, 이미 들어온 파일(내용 해시)은 건너뜀
+    - 같은 (도시, 월) 파티션이 있으면 그 파티션만 교체 (최신 내보내기가 정정본이라고 가정), 다른 달은 건드리지 않음
+    - city를 주면 모든 행을 그 도시로, 없으면 행정구역의 시/군 이름으로 나눔
+    """
+    name = name or _source_name(source)
+    source_hash = content_hash(source)
+    with span('population_store.ingest', source=name) as attrs:
+        if source_hash in read_manifest(store_dir)["sources"]:
+            attrs['skipped'] = True
+            return {"source": name, "sha256": source_hash, "skipped": True, "partitions": []}
+
+        raw = read_population_csv(source, all_months=True)
+        months = _month_frames(raw, name)
+
+        written = []
+        with _store_lock(store_dir):
+            manifest = read_manifest(store_dir)
+            if source_hash in manifest["sources"]:
+                attrs['skipped'] = True
+                return {"source": name, "sha256": source_hash, "skipped": True, "partitions": []}
+
+            replaced = []
+            for month, frame in months.items():
+                if city is not None:
+                    groups = [(city, frame)]
+                else:
+                    cities = frame['행정구역'].map(_row_city)
+                    groups = [(c, frame[cities == c]) for c in cities.dropna().unique()]
+                for part_city, part in groups:
+                    rel_path = _partition_path(part_city, month, source_hash)
+                    path = os.path.join(store_dir, rel_path)
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    part.reset_index(drop=True).to_parquet(path, index=False)
+                    previous = manifest["partitions"].setdefault(part_city, {}).get(month)
+                    if previous is not None and previous["file"] != rel_path:
+                        replaced.append(previous["file"])
+                    manifest["partitions"][part_city][month] = {"file": rel_path, "rows": len(part), "source_sha256": source_hash}
+                    written.append((part_city, month, len(part)))
+
+            manifest["sources"][source_hash] = {"name": name, "months": sorted(months), "ingested_at": time.time()}
+            manifest["generation"] += 1
+            _write_manifest(store_dir, manifest)
+
+            # 교체된 파티션 파일 정리 (매니페스트를 먼저 바꿨으므로 새로 읽는 쪽은 살아 있는 파일만 봄)
+            for rel_path in replaced:
+                try:
+                    os.remove(os.path.join(store_dir, rel_path))
+                except OSError:
+                    pass
+
+        attrs['partitions'] = len(written)
+        return {"source": name, "sha256": source_hash, "skipped": False, "partitions": written}
+
+
+def ensure_population_store(store_dir=POPULATION_STORE_DIR, city_files=None):
+    """기본 도시 CSV(config.CITY_FILE_MAP)가 저장소에 들어 있는지 확인하고 없으면 추가
+
+    파일 크기/mtime이 지난번과 같으면 해시 계산 없이 통과 -> 새로 들어간 파일 요약 목록
+    """
+    city_files = CITY_FILE_MAP if city_files is None else city_files
+    manifest = read_manifest(store_dir)
+    seen = {(s.get("name"), s.get("size"), s.get("mtime_ns")) for s in manifest["sources"].values()}
+    results = []
+    for city in city_files:
+        path = get_city_csv_path(city) if city_files is CITY_FILE_MAP else city_files[city]
+        if not path or not os.path.exists(path):
+            continue
+        stat = os.stat(path)
+        name = _source_name(path)
+        if (name, stat.st_size, stat.st_mtime_ns) in seen:
+            continue
+        result = ingest_population_csv(path, city=city, store_dir=store_dir, name=name)
+        with _store_lock(store_dir):
+            manifest = read_manifest(store_dir)
+            info = manifest["sources"].get(result["sha256"])
+            if info is not None:
+                info.update(name=name, size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+                _write_manifest(store_dir, manifest)
+        if not result["skipped"]:
+            results.append(result)
+    return results
+
+
+def list_months(city, store_dir=POPULATION_STORE_DIR):
+    """저장소에 있는 도시의 기준 월 목록 (오름차순)"""
+    return sorted(read_manifest(store_dir)["partitions"].get(city, {}))
+
+
+def load_population_series(city, start=None, end=None, columns=None, store_dir=POPULATION_STORE_DIR):
+    """도시의 [start, end] 기준 월 파티션만 읽어 세로로 이은 DataFrame ('기준월' 컬럼 추가)
+
+    동시에 같은 달을 다시 적재하면 교체된 파티션이 지워질 수 있음 -> 매니페스트를 다시 읽어 한 번 재시도
+    """
+    columns = list(columns) if columns is not None else None
+    for attempt in range(2):
+        partitions = read_manifest(store_dir)["partitions"].get(city, {})
+        months = [m for m in sorted(partitions) if (start is None or m >= start) and (end is None or m <= end)]
+        try:
+            with span('population_store.load', city=city, months=len(months)):
+                frames = [
+                    pd.read_parquet(os.path.join(store_dir, partitions[m]["file"]), columns=columns).assign(기준월=m)
+                    for m in months
+                ]
+            break
+        except FileNotFoundError:
+            if attempt:
+                raise
+    if not frames:
+        return pd.DataFrame(columns=list(columns or STORE_COLUMNS) + ['기준월'])
+    return pd.concat(frames, ignore_index=True)
+
+
+def trend_key(city, start=None, end=None, store_dir=POPULATION_STORE_DIR):
+    """추이 지표를 결정하는 값 (저장소, 매니페스트 세대, 도시, 시작/끝/직전 월) - 범위 안에 달이 없으면 None
+
+    매니페스트만 읽으므로 지도 렌더 캐시 키 등에 바로 쓸 수 있음
+    """
+    manifest = read_manifest(store_dir)
+    all_months = sorted(manifest["partitions"].get(city, {}))
+    in_range = [m for m in all_months if (start is None or m >= start) and (end is None or m <= end)]
+    if not in_range:
+        return None
+    first, last = in_range[0], in_range[-1]
+    previous = all_months[all_months.index(last) - 1] if all_months.index(last) > 0 else None
+    return (os.path.abspath(store_dir), manifest["generation"], city, first, last, previous)
+
+
+def population_trend(city, start=None, end=None, store_dir=POPULATION_STORE_DIR):
+    """행정코드별 추이 지표 -> DataFrame(index=행정코드, columns=TREND_METRIC_COLUMNS)
+
+    - 기간_인구증감/증감률: start 월 대비 end 월 총인구 (범위를 주지 않으면 저장소의 처음/마지막 달)
+    - 전월대비_*: end 월과 저장소에 있는 그 직전 달의 차이
+    start/end에 해당 월이 없으면 범위 안의 가장 가까운 달을 씀. 달이 하나뿐이면 모두 NaN
+    """
+    key = trend_key(city, start, end, store_dir)
+    if key is None:
+        return pd.DataFrame(columns=list(TREND_METRIC_COLUMNS), index=pd.Index([], name='행정코드'), dtype=float)
+    first, last, previous = key[-3:]
+
+    def compute():
+        months = sorted({first, last} | ({previous} if previous else set()))
+        frames = {m: load_population_series(city, m, m, columns=['행정코드', '총인구', '아동인구'], store_dir=store_dir)
+                  .drop_duplicates('행정코드').set_index('행정코드') for m in months}
+        codes = frames[last].index
+        current = frames[last]
+        trend = pd.DataFrame(index=codes)
+        base = frames[first].reindex(codes)['총인구']
+        if first != last:
+            delta = current['총인구'] - base
+            trend['기간_인구증감'] = delta
+            trend['기간_인구증감률'] = (delta / base.where(base > 0)) * 100
+        else:
+            trend['기간_인구증감'] = trend['기간_인구증감률'] = np.nan
+        if previous is not None:
+            prev = frames[previous].reindex(codes)
+            trend['전월대비_인구증감'] = current['총인구'] - prev['총인구']
+            trend['전월대비_아동인구증감'] = current['아동인구'] - prev['아동인구']
+        else:
+            trend['전월대비_인구증감'] = trend['전월대비_아동인구증감'] = np.nan
+        trend.index.name = '행정코드'
+        return trend.astype(float)
+
+    return _trend_cache.get_or_compute(key, compute)
+
+
+def add_trend_metrics(merged, city, start=None, end=None, store_dir=POPULATION_STORE_DIR):
+    """병합 데이터(adm_code)에 추이 지표 컬럼을 붙인 사본 반환 (저장소에 없는 동은 NaN)"""
+    with span('add_trend_metrics', city=city, start=start, end=end):
+        trend = population_trend(city, start, end, store_dir)
+        if 'adm_code' in merged.columns:
+            codes = pd.to_numeric(merged['adm_code'], errors='coerce')
+            values = trend.reindex(codes.to_numpy()).to_numpy() if len(trend) else np.full((len(merged), len(TREND_METRIC_COLUMNS)), np.nan)
+        else:
+            values = np.full((len(merged), len(TREND_METRIC_COLUMNS)), np.nan)
+        return merged.assign(**{col: values[:, i] for i, col in enumerate(TREND_METRIC_COLUMNS)})
+
+
+def get_population_store_cache_stats():
+    return _trend_cache.stats()
+
+
+def clear_population_store_cache():
+    _trend_cache.clear()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="월간 인구 CSV 시계열 저장소 관리")
+    parser.add_argument("--store", default=POPULATION_STORE_DIR, help="저장소 디렉토리")
+    sub = parser.add_subparsers(dest="command", required=True)
+    ingest = sub.add_parser("ingest", help="월간 인구 CSV 추가 (이미 들어온 파일은 건너뜀)")
+    ingest.add_argument("files", nargs="+")
+    ingest.add_argument("--city", default=None, help="모든 행을 이 도시로 저장 (기본: 행정구역에서 시/군 이름 추출)")
+    months = sub.add_parser("months", help="도시별 저장된 기준 월 목록")
+    months.add_argument("--city", default=None)
+    args = parser.parse_args(argv)
+
+    if args.command == "ingest":
+        for path in args.files:
+            result = ingest_population_csv(path, city=args.city, store_dir=args.store)
+            if result["skipped"]:
+                print(f"{result['source']}: 이미 저장됨 (건너뜀)")
+            else:
+                parts = ', '.join(f"{c} {m} ({n}행)" for c, m, n in result["partitions"])
+                print(f"{result['source']}: {parts}")
+        return 0
+
+    partitions = read_manifest(args.store)["partitions"]
+    for city in ([args.city] if args.city else sorted(partitions)):
+        print(f"{city}: {', '.join(sorted(partitions.get(city, {}))) or '-'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+프로파일링 모듈 - 파이프라인/렌더링 단계별 소요 시간, 메모리 피크(tracemalloc), 캐시 적중률 기록
+
+span()은 활성 ProfileRun이 없으면 아무것도 하지 않으므로 라이브러리 코드 어디에 넣어도 됨
+(실행 단위는 contextvars로 구분 - Streamlit 세션마다 스크립트 스레드가 달라 서로 섞이지 않음)
+"""
+import contextvars
+import json
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+
+_current_run = contextvars.ContextVar('profile_run', default=None)
+
+
+class ProfileRun:
+    """한 번의 실행(Streamlit rerun, CLI 도시 처리 등)에서 기록된 구간 목록
+
+    trace_memory=True면 tracemalloc으로 구간별 메모리 피크 측정 (추적 중에는 할당이 눈에 띄게 느려짐,
+    tracemalloc은 프로세스 전체 상태라 동시에 도는 다른 세션의 할당도 섞일 수 있음)
+    """
+
+    def __init__(self, label=None, enabled=True, trace_memory=False):
+        self.run_id = uuid.uuid4().hex[:12]
+        self.label = label
+        self.enabled = enabled
+        self.trace_memory = trace_memory
+        self.started_at = None
+        self.total_ms = None
+        self.records = []
+        self.caches = {}
+        self._stack = []
+        self._token = None
+        self._started_tracing = False
+        self._t0 = None
+
+    def __enter__(self):
+        if not self.enabled:
+            return self
+        self.started_at = time.time()
+        self._t0 = time.perf_counter()
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self._token = _current_run.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if not self.enabled:
+            return False
+        _current_run.reset(self._token)
+        self.total_ms = (time.perf_counter() - self._t0) * 1000
+        if self._started_tracing:
+            tracemalloc.stop()
+        return False
+
+    def _memory(self):
+        return tracemalloc.get_traced_memory() if self.trace_memory and tracemalloc.is_tracing() else None
+
+    def _enter_span(self, name, attrs):
+        frame = {'name': name, 'attrs': attrs, 'start': time.perf_counter(), 'mem_start': None, 'mem_peak': None}
+        memory = self._memory()
+        if memory is not None:
+            current, peak = memory
+            if self._stack and self._stack[-1]['mem_peak'] is not None:
+                # 바깥 구간의 피크를 보존한 뒤 안쪽 구간용으로 피크 초기화
+                self._stack[-1]['mem_peak'] = max(self._stack[-1]['mem_peak'], peak)
+            tracemalloc.reset_peak()
+            frame['mem_start'] = frame['mem_peak'] = current
+        self._stack.append(frame)
+        return frame
+
+    def _exit_span(self, frame, error):
+        elapsed_ms = (time.perf_counter() - frame['start']) * 1000
+        self._stack.pop()
+        peak_kb = None
+        memory = self._memory()
+        if memory is not None and frame['mem_start'] is not None:
+            frame['mem_peak'] = max(frame['mem_peak'], memory[1])
+            peak_kb = (frame['mem_peak'] - frame['mem_start']) / 1024
+            if self._stack and self._stack[-1]['mem_peak'] is not None:
+                self._stack[-1]['mem_peak'] = max(self._stack[-1]['mem_peak'], frame['mem_peak'])
+            tracemalloc.reset_peak()
+        self.records.append({
+            'name': frame['name'],
+            'parent': self._stack[-1]['name'] if self._stack else None,
+            'depth': len(self._stack),
+            'offset_ms': (frame['start'] - self._t0) * 1000,
+            'ms': elapsed_ms,
+            'peak_kb': peak_kb,
+            'attrs': frame['attrs'],
+            'error': error,
+        })
+
+    def record_caches(self, stats):
+        """캐시 통계 스냅샷 {캐시 이름: LRUCache.stats()}"""
+        self.caches = {name: dict(s) for name, s in stats.items()}
+
+    def ordered_records(self):
+        """시작 순서대로 정렬한 구간 (기록은 끝난 순서라 안쪽 구간이 먼저 쌓임)"""
+        return sorted(self.records, key=lambda r: (r['offset_ms'], r['depth']))
+
+    def to_dicts(self):
+        """JSON lines 내보내기용 레코드 (run 요약 1줄 + 구간마다 1줄 + 캐시 1줄)"""
+        base = {'run_id': self.run_id, 'label': self.label}
+        rows = [{**base, 'type': 'run', 'started_at': self.started_at, 'total_ms': self.total_ms,
+                 'trace_memory': self.trace_memory}]
+        rows.extend({**base, 'type': 'span', **r} for r in self.ordered_records())
+        if self.caches:
+            rows.append({**base, 'type': 'caches', 'caches': self.caches})
+        return rows
+
+
+@contextmanager
+def span(name, **attrs):
+    """활성 ProfileRun에 구간 기록 (없으면 그대로 실행)
+
+    구간 속성 dict를 돌려주므로 with 블록 안에서 결과 정보(캐시 적중 여부 등)를 추가할 수 있음
+    """
+    run = _current_run.get()
+    if run is None:
+        yield attrs
+        return
+    frame = run._enter_span(name, attrs)
+    error = None
+    try:
+        yield attrs
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        run._exit_span(frame, error)
+
+
+def current_run():
+    return _current_run.get()
+
+
+def runs_to_jsonl(runs):
+    """여러 ProfileRun을 JSON lines 문자열로 변환"""
+    return ''.join(json.dumps(row, ensure_ascii=False, default=str) + '\n' for run in runs for row in run.to_dicts())
@@ -0,0 +1,74 @@
+"""
+지도 렌더 캐시 모듈 - 직렬화된 지도 HTML을 (데이터 해시, 키즈룸 해시, 스타일 파라미터) 키로 캐시
+"""
+import hashlib
+import json
+
+from config import MAP_RENDER_CACHE_MAX_ENTRIES, MAP_RENDER_CACHE_MAX_BYTES, MAP_ZOOM_START, DONG_LAYER_MODE, KIDSROOM_MARKER_MODE
+from coverage import coverage_area
+from pipeline_cache import LRUCache, merged_data_hash
+from profiling import span
+
+
+_map_html_cache = LRUCache(
+    MAP_RENDER_CACHE_MAX_ENTRIES,
+    max_bytes=MAP_RENDER_CACHE_MAX_BYTES,
+    sizeof=lambda html: len(html.encode('utf-8')),
+)
+
+
+def kidsroom_list_hash(kidsroom_list):
+    payload = json.dumps(kidsroom_list, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def render_population_map_html(merged, kidsroom_list, opacity=0.7, map_type='총인구', mix_weight=None,
+                               zoom=MAP_ZOOM_START, dong_layer_mode=DONG_LAYER_MODE, coverage_radius=None,
+                               marker_mode=KIDSROOM_MARKER_MODE, data_key=None):
+    """create_population_map 결과 HTML을 캐시에서 반환 (없으면 렌더링 후 저장)
+
+    coverage_radius(m)를 주면 키즈룸 반경 영역 오버레이 포함
+    data_key: merged를 만든 입력으로 정한 키 (기본 데이터 파이프라인 키, 지표 설정 등 - 키즈룸 목록은 따로 들어감).
+    주면 merged 전체 내용 해시를 생략하므로 merged를 결정하는 입력을 빠짐없이 담아야 함
+    """
+    with span('render_cache_key'):
+        data_hash = ('inputs', data_key) if data_key is not None else merged_data_hash(merged)
+    key = (
+        data_hash,
+        kidsroom_list_hash(kidsroom_list),
+        map_type,
+        round(float(opacity), 4),
+        mix_weight,
+        zoom,
+        dong_layer_mode,
+        coverage_radius,
+        marker_mode,
+    )
+
+    def render():
+        # folium은 캐시 미스일 때만 필요 (캐시 적중 시와 첫 화면 그리기 전에는 로드하지 않음)
+        from map_generator import create_population_map
+        attrs['cached'] = False
+        with span('coverage_area'):
+            area = coverage_area(kidsroom_list, coverage_radius) if coverage_radius else None
+        with span('create_population_map'):
+            m = create_population_map(merged, kidsroom_list, opacity, map_type, mix_weight,
+                                      zoom=zoom, dong_layer_mode=dong_layer_mode,
+                                      coverage_area=area, coverage_radius=coverage_radius,
+                                      marker_mode=marker_mode)
+        with span('serialize_html'):
+            return m.get_root().render()
+
+    with span('render_population_map_html', map_type=map_type) as attrs:
+        attrs['cached'] = True
+        html = _map_html_cache.get_or_compute(key, render)
+        attrs['html_kb'] = round(len(html) / 1024, 1)
+        return html
+
+
+def get_render_cache_stats():
+    return _map_html_cache.stats()
+
+
+def clear_render_cache():
+    _map_html_cache.clear()
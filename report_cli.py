@@ -0,0 +1,185 @@
+"""
+헤드리스 리포트 CLI - 앱과 같은 load → process → merge → create_population_map 파이프라인을 도시별로 실행
+(Streamlit 비의존: cron 등에서 정적 HTML 지도 + 동별 지표 CSV/Parquet 생성, 단계별 소요 시간 보고)
+
+사용 예: python report_cli.py --cities 성남시 용인시 --out reports/20251031 --workers 2
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+import pandas as pd
+from config import CITIES, DEFAULT_GEO_FILE, COVERAGE_DEFAULT_RADIUS_M, CHOROPLETH_METRICS, get_city_csv_path
+from boundary_store import ensure_boundary_store, load_city_boundaries
+from data_processing import read_population_csv, prepare_population_data, process_geodata, merge_data
+from kidsroom_manager import load_kidsroom_data
+from map_generator import create_population_map
+from spatial_index import add_kidsroom_metrics
+from coverage import add_coverage_metrics, coverage_area
+from population_store import ensure_population_store, add_trend_metrics
+
+REPORT_FORMATS = ('html', 'csv', 'parquet')
+# 단계별 소요 시간 보고 순서
+REPORT_STAGES = ('load', 'process', 'boundaries', 'merge', 'metrics', 'map', 'write')
+
+
+@contextmanager
+def _stage(timings, name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + time.perf_counter() - start
+
+
+def metrics_table(merged):
+    """병합 결과에서 geometry를 뺀 동별 지표 표"""
+    return pd.DataFrame(merged.drop(columns=merged.geometry.name)).reset_index(drop=True)
+
+
+def build_city_report(city, out_dir, kidsroom_list, geo_path=DEFAULT_GEO_FILE, map_type='총인구',
+                      radius_m=COVERAGE_DEFAULT_RADIUS_M, formats=REPORT_FORMATS, opacity=0.7, overlay=False,
+                      trend_start=None, trend_end=None):
+    """단일 도시 리포트 생성 (프로세스 풀 워커, 추이 지표는 인구 시계열 저장소의 trend_start~trend_end 기준)
+
+    반환값: {'city', 'files', 'timings', 'summary', 'join_report', 'error'} - 실패해도 예외 대신 error에 메시지
+    """
+    result = {'city': city, 'files': [], 'timings': {}, 'summary': None, 'join_report': None, 'error': None}
+    timings = result['timings']
+    try:
+        path = get_city_csv_path(city)
+        if not path or not path.endswith('.csv') or not os.path.exists(path):
+            raise FileNotFoundError(f"도시 CSV 파일을 찾을 수 없습니다: {city}")
+
+        with _stage(timings, 'load'):
+            raw = read_population_csv(path)
+        with _stage(timings, 'process'):
+            df = prepare_population_data(raw)
+        with _stage(timings, 'boundaries'):
+            gdf = process_geodata(load_city_boundaries(geo_path, city), city_name=city)
+        with _stage(timings, 'merge'):
+            merged = merge_data(gdf, df)
+        with _stage(timings, 'metrics'):
+            merged = add_kidsroom_metrics(merged, kidsroom_list)
+            merged, summary = add_coverage_metrics(merged, kidsroom_list, radius_m)
+            merged = add_trend_metrics(merged, city, trend_start, trend_end)
+        summary['dongs'] = len(merged)
+        summary['matched_dongs'] = int(merged['총인구'].notna().sum())
+        report = merged.attrs.get('join_report') or {}
+        summary['matched_by_name'] = report.get('matched_by_name', 0)
+        summary['unmatched_rows'] = len(report.get('unmatched_rows', ()))
+        result['summary'] = summary
+        result['join_report'] = report
+
+        city_dir = os.path.join(out_dir, city)
+        os.makedirs(city_dir, exist_ok=True)
+        if 'html' in formats:
+            with _stage(timings, 'map'):
+                area = coverage_area(kidsroom_list, radius_m) if overlay else None
+                m = create_population_map(
+                    merged, kidsroom_list, opacity, map_type,
+                    coverage_area=area, coverage_radius=radius_m if overlay else None,
+                )
+            with _stage(timings, 'write'):
+                html_path = os.path.join(city_dir, 'population_map.html')
+                m.save(html_path)
+            result['files'].append(html_path)
+
+        table = metrics_table(merged)
+        with _stage(timings, 'write'):
+            if 'csv' in formats:
+                csv_path = os.path.join(city_dir, 'metrics.csv')
+                # 엑셀에서 한글이 깨지지 않도록 BOM 포함
+                table.to_csv(csv_path, index=False, encoding='utf-8-sig')
+                result['files'].append(csv_path)
+            if 'parquet' in formats:
+                parquet_path = os.path.join(city_dir, 'metrics.parquet')
+                table.to_parquet(parquet_path, index=False)
+                result['files'].append(parquet_path)
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['timings']['total'] = sum(timings.values())
+    return result
+
+
+def build_reports(cities=None, out_dir='reports', geo_path=DEFAULT_GEO_FILE, max_workers=None, **options):
+    """여러 도시 리포트를 프로세스 풀로 병렬 생성 -> 도시 순서대로 결과 목록
+
+    경계/인구 시계열 저장소와 키즈룸 목록은 워커를 띄우기 전에 한 번만 준비 (워커끼리 저장소를 동시에 만들지 않도록)
+    """
+    cities = list(CITIES if cities is None else cities)
+    os.makedirs(out_dir, exist_ok=True)
+    ensure_boundary_store(geo_path)
+    ensure_population_store()
+    kidsroom_list = load_kidsroom_data()
+
+    if max_workers is None:
+        max_workers = min(len(cities), os.cpu_count() or 1)
+
+    if max_workers <= 1 or len(cities) <= 1:
+        return [build_city_report(city, out_dir, kidsroom_list, geo_path, **options) for city in cities]
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(build_city_report, city, out_dir, kidsroom_list, geo_path, **options) for city in cities]
+        return [f.result() for f in futures]
+
+
+def write_summary(results, out_dir):
+    """도시별 요약 + 단계별 소요 시간 (summary.json, summary.csv)"""
+    with open(os.path.join(out_dir, 'summary.json'), 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    rows = []
+    for r in results:
+        row = {'city': r['city'], 'error': r['error']}
+        row.update(r['summary'] or {})
+        row.update({f'{stage}_s': round(seconds, 4) for stage, seconds in r['timings'].items()})
+        rows.append(row)
+    pd.DataFrame(rows).to_csv(os.path.join(out_dir, 'summary.csv'), index=False, encoding='utf-8-sig')
+
+
+def format_timings(results):
+    """도시 x 단계 소요 시간 표 (초)"""
+    stages = [s for s in REPORT_STAGES if any(s in r['timings'] for r in results)] + ['total']
+    header = f"{'city':<8}" + ''.join(f"{s:>11}" for s in stages)
+    lines = [header, '-' * len(header)]
+    for r in results:
+        cells = ''.join(f"{r['timings'][s]:>11.3f}" if s in r['timings'] else f"{'-':>11}" for s in stages)
+        lines.append(f"{r['city']:<8}{cells}" + (f"  ! {r['error']}" if r['error'] else ''))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="도시별 인구 지도/지표 리포트 일괄 생성")
+    parser.add_argument("--cities", nargs="+", default=CITIES, help=f"대상 도시 (기본: {' '.join(CITIES)})")
+    parser.add_argument("--out", default="reports", help="출력 디렉터리 (도시별 하위 디렉터리 생성)")
+    parser.add_argument("--geo", default=DEFAULT_GEO_FILE, help="행정동 경계 GeoJSON")
+    parser.add_argument("--workers", type=int, default=None, help="병렬 워커 수 (기본: 도시 수와 CPU 수 중 작은 값)")
+    parser.add_argument("--formats", nargs="+", choices=REPORT_FORMATS, default=list(REPORT_FORMATS))
+    parser.add_argument("--map-type", choices=list(CHOROPLETH_METRICS), default='총인구')
+    parser.add_argument("--radius", type=int, default=COVERAGE_DEFAULT_RADIUS_M, help="커버리지 반경 (m)")
+    parser.add_argument("--overlay", action="store_true", help="지도에 키즈룸 반경 영역 표시")
+    parser.add_argument("--trend", nargs=2, metavar=("START", "END"), default=(None, None),
+                        help="인구 추이 비교 기준 월 YYYYMM (기본: 저장소의 처음/마지막 달)")
+    args = parser.parse_args(argv)
+
+    unknown = [c for c in args.cities if c not in CITIES]
+    if unknown:
+        parser.error(f"지원하지 않는 도시: {', '.join(unknown)} (지원: {', '.join(CITIES)})")
+
+    started = time.perf_counter()
+    results = build_reports(
+        args.cities, args.out, args.geo, max_workers=args.workers,
+        map_type=args.map_type, radius_m=args.radius, formats=tuple(args.formats), overlay=args.overlay,
+        trend_start=args.trend[0], trend_end=args.trend[1],
+    )
+    write_summary(results, args.out)
+    print(format_timings(results))
+    print(f"\n{len(results)}개 도시, {time.perf_counter() - started:.2f}s -> {os.path.abspath(args.out)}")
+    return 1 if any(r['error'] for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
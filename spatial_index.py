@@ -0,0 +1,134 @@
+"""
+공간 인덱스 모듈 - 행정동 경계 STRtree로 키즈룸을 동에 일괄 배정하고 동별 키즈룸 지표 계산
+
+인덱스는 경계 geometry마다 한 번 만들어 캐시하고, 키즈룸 목록이나 지표 컬럼이 바뀌어도 재사용
+"""
+import geopandas as gpd
+import numpy as np
+import shapely
+from config import METRIC_CRS_EPSG, SPATIAL_INDEX_CACHE_MAX_ENTRIES
+from pipeline_cache import LRUCache, geometry_hash
+from profiling import span
+
+# 키즈룸 좌표계 (위도/경도)
+KIDSROOM_CRS = "EPSG:4326"
+
+# add_kidsroom_metrics가 추가하는 컬럼
+KIDSROOM_METRIC_COLUMNS = ('키즈룸수', '아동천명당_키즈룸', '최근접_키즈룸거리')
+
+
+class DongIndex:
+    """병합 결과의 행정동 경계 인덱스 (STRtree + 투영 좌표계 중심점)"""
+
+    def __init__(self, merged):
+        self.crs = merged.crs
+        self.geometries = np.asarray(merged.geometry.values, dtype=object)
+        self.tree = shapely.STRtree(self.geometries)
+        projected = merged.geometry.to_crs(epsg=METRIC_CRS_EPSG)
+        self.centroids_m = shapely.centroid(np.asarray(projected.values, dtype=object))
+
+    def __len__(self):
+        return len(self.geometries)
+
+    def _points(self, lats, lons):
+        points = shapely.points(lons, lats)
+        if self.crs is not None and not self.crs.equals(KIDSROOM_CRS):
+            points = np.asarray(gpd.GeoSeries(points, crs=KIDSROOM_CRS).to_crs(self.crs).values, dtype=object)
+        return points
+
+    def assign(self, lats, lons):
+        """좌표별 포함 행정동 위치 (merged 행 순서, 없으면 -1) - 경계 위 점은 먼저 나온 동에 배정"""
+        result = np.full(len(lats), -1, dtype=np.int64)
+        if len(lats) == 0:
+            return result
+        point_idx, dong_idx = self.tree.query(self._points(lats, lons), predicate='within')
+        # 같은 점이 여러 동에 걸리면 뒤에서부터 덮어써서 첫 번째 동이 남도록
+        result[point_idx[::-1]] = dong_idx[::-1]
+        return result
+
+    def counts(self, assignment):
+        """동별 배정된 키즈룸 수"""
+        return np.bincount(assignment[assignment >= 0], minlength=len(self))
+
+    def nearest_distance(self, lats, lons):
+        """동 중심점에서 가장 가까운 키즈룸까지 거리 (m, 키즈룸이 없으면 NaN)"""
+        result = np.full(len(self), np.nan)
+        if len(lats) == 0 or len(self) == 0:
+            return result
+        points_m = gpd.GeoSeries(shapely.points(lons, lats), crs=KIDSROOM_CRS).to_crs(epsg=METRIC_CRS_EPSG)
+        venue_tree = shapely.STRtree(np.asarray(points_m.values, dtype=object))
+        (dong_idx, _), distances = venue_tree.query_nearest(self.centroids_m, return_distance=True, all_matches=False)
+        result[dong_idx] = distances
+        return result
+
+
+_index_cache = LRUCache(SPATIAL_INDEX_CACHE_MAX_ENTRIES)
+
+
+def get_dong_index(merged):
+    """병합 데이터셋의 행정동 인덱스 (geometry 해시 기준 캐시, 세션 간 공유)
+
+    인덱스는 경계 geometry로만 정해지므로 지표 컬럼이 추가/변경돼도 다시 만들지 않음
+    """
+    def build():
+        with span('dong_index'):
+            return DongIndex(merged)
+
+    return _index_cache.get_or_compute(geometry_hash(merged), build)
+
+
+def get_spatial_index_cache_stats():
+    return _index_cache.stats()
+
+
+def clear_spatial_index_cache():
+    _index_cache.clear()
+
+
+def kidsroom_coordinates(kidsroom_list):
+    """키즈룸 목록 -> (위도 배열, 경도 배열, 좌표가 유효한 항목 위치)"""
+    lats, lons, valid = [], [], []
+    for i, kr in enumerate(kidsroom_list):
+        try:
+            lat, lon = float(kr['lat']), float(kr['lon'])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if np.isfinite(lat) and np.isfinite(lon):
+            lats.append(lat)
+            lons.append(lon)
+            valid.append(i)
+    return np.asarray(lats, dtype=float), np.asarray(lons, dtype=float), valid
+
+
+def assign_kidsrooms(merged, kidsroom_list):
+    """키즈룸별 소속 행정동 이름 목록 (경계 밖이거나 좌표가 없으면 None)"""
+    lats, lons, valid = kidsroom_coordinates(kidsroom_list)
+    positions = get_dong_index(merged).assign(lats, lons)
+    adm_names = merged['adm_nm'].tolist()
+    result = [None] * len(kidsroom_list)
+    for i, pos in zip(valid, positions.tolist()):
+        if pos >= 0:
+            result[i] = adm_names[pos]
+    return result
+
+
+def add_kidsroom_metrics(merged, kidsroom_list):
+    """동별 키즈룸 지표 컬럼을 추가한 사본 반환
+
+    - 키즈룸수: 동 경계 안의 키즈룸 수
+    - 아동천명당_키즈룸: 아동인구(0~13세) 1,000명당 키즈룸 수 (아동인구가 없으면 NaN)
+    - 최근접_키즈룸거리: 동 중심점에서 가장 가까운 키즈룸까지 거리(m, 다른 동/도시의 키즈룸 포함)
+    """
+    index = get_dong_index(merged)
+    lats, lons, _ = kidsroom_coordinates(kidsroom_list)
+    counts = index.counts(index.assign(lats, lons)).astype(float)
+
+    children = merged['아동인구'].to_numpy(dtype=float) if '아동인구' in merged.columns else np.full(len(merged), np.nan)
+    per_1000 = np.full(len(merged), np.nan)
+    np.divide(counts * 1000, children, out=per_1000, where=children > 0)
+
+    return merged.assign(**{
+        '키즈룸수': counts,
+        '아동천명당_키즈룸': per_1000,
+        '최근접_키즈룸거리': index.nearest_distance(lats, lons),
+    })
@@ -0,0 +1,33 @@
+"""
+테스트 공통 설정 - 저장소 루트를 import 경로에 넣고, 설정의 상대 경로(data/...)가 맞도록 루트에서 실행
+"""
+import os
+import shutil
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(autouse=True)
+def _run_from_repo_root(monkeypatch):
+    monkeypatch.chdir(ROOT)
+
+
+@pytest.fixture
+def kidsroom_store(tmp_path, monkeypatch):
+    """번들 키즈룸 목록을 임시 디렉토리의 data/로 복사하고 그곳에서 실행 -> kidsroom_manager 모듈
+
+    저장소 경로가 상대 경로라 작업 디렉토리만 바꾸면 저널/백업/잠금 파일이 모두 임시 디렉토리에 생김
+    (프로세스 공용 메모리 상태도 새로 시작)
+    """
+    import kidsroom_manager
+
+    (tmp_path / "data").mkdir()
+    shutil.copy(os.path.join(ROOT, kidsroom_manager.KIDSROOM_DATA_FILE), tmp_path / "data")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(kidsroom_manager, "_state", kidsroom_manager._StoreState())
+    return kidsroom_manager
@@ -0,0 +1,56 @@
+"""
+연령대별 아동인구 집계(user-015) - 구간 합계, 결측 처리, 번들 CSV에서 나이별 컬럼 직접 합산과 비교
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from config import CHILD_AGE_BANDS, CHILD_BAND_COLUMNS, CHILD_MAX_AGE, CITIES, get_city_csv_path
+from data_processing import age_matrix, aggregate_age_bands, find_age_columns, prepare_population_data, read_population_csv
+
+
+def test_aggregate_age_bands_totals():
+    ages = np.array([0, 1, 2, 3, 4])
+    values = np.array([
+        [1.0, 2.0, 3.0, 4.0, 5.0],
+        [np.nan, 2.0, np.nan, np.nan, np.nan],
+        [np.nan, np.nan, np.nan, np.nan, 7.0],
+    ])
+    totals = aggregate_age_bands(ages, values, [(0, 1), (2, 4), (0, 4)])
+
+    np.testing.assert_array_equal(totals[0], [3.0, 12.0, 15.0])
+    # 일부만 결측이면 나머지 합, 구간 전체가 결측이면 NaN
+    np.testing.assert_array_equal(totals[1], [2.0, np.nan, 2.0])
+    np.testing.assert_array_equal(totals[2], [np.nan, 7.0, 7.0])
+
+
+def test_age_matrix_parses_comma_strings():
+    df = pd.DataFrame({
+        '2025년10월_계_1세': ['1,234', '5'],
+        '2025년10월_계_0세': ['10', ''],
+        '2025년10월_남_0세': ['4', '1'],
+    })
+    ages, values = age_matrix(df)
+
+    np.testing.assert_array_equal(ages, [0, 1])
+    np.testing.assert_array_equal(values, [[10.0, 1234.0], [np.nan, 5.0]])
+
+
+@pytest.mark.parametrize("city", CITIES)
+def test_child_bands_match_age_columns(city):
+    path = get_city_csv_path(city)
+    try:
+        raw = pd.read_csv(path, encoding="utf-8-sig", dtype=str)
+    except UnicodeDecodeError:
+        raw = pd.read_csv(path, encoding="cp949", dtype=str)
+    by_age = {age: pd.to_numeric(raw[col].str.replace(',', ''), errors='coerce') for age, col in find_age_columns(raw).items()}
+    result = prepare_population_data(read_population_csv(path))
+
+    expected_child = sum(by_age[age] for age in range(CHILD_MAX_AGE + 1))
+    np.testing.assert_allclose(result['아동인구'], expected_child)
+    for col, (_, lo, hi) in zip(CHILD_BAND_COLUMNS, CHILD_AGE_BANDS):
+        np.testing.assert_allclose(result[col], sum(by_age[age] for age in range(lo, hi + 1)))
+    # 구간이 아동인구 범위를 겹침 없이 나누면 (기본 0~3, 4~7, 8~13) 구간 합 = 아동인구
+    covered = [age for _, lo, hi in CHILD_AGE_BANDS for age in range(lo, hi + 1)]
+    if sorted(covered) == list(range(CHILD_MAX_AGE + 1)):
+        np.testing.assert_allclose(result[list(CHILD_BAND_COLUMNS)].sum(axis=1), result['아동인구'])
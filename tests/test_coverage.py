@@ -0,0 +1,107 @@
+"""
+커버리지 분석(user-016) - 격자 거리, 반경별 커버리지 비율, 요약, 격자 캐시 키
+"""
+import geopandas as gpd
+import numpy as np
+import pytest
+import shapely
+from shapely.geometry import box
+
+from config import DEFAULT_GEO_FILE, METRIC_CRS_EPSG, get_city_csv_path
+from coverage import (
+    add_coverage_metrics,
+    clear_coverage_cache,
+    get_coverage_cache_stats,
+    get_population_grid,
+    underserved_dongs,
+)
+from kidsroom_manager import load_kidsroom_data
+from pipeline_cache import get_merged_data
+from spatial_index import add_kidsroom_metrics
+
+
+@pytest.fixture(scope="module")
+def seongnam():
+    return get_merged_data(get_city_csv_path("성남시"), DEFAULT_GEO_FILE, "성남시"), load_kidsroom_data()
+
+
+def _square_dong(size_m=1000, population=1000.0, children=100.0):
+    """투영 좌표계 원점 근처 size_m 정사각형 동 하나 (위경도로 변환) + 중심 위경도"""
+    square = gpd.GeoSeries([box(200_000, 500_000, 200_000 + size_m, 500_000 + size_m)], crs=METRIC_CRS_EPSG)
+    geometry = square.to_crs(epsg=4326)
+    center = geometry.iloc[0].centroid
+    merged = gpd.GeoDataFrame({'adm_nm': ['정사각동'], '총인구': [population], '아동인구': [children]}, geometry=geometry)
+    return merged, {'lat': center.y, 'lon': center.x}
+
+
+def test_coverage_share_matches_circle_area():
+    merged, center = _square_dong()
+    # 멀리 있는 두 번째 키즈룸은 가장 가까운 거리에 영향 없음 (좌표 하나만 변환할 때의 pyproj 경고도 피함)
+    far = {'lat': center['lat'] + 0.5, 'lon': center['lon']}
+    covered, summary = add_coverage_metrics(merged, [center, far], radius_m=300)
+
+    # 반경 300m 원 / 1km 정사각형 = 약 28.3%, 100m 격자 근사
+    assert covered['커버리지_비율'].iloc[0] == pytest.approx(np.pi * 0.3 ** 2 * 100, abs=5)
+    assert covered['커버_인구'].iloc[0] == pytest.approx(10 * covered['커버리지_비율'].iloc[0])
+    assert covered['미커버_아동인구'].iloc[0] == pytest.approx(100 - covered['커버리지_비율'].iloc[0])
+    # 정사각형 안 균등 분포에서 중심까지 평균 거리 ≈ 0.3826 x 한 변
+    assert covered['인구가중_평균거리'].iloc[0] == pytest.approx(382.6, rel=0.03)
+    assert summary['covered_share'] == pytest.approx(covered['커버리지_비율'].iloc[0] / 100)
+
+
+def test_nearest_distance_matches_brute_force(seongnam):
+    merged, kidsrooms = seongnam
+    grid = get_population_grid(merged)
+    lats = np.array([k['lat'] for k in kidsrooms], dtype=float)
+    lons = np.array([k['lon'] for k in kidsrooms], dtype=float)
+    distances = grid.nearest_distance(lats, lons)
+
+    venues = gpd.GeoSeries(shapely.points(lons, lats), crs=4326).to_crs(epsg=METRIC_CRS_EPSG)
+    sample = np.random.default_rng(0).choice(len(grid), size=min(500, len(grid)), replace=False)
+    dx = grid.x[sample, None] - venues.x.to_numpy()[None, :]
+    dy = grid.y[sample, None] - venues.y.to_numpy()[None, :]
+    np.testing.assert_allclose(distances[sample], np.hypot(dx, dy).min(axis=1))
+
+
+def test_coverage_grows_with_radius(seongnam):
+    merged, kidsrooms = seongnam
+    shares = []
+    for radius in (500, 1000, 3000, 100_000):
+        covered, summary = add_coverage_metrics(merged, kidsrooms, radius_m=radius)
+        ratio = covered['커버리지_비율'].to_numpy()
+        assert np.nanmin(ratio) >= 0 and np.nanmax(ratio) <= 100 + 1e-9
+        shares.append(summary['covered_share'])
+
+    assert shares == sorted(shares)
+    assert shares[-1] == pytest.approx(1.0)
+    assert summary['population'] == pytest.approx(merged['총인구'].sum())
+
+
+def test_no_kidsrooms(seongnam):
+    merged, _ = seongnam
+    covered, summary = add_coverage_metrics(merged, [], radius_m=1000)
+
+    assert (covered['커버리지_비율'].dropna() == 0).all()
+    assert covered['인구가중_평균거리'].isna().all()
+    assert summary['covered_share'] == 0 and summary['weighted_mean_distance_m'] is None
+
+
+def test_underserved_dongs_sorted(seongnam):
+    merged, kidsrooms = seongnam
+    covered, _ = add_coverage_metrics(merged, kidsrooms, radius_m=1000)
+    table = underserved_dongs(covered, max_share=0.5)
+
+    assert (table['커버리지_비율'] < 50).all()
+    assert table['미커버_아동인구'].is_monotonic_decreasing
+
+
+def test_grid_reused_when_only_attributes_change(seongnam):
+    merged, kidsrooms = seongnam
+    clear_coverage_cache()
+    before = get_coverage_cache_stats()
+    get_population_grid(merged)
+    with_metrics = add_kidsroom_metrics(merged, kidsrooms)
+    add_coverage_metrics(with_metrics, kidsrooms, radius_m=1000)
+
+    after = get_coverage_cache_stats()
+    assert (after['misses'] - before['misses'], after['hits'] - before['hits']) == (1, 1)
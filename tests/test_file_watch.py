@@ -0,0 +1,94 @@
+"""
+파일 변경 감지(user-013) - 내용이 바뀔 때만 세대 증가 (touch는 유지), inotify/stat 비교 방식
+"""
+import os
+import sys
+import time
+
+import pytest
+
+from file_watch import FileChangeDetector, WatchedFiles, _stat_sig
+
+
+def _touch(path):
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def _wait_for(predicate, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return predicate()
+
+
+@pytest.fixture
+def watched_paths(tmp_path):
+    snapshot, journal = tmp_path / "kidsroom_data.json", tmp_path / "kidsroom_journal.jsonl"
+    snapshot.write_text('{"seq": 0, "kidsrooms": []}', encoding="utf-8")
+    return str(snapshot), str(journal)
+
+
+def test_touch_does_not_bump_generation(watched_paths):
+    snapshot, _ = watched_paths
+    detector = FileChangeDetector(watched_paths)
+    generation, digest = detector.check(), detector.content_hash()
+
+    _touch(snapshot)
+    assert detector.check() == generation
+    assert detector.content_hash() == digest
+
+    with open(snapshot, "a", encoding="utf-8") as f:
+        f.write("\n")
+    assert detector.check() == generation + 1
+    assert detector.content_hash() != digest
+
+
+def test_create_and_delete_bump_generation(watched_paths):
+    snapshot, journal = watched_paths
+    detector = FileChangeDetector(watched_paths)
+    generation = detector.check()
+
+    with open(journal, "w", encoding="utf-8") as f:
+        f.write('{"seq": 1}\n')
+    assert detector.check() == generation + 1
+    os.remove(journal)
+    os.remove(snapshot)
+    assert detector.check() == generation + 2
+    assert detector.content_hash() is None
+
+
+def test_poll_mode_compares_on_each_call(watched_paths):
+    snapshot, _ = watched_paths
+    watched = WatchedFiles(watched_paths, mode="poll")
+    generation = watched.generation()
+
+    _touch(snapshot)
+    assert watched.generation() == generation
+    with open(snapshot, "w", encoding="utf-8") as f:
+        f.write('{"seq": 1, "kidsrooms": []}')
+    assert watched.generation() == generation + 1
+    assert watched.mode == "poll"
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify는 Linux 전용")
+def test_inotify_mode_counts_content_changes_only(watched_paths):
+    snapshot, journal = watched_paths
+    watched = WatchedFiles(watched_paths, mode="inotify")
+    try:
+        assert watched.mode == "inotify"
+        generation = watched.generation()
+
+        _touch(snapshot)
+        # 감시 스레드가 바뀐 stat을 반영할 때까지 기다린 뒤 세대 확인
+        assert _wait_for(lambda: watched.detector._sigs.get(snapshot) == _stat_sig(snapshot))
+        assert watched.generation() == generation
+
+        with open(journal, "a", encoding="utf-8") as f:
+            f.write('{"seq": 1}\n')
+        # 새 파일은 생성(빈 파일)과 쓰기 이벤트를 따로 볼 수 있어 한 번 이상 증가
+        assert _wait_for(lambda: watched.generation() > generation)
+    finally:
+        watched.stop()
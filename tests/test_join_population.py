@@ -0,0 +1,47 @@
+"""
+행정코드 우선 병합(join_population) - 중복 코드 행, 이름 보완
+"""
+import geopandas as gpd
+import pandas as pd
+from shapely.geometry import Point
+
+from data_processing import JOIN_BASIS_COLUMN, join_population
+
+
+def _boundaries():
+    return gpd.GeoDataFrame(
+        {
+            'adm_code': pd.array([4113110100, 4113110200, None], dtype='Int64'),
+            'dong_nm': ['신흥1동', '신흥2동', '태평1동'],
+            'adm_nm': ['성남시 신흥1동', '성남시 신흥2동', '성남시 태평1동'],
+        },
+        geometry=[Point(0, 0), Point(1, 0), Point(2, 0)],
+        crs='EPSG:4326',
+    )
+
+
+def test_duplicate_codes_keep_first_row():
+    rows = pd.DataFrame({
+        '행정코드': pd.array([4113110200, 4113110100, 4113110200, 4113110100], dtype='Int64'),
+        '정규화된_동명': ['신흥2동', '신흥1동', '신흥2동', '신흥1동'],
+        '행정구역': ['a', 'b', 'c', 'd'],
+    })
+    merged, report = join_population(_boundaries(), rows)
+
+    assert merged['행정구역'].tolist()[:2] == ['b', 'a']
+    assert report['matched_by_code'] == 2
+    assert report['unmatched_rows'] == ['c', 'd']
+
+
+def test_name_fallback_for_boundary_without_code():
+    rows = pd.DataFrame({
+        '행정코드': pd.array([4113110100, None], dtype='Int64'),
+        '정규화된_동명': ['신흥1동', '태평1동'],
+        '행정구역': ['a', 'b'],
+    })
+    merged, report = join_population(_boundaries(), rows)
+
+    assert merged.loc[[0, 2], '행정구역'].tolist() == ['a', 'b']
+    assert pd.isna(merged.loc[1, '행정구역'])
+    assert merged[JOIN_BASIS_COLUMN].tolist() == ['코드', None, '이름']
+    assert report['unmatched_boundaries'] == ['성남시 신흥2동']
@@ -0,0 +1,78 @@
+"""
+키즈룸 저널(user-011) - 저널 재생, 압축 반복/중단 후 재생, seq 시점 복원
+"""
+import os
+import shutil
+
+
+def _by_id(records):
+    return {r['id']: r for r in records}
+
+
+def _reload(km, monkeypatch):
+    """새 프로세스처럼 메모리 상태 없이 스냅샷 + 저널에서 다시 읽기"""
+    monkeypatch.setattr(km, '_state', km._StoreState())
+    return km.load_kidsroom_state()
+
+
+def _make_changes(km):
+    """추가/수정/삭제를 차례로 기록 -> [(seq, 그 시점 목록)]"""
+    kids = km.load_kidsroom_data()
+    history = [km.load_kidsroom_state()]
+    km.add_kidsroom(kids, '테스트 키즈룸', '성남시 분당구 정자동 1', 37.36, 127.11)
+    history.append(km.load_kidsroom_state())
+    km.update_kidsroom(kids, kids[-1]['id'], name='테스트 키즈룸 2호점')
+    history.append(km.load_kidsroom_state())
+    km.remove_kidsroom(kids, kids[0]['id'])
+    history.append(km.load_kidsroom_state())
+    return history
+
+
+def test_journal_replay_matches_live_state(kidsroom_store, monkeypatch):
+    km = kidsroom_store
+    history = _make_changes(km)
+    seq, records = history[-1]
+
+    assert [s for s, _ in history] == [0, 1, 2, 3]
+    assert _reload(km, monkeypatch) == (seq, records)
+    assert _by_id(records)[history[1][1][-1]['id']]['name'] == '테스트 키즈룸 2호점'
+    assert _by_id(records)[history[1][1][-1]['id']]['version'] == 2
+
+
+def test_compaction_is_idempotent(kidsroom_store, monkeypatch):
+    km = kidsroom_store
+    seq, records = _make_changes(km)[-1]
+    journal_copy = km.KIDSROOM_JOURNAL_FILE + '.copy'
+    shutil.copy(km.KIDSROOM_JOURNAL_FILE, journal_copy)
+
+    assert km.compact_journal() == seq
+    assert km.compact_journal() == seq
+    assert not os.path.exists(km.KIDSROOM_JOURNAL_FILE)
+    assert _reload(km, monkeypatch) == (seq, records)
+
+    # 스냅샷 교체 뒤 저널 이동 전에 중단된 경우: 이미 스냅샷에 든 항목은 다시 적용하지 않음
+    os.replace(journal_copy, km.KIDSROOM_JOURNAL_FILE)
+    assert _reload(km, monkeypatch) == (seq, records)
+
+
+def test_auto_compaction_keeps_state(kidsroom_store, monkeypatch):
+    km = kidsroom_store
+    monkeypatch.setattr(km, 'KIDSROOM_COMPACT_EVERY', 2)
+    seq, records = _make_changes(km)[-1]
+
+    assert km._state.base_seq == 2
+    assert _reload(km, monkeypatch) == (seq, records)
+
+
+def test_restore_by_seq(kidsroom_store, monkeypatch):
+    km = kidsroom_store
+    monkeypatch.setattr(km, 'KIDSROOM_COMPACT_EVERY', 2)
+    history = _make_changes(km)
+
+    for seq, records in history:
+        assert _by_id(km.restore_kidsroom_data(seq=seq)) == _by_id(records)
+
+    restored = km.restore_kidsroom_data(seq=1, apply=True)
+    seq, current = km.load_kidsroom_state()
+    assert seq == history[-1][0] + 1
+    assert _by_id(current) == _by_id(restored) == _by_id(history[1][1])
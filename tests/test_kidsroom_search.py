@@ -0,0 +1,78 @@
+"""
+키즈룸 검색 인덱스(user-021) - 점수 순위, 입력 중인 글자/초성, 역색인 후보와 전체 확인 일치, 변경분 색인/묘비
+"""
+import pytest
+
+from kidsroom_manager import load_kidsroom_data
+from kidsroom_search import KidsroomSearchIndex
+
+RECORDS = [
+    {'id': 'a', 'version': 1, 'name': '분당 키즈카페', 'address': '성남시 분당구 정자동 1'},
+    {'id': 'b', 'version': 1, 'name': '키즈룸', 'address': '성남시 수정구 신흥동 2'},
+    {'id': 'c', 'version': 1, 'name': '키즈룸 판교점', 'address': '성남시 분당구 삼평동 3'},
+    {'id': 'd', 'version': 1, 'name': '해피 키즈룸', 'address': '성남시 중원구 성남동 4'},
+    {'id': 'e', 'version': 1, 'name': '킥보드 놀이터', 'address': '성남시 분당구 서현동 5'},
+    {'id': 'f', 'version': 1, 'name': '어린이 도서관', 'address': '성남시 분당구 키즈로 6'},
+]
+
+
+def _ids(records):
+    return [r['id'] for r in records]
+
+
+def _full_scan(index):
+    """역색인을 쓰지 않고 모든 문서를 확인하는 같은 목록의 인덱스"""
+    scan = KidsroomSearchIndex([index.get(i) for i in index._by_id])
+    scan._candidates = lambda term: None
+    return scan
+
+
+def test_ranking_order():
+    index = KidsroomSearchIndex(RECORDS)
+
+    # 이름 완전 일치 > 이름 시작 > 이름 단어 시작 > 주소
+    assert _ids(index.search('키즈룸')) == ['b', 'c', 'd']
+    assert _ids(index.search('키즈')) == ['b', 'c', 'd', 'a', 'f']
+    assert _ids(index.search('분당 키즈')) == ['a', 'c', 'f']
+    assert _ids(index.search('키즈', limit=2)) == ['b', 'c']
+
+
+@pytest.mark.parametrize("query, expected", [
+    ('키즈ㄹ', ['b', 'c', 'd', 'f']),   # 'ㄹ'은 '룸'의 초성 또는 '즐'처럼 앞 글자 받침
+    ('키즈루', ['b', 'c', 'd']),
+    ('키', ['b', 'c', 'e', 'd', 'a', 'f']),  # '킥'도 입력 중인 '키'와 일치 (이름 시작)
+    ('ㅋㅈㄹ', ['b', 'd', 'c']),          # 초성 검색은 이름만, 같은 점수면 짧은 이름 먼저
+    ('b', ['b']),                           # id 직접 조회
+])
+def test_composing_and_choseong_queries(query, expected):
+    assert _ids(KidsroomSearchIndex(RECORDS).search(query)) == expected
+
+
+def test_index_candidates_match_full_scan():
+    index = KidsroomSearchIndex(load_kidsroom_data() + RECORDS)
+    scan = _full_scan(index)
+    queries = ['키', '키즈', '키즈ㄹ', '키즐', '분당', '분당구', '정자', '도서', '호', '성남시 분당', '놀이', 'ㅋ']
+    for query in queries:
+        assert _ids(index.search(query)) == _ids(scan.search(query)), query
+
+
+def test_sync_reindexes_only_changes_and_drops_tombstones():
+    records = [dict(r) for r in RECORDS]
+    index = KidsroomSearchIndex(records, rebuild_ratio=0.5)
+    assert index.sync(records) == 0
+
+    records[1] = {**records[1], 'version': 2, 'name': '새 이름'}
+    assert index.sync(records) == 1
+    assert 'b' not in _ids(index.search('키즈룸'))
+    assert _ids(index.search('새 이름')) == ['b']
+
+    # 삭제된 항목은 묘비로 남아 검색되지 않고, 묘비가 rebuild_ratio를 넘으면 색인 재구성
+    del records[2:4]
+    assert index.sync(records) == 2
+    assert _ids(index.search('키즈룸')) == []
+    assert index.get('c') is None and len(index) == 4
+    assert index._dead == 3
+    del records[0]
+    index.sync(records)
+    assert index._dead == 0 and len(index._docs) == len(index) == 3
+    assert _ids(index.search('분당')) == ['e', 'f']
@@ -0,0 +1,57 @@
+"""
+키즈룸 id/version 충돌 감지(user-012) - 다른 세션이 먼저 바꾼 항목을 이전 version으로 수정/삭제
+"""
+import pytest
+
+
+def test_stale_update_raises_conflict(kidsroom_store):
+    km = kidsroom_store
+    mine, theirs = km.load_kidsroom_data(), km.load_kidsroom_data()
+    target = mine[0]['id']
+
+    km.update_kidsroom(theirs, target, name='다른 세션 수정')
+    with pytest.raises(km.VersionConflictError) as excinfo:
+        km.update_kidsroom(mine, target, name='내 수정')
+
+    assert (excinfo.value.kidsroom_id, excinfo.value.expected, excinfo.value.actual) == (target, 1, 2)
+    record = next(r for r in km.load_kidsroom_data() if r['id'] == target)
+    assert (record['name'], record['version']) == ('다른 세션 수정', 2)
+
+
+def test_stale_remove_raises_conflict(kidsroom_store):
+    km = kidsroom_store
+    mine, theirs = km.load_kidsroom_data(), km.load_kidsroom_data()
+    target = mine[0]['id']
+
+    km.update_kidsroom(theirs, target, name='다른 세션 수정')
+    with pytest.raises(km.VersionConflictError):
+        km.remove_kidsroom(mine, target)
+    assert any(r['id'] == target for r in km.load_kidsroom_data())
+
+    # 최신 version으로는 삭제 가능
+    km.remove_kidsroom(mine, target, expected_version=2)
+    assert all(r['id'] != target for r in km.load_kidsroom_data())
+
+
+def test_update_after_remove_reports_deleted(kidsroom_store):
+    km = kidsroom_store
+    mine, theirs = km.load_kidsroom_data(), km.load_kidsroom_data()
+    target = mine[0]['id']
+
+    km.remove_kidsroom(theirs, target)
+    with pytest.raises(km.VersionConflictError) as excinfo:
+        km.update_kidsroom(mine, target, name='내 수정')
+    assert excinfo.value.actual is None
+
+    # 이미 삭제된 항목 삭제는 충돌이 아니라 세션 목록에서만 제거
+    km.remove_kidsroom(mine, target)
+    assert all(r['id'] != target for r in mine)
+
+
+def test_reordered_list_updates_by_id(kidsroom_store):
+    km = kidsroom_store
+    kids = km.load_kidsroom_data()
+    target = kids[1]['id']
+
+    km.update_kidsroom(list(reversed(kids)), target, address='성남시 수정구 신흥동 1')
+    assert next(r for r in km.load_kidsroom_data() if r['id'] == target)['address'] == '성남시 수정구 신흥동 1'
@@ -0,0 +1,80 @@
+"""
+벡터화 처리(user-003)와 기존 행 단위 apply 코드의 결과 비교 (번들 성남시/광주시/용인시 데이터)
+"""
+import geopandas as gpd
+import pandas as pd
+import pytest
+
+from config import CITIES, DEFAULT_GEO_FILE, get_city_csv_path
+from data_processing import prepare_population_data, process_geodata, merge_data
+
+
+def _old_read_csv(path):
+    try:
+        return pd.read_csv(path, encoding="utf-8")
+    except UnicodeDecodeError:
+        return pd.read_csv(path, encoding="cp949")
+
+
+def _old_process_population_data(df):
+    total_pop_col = [c for c in df.columns if ('총인구' in c or '총인구수' in c) and ('계' in c or '계_' in c)][0]
+    df['총인구'] = df[total_pop_col].replace(",", "", regex=True).astype(float)
+    df["정규화된_동명"] = df["행정구역"].apply(
+        lambda x: x.split()[-1].split('(')[0] if isinstance(x, str) and '동' in x else None
+    )
+    return df
+
+
+def _old_process_geodata(gdf, city_name):
+    gdf_filtered = gdf[gdf["sggnm"].str.contains(city_name, na=False)].copy()
+    gdf_filtered['dong_nm'] = gdf_filtered['adm_nm'].apply(
+        lambda x: x.strip().split()[-1] if isinstance(x, str) and '동' in x else None
+    )
+    return gdf_filtered
+
+
+def _old_density(merged):
+    return merged.apply(
+        lambda row: (row['총인구'] / (row['면적'] / 1_000_000)) if row['면적'] > 0 else 0,
+        axis=1
+    )
+
+
+@pytest.fixture(scope="module")
+def boundaries():
+    return gpd.read_file(DEFAULT_GEO_FILE)
+
+
+@pytest.mark.parametrize("city", CITIES)
+def test_population_names_match_apply(city):
+    raw = _old_read_csv(get_city_csv_path(city))
+    old = _old_process_population_data(raw.copy())
+    new = prepare_population_data(raw.copy())
+
+    pd.testing.assert_frame_equal(new[['총인구', '정규화된_동명']], old[['총인구', '정규화된_동명']], check_dtype=True)
+    # '동'이 없는 행(시/구 합계, 읍/면)은 NaN이 아니라 None
+    non_dong = ~raw['행정구역'].str.contains('동', regex=False)
+    assert non_dong.any()
+    assert all(v is None for v in new.loc[non_dong, '정규화된_동명'])
+
+
+@pytest.mark.parametrize("city", CITIES)
+def test_geodata_names_match_apply(boundaries, city):
+    old = _old_process_geodata(boundaries, city)
+    new = process_geodata(boundaries, city_name=city)
+
+    pd.testing.assert_series_equal(new['dong_nm'], old['dong_nm'], check_dtype=True)
+    non_dong = ~old['adm_nm'].str.contains('동', regex=False)
+    assert all(v is None for v in new.loc[non_dong, 'dong_nm'])
+
+
+@pytest.mark.parametrize("city", CITIES)
+def test_density_matches_apply(boundaries, city):
+    df = prepare_population_data(_old_read_csv(get_city_csv_path(city)))
+    merged = merge_data(process_geodata(boundaries, city_name=city), df)
+
+    expected = _old_density(merged)
+    pd.testing.assert_series_equal(merged['인구밀도'], expected, check_dtype=True, check_names=False)
+    # 매칭 안 된 동은 apply와 같이 NaN (0으로 채우지 않음)
+    unmatched = merged['총인구'].isna()
+    assert merged.loc[unmatched, '인구밀도'].isna().all()
@@ -3,9 +3,22 @@ Streamlit UI 컴포넌트 모듈
 """
 import streamlit as st
 import os
-from config import DEFAULT_CSV_FILE, DEFAULT_GEO_FILE, DEFAULT_CITY, CITY_FILE_MAP, get_city_csv_path
-from geocoding import geocode_address
-from kidsroom_manager import add_kidsroom, remove_kidsroom, update_kidsroom
+from config import (
+    DEFAULT_CSV_FILE, DEFAULT_GEO_FILE, DEFAULT_CITY, CITY_FILE_MAP, get_city_csv_path, COVERAGE_DEFAULT_RADIUS_M,
+    CHOROPLETH_METRICS, get_kakao_api_key_source,
+)
+from kidsroom_manager import add_kidsroom, add_kidsrooms, remove_kidsroom, update_kidsroom, VersionConflictError
+from kidsroom_search import KidsroomSearchIndex
+from profiling import span
+
+
+def render_api_key_status():
+    """카카오 API 키 설정 상태 안내 (secrets 사용 시에는 표시 안 함)"""
+    source = get_kakao_api_key_source()
+    if source == "env":
+        st.info("환경변수 KAKAO_API_KEY 사용 중")
+    elif source is None:
+        st.warning("KAKAO_API_KEY가 설정되지 않았습니다. .streamlit/secrets.toml 또는 환경변수로 설정해주세요.")
 
 
 def render_file_upload_section():
@@ -43,8 +56,9 @@ def render_file_upload_section():
 
     map_type = st.sidebar.radio(
         "시각화 기준",
-        ('총인구', '인구밀도'),
-        help="지도에 표시할 데이터 기준을 선택하세요. 인구밀도는 면적 대비 인구수입니다."
+        tuple(CHOROPLETH_METRICS),
+        format_func=lambda key: CHOROPLETH_METRICS[key]['label'],
+        help="지도에 표시할 데이터 기준을 선택하세요. 인구밀도는 면적 대비 인구수, 키즈룸 지표는 등록된 키즈룸 위치 기준입니다."
     )
 
     opacity = st.sidebar.slider(
@@ -60,6 +74,40 @@ def render_file_upload_section():
     return csv_file, geo_file, use_files, map_type, None, opacity, city_name
 
 
+def render_coverage_settings():
+    """커버리지 분석 설정 (반경, 지도 오버레이 여부) -> (radius_m, show_overlay)"""
+    st.sidebar.header("📏 커버리지 분석")
+    radius_m = st.sidebar.slider(
+        "키즈룸 반경 (m)",
+        min_value=200,
+        max_value=3000,
+        value=COVERAGE_DEFAULT_RADIUS_M,
+        step=100,
+        help="키즈룸에서 이 거리 안에 사는 인구를 '커버'된 것으로 봅니다 (직선 거리)"
+    )
+    show_overlay = st.sidebar.checkbox("반경 영역 지도에 표시", value=False)
+    return radius_m, show_overlay
+
+
+def render_trend_settings(months):
+    """인구 추이 기간 선택 (저장소의 기준 월 목록) -> (start, end), 달이 2개 미만이면 (None, None)"""
+    st.sidebar.header("📈 인구 추이")
+    if len(months) < 2:
+        st.sidebar.caption(
+            f"저장된 기준 월: {', '.join(months) or '없음'} - 다른 달 CSV를 "
+            "`python population_store.py ingest <파일>`로 추가하면 증감 지표를 볼 수 있습니다"
+        )
+        return None, None
+    start, end = st.sidebar.select_slider(
+        "비교 기간 (기준 월)",
+        options=months,
+        value=(months[0], months[-1]),
+        format_func=lambda m: f"{m[:4]}.{m[4:]}",
+        help="기간 증감은 시작 월 대비 끝 월, 전월 대비 증감은 끝 월과 그 직전 달을 비교합니다",
+    )
+    return start, end
+
+
 def render_kidsroom_auto_search_tab():
     """키즈룸 자동 검색 탭 렌더링"""
     with st.form("키즈룸_자동추가"):
@@ -70,6 +118,8 @@ def render_kidsroom_auto_search_tab():
         submitted = st.form_submit_button("🔍 검색하여 추가")
 
         if submitted and kr_address:
+            # 지오코딩 모듈(requests, SQLite 캐시)은 실제 검색 시점에 로드
+            from geocoding import geocode_address
             with st.spinner("카카오 API로 주소를 검색하는 중..."):
                 lat, lon, used_address, place_name = geocode_address(kr_address)
 
@@ -125,6 +175,43 @@ def render_kidsroom_manual_input_tab():
             st.rerun()
 
 
+def render_kidsroom_bulk_import_tab():
+    """키즈룸 일괄 가져오기 탭 렌더링 (CSV/Excel 주소 목록 동시 지오코딩)"""
+    st.caption("주소 컬럼('주소' 또는 'address')이 있는 CSV/Excel 파일을 올리면 동시에 좌표를 찾아 한 번에 등록합니다. 이름 컬럼('이름'/'name')은 선택입니다.")
+    uploaded = st.file_uploader("주소 목록 파일", type=["csv", "xlsx"], key="bulk_import_file")
+    if uploaded is None:
+        return
+
+    from bulk_geocoder import BulkGeocoder, read_address_file, results_to_kidsrooms
+    try:
+        rows = read_address_file(uploaded, uploaded.name)
+    except Exception as e:
+        st.error(f"파일을 읽을 수 없습니다: {e}")
+        return
+    st.write(f"주소 {len(rows)}건")
+
+    if rows and st.button("🚀 일괄 검색 후 등록", key="bulk_import_run"):
+        progress = st.progress(0.0, text="지오코딩 중...")
+        status = st.empty()
+
+        def on_result(result, done, total):
+            progress.progress(done / total, text=f"지오코딩 중... {done}/{total}")
+            mark = "✅" if result.ok else "❌"
+            status.caption(f"{mark} {result.address}" + (f" ({result.provider})" if result.ok else f" - {result.error}"))
+
+        results = BulkGeocoder().geocode_all(rows, on_result=on_result)
+        records = results_to_kidsrooms(results)
+        if records:
+            st.session_state.kidsroom_list = add_kidsrooms(st.session_state.kidsroom_list, records)
+        failed = [r for r in results if not r.ok]
+        st.success(f"✅ {len(records)}건 등록 완료 (실패 {len(failed)}건)")
+        if failed:
+            st.dataframe(
+                [{"행": r.index + 1, "주소": r.address, "사유": r.error} for r in failed],
+                width="stretch",
+            )
+
+
 def render_kidsroom_list():
     """등록된 키즈룸 목록 렌더링 (수정/삭제 지원 + 페이징 + 검색)"""
     if 'kidsroom_page' not in st.session_state:
@@ -139,10 +226,21 @@ def render_kidsroom_list():
 
     st.write("**등록된 키즈룸 목록:**")
 
-    # 검색 필터
-    keyword = st.text_input("🔍 이름/주소 검색", value="", placeholder="키워드 입력")
+    # 검색 (세션별 인덱스에 목록 변경분만 반영, 결과는 일치 점수 순)
+    index = st.session_state.get('kidsroom_search_index')
+    if index is None:
+        index = st.session_state.kidsroom_search_index = KidsroomSearchIndex()
+    with span('kidsroom_search.sync', records=len(kids)) as attrs:
+        attrs['reindexed'] = index.sync(kids)
+    keyword = st.text_input("🔍 이름/주소/초성/ID 검색", value="", placeholder="예: 키즈, 위례, ㅋㅈㄹ")
+    if keyword != st.session_state.get('kidsroom_search_keyword'):
+        # 검색어가 바뀌면 가장 잘 맞는 결과가 있는 첫 페이지로
+        st.session_state.kidsroom_search_keyword = keyword
+        st.session_state.kidsroom_page = 0
     if keyword.strip():
-        filtered = [k for k in kids if keyword.lower() in k['name'].lower() or keyword.lower() in k['address'].lower()]
+        with span('kidsroom_search.query') as attrs:
+            filtered = index.search(keyword)
+            attrs['results'] = len(filtered)
     else:
         filtered = kids
 
@@ -201,34 +299,44 @@ def render_kidsroom_list():
     if not page_items:
         st.warning("검색 결과 없음")
     for idx, kr in enumerate(page_items):
-        global_index = filtered.index(kr)  # 원본 인덱스 (삭제/수정 반영 위해)
-        with st.expander(f"{global_index+1}. {kr['name']} - {kr['address']}"):
+        kr_id = kr['id']  # 고정 id 기준으로 수정/삭제 (검색/정렬과 무관)
+        with st.expander(f"{start+idx+1}. {kr['name']} - {kr['address']}"):
             col1, col2, col3, col4, col5 = st.columns([2,2,1.5,1.5,1])
-            new_name = col1.text_input("이름", value=kr['name'], key=f"name_{global_index}")
-            new_addr = col2.text_input("주소", value=kr['address'], key=f"addr_{global_index}")
-            new_lat = col3.number_input("위도", value=float(kr['lat']), format="%.6f", key=f"lat_{global_index}")
-            new_lon = col4.number_input("경도", value=float(kr['lon']), format="%.6f", key=f"lon_{global_index}")
-
-            if col5.button("💾 저장", key=f"save_{global_index}"):
-                st.session_state.kidsroom_list = update_kidsroom(
-                    st.session_state.kidsroom_list,
-                    global_index,
-                    name=new_name,
-                    address=new_addr,
-                    lat=new_lat,
-                    lon=new_lon
-                )
-                st.success("저장되었습니다")
-                st.rerun()
+            new_name = col1.text_input("이름", value=kr['name'], key=f"name_{kr_id}")
+            new_addr = col2.text_input("주소", value=kr['address'], key=f"addr_{kr_id}")
+            new_lat = col3.number_input("위도", value=float(kr['lat']), format="%.6f", key=f"lat_{kr_id}")
+            new_lon = col4.number_input("경도", value=float(kr['lon']), format="%.6f", key=f"lon_{kr_id}")
+
+            if col5.button("💾 저장", key=f"save_{kr_id}"):
+                try:
+                    st.session_state.kidsroom_list = update_kidsroom(
+                        st.session_state.kidsroom_list,
+                        kr_id,
+                        name=new_name,
+                        address=new_addr,
+                        lat=new_lat,
+                        lon=new_lon
+                    )
+                except VersionConflictError:
+                    st.error("⚠️ 다른 사용자가 먼저 수정하거나 삭제한 항목입니다. 최신 데이터를 불러온 뒤 다시 시도하세요.")
+                    st.session_state.kidsroom_seq = None  # 다음 실행에서 전체 재로딩
+                else:
+                    st.success("저장되었습니다")
+                    st.rerun()
 
             del_col, info_col = st.columns([1,4])
-            if del_col.button("🗑️ 삭제", key=f"del_{global_index}"):
-                st.session_state.kidsroom_list = remove_kidsroom(st.session_state.kidsroom_list, global_index)
-                st.warning("삭제되었습니다")
-                # 삭제 후 페이지 재조정
-                if (total-1) <= page*page_size and page>0:
-                    st.session_state.kidsroom_page -= 1
-                st.rerun()
+            if del_col.button("🗑️ 삭제", key=f"del_{kr_id}"):
+                try:
+                    st.session_state.kidsroom_list = remove_kidsroom(st.session_state.kidsroom_list, kr_id)
+                except VersionConflictError:
+                    st.error("⚠️ 다른 사용자가 먼저 수정한 항목입니다. 최신 데이터를 불러온 뒤 다시 시도하세요.")
+                    st.session_state.kidsroom_seq = None
+                else:
+                    st.warning("삭제되었습니다")
+                    # 삭제 후 페이지 재조정
+                    if (total-1) <= page*page_size and page>0:
+                        st.session_state.kidsroom_page -= 1
+                    st.rerun()
     st.markdown('</div>', unsafe_allow_html=True)
 
     # 페이지 요약
@@ -243,9 +351,10 @@ def render_kidsroom_input_section():
     💡 **주소 입력 방법:**
     - 🔍 **주소로 자동 검색**: 카카오 API를 사용하여 한국 주소를 정확하게 찾습니다 (권장)
     - 📍 **좌표 직접 입력**: 네이버 지도에서 찾은 좌표를 직접 입력
+    - 📄 **파일로 일괄 가져오기**: CSV/Excel 주소 목록을 한 번에 검색하여 등록
     """)
 
-    tab1, tab2 = st.tabs(["🔍 주소로 자동 검색 (카카오 API)", "📍 좌표 직접 입력"])
+    tab1, tab2, tab3 = st.tabs(["🔍 주소로 자동 검색 (카카오 API)", "📍 좌표 직접 입력", "📄 파일로 일괄 가져오기"])
 
     with tab1:
         render_kidsroom_auto_search_tab()
@@ -253,4 +362,7 @@ def render_kidsroom_input_section():
     with tab2:
         render_kidsroom_manual_input_tab()
 
+    with tab3:
+        render_kidsroom_bulk_import_tab()
+
     render_kidsroom_list()